@@ -1,31 +1,65 @@
-import cv2 
+"""
+Analiza postawy na zdjęciach - wersja wsadowa
+Przyjmuje pliki, wzorce (glob) i katalogi ze zdjęciami, analizuje je równolegle
+w puli procesów (jeden model Pose na proces) i zapisuje wyniki do CSV albo JSON.
+
+Użycie:
+    python obsluga.py format.png
+    python obsluga.py zdjecia/ "sesja_*/*.jpg" -o wyniki.csv --annotate oznaczone/
+    python obsluga.py zdjecia/ -o wyniki.json --workers 4
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
 import mediapipe as mp # biblioteka mediapipe z gotowym modelem do detekcji sylwetki
 import numpy as np
 
-IMAGE_PATH = "mediapipe/format.png"   # To ścieżka do zdjęcia do analizy
 POSTURE_THRESHOLD = 0.12              # próg garbienia wykorzystywany do klasyfikacji postawy
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff"}
 
+RESULT_FIELDS = ["path", "detected", "side", "norm_dist", "posture", "error"]
 
-img = cv2.imread(IMAGE_PATH) # tablica numpy z wartościami dla każedgo piksela
+mp_pose = mp.solutions.pose # model do detekcji sylwetki
 
-if img is None:
-    raise FileNotFoundError(f"Nie udało się wczytać obrazu: {IMAGE_PATH}")
+# Model Pose tworzony raz na proces (w initializerze puli), a nie dla każdego zdjęcia
+_pose = None
 
-h, w, _ = img.shape
-rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB) # konwersja BGR (OpenCV) do RGB (MediaPipe)
 
-# deklaracja pracy modelu
-mp_pose = mp.solutions.pose # model do detekcji sylwetki
-pose = mp_pose.Pose(
-    static_image_mode=True, # analiza pojedynczego obrazu
-    model_complexity=1, # złożoność modelu (0, 1, 2) czy ma być szybki czy dokładny - w tym wypadku środek
-    min_detection_confidence=0.6 # minimalne zaufanie detekcji - jeżeli model jest mniej pewny niż ten próg, to nie zwraca wyniku
-)
+def _init_worker(model_complexity, min_detection_confidence):
+    global _pose
+    _pose = mp_pose.Pose(
+        static_image_mode=True, # każde zdjęcie analizowane niezależnie
+        model_complexity=model_complexity, # złożoność modelu (0, 1, 2) - szybki czy dokładny
+        min_detection_confidence=min_detection_confidence # poniżej tego progu model nie zwraca wyniku
+    )
+
+
+def collect_images(inputs):
+    """
+    Zamienia listę plików, wzorców i katalogów na posortowaną listę zdjęć (bez powtórzeń)
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, f) for f in files)
+        elif glob.has_magic(item):
+            paths.extend(glob.glob(item, recursive=True))
+        else:
+            paths.append(item)
 
-results = pose.process(rgb) # zwraca wyniki detekcji sylwetki punkty x, y, z i na ile widoczny jest element
+    unique = {os.path.normpath(p) for p in paths if Path(p).suffix.lower() in IMAGE_EXTENSIONS}
+    return sorted(unique)
 
-if not results.pose_landmarks:
-    raise RuntimeError("Nie wykryto sylwetki")
 
 def get_point(results, landmark, w, h):
     """
@@ -39,56 +73,198 @@ def get_point(results, landmark, w, h):
 def point_line_distance(point, line_p1, line_p2):
     return np.cross(line_p2 - line_p1, point - line_p1) / np.linalg.norm(line_p2 - line_p1)
 
-shoulder = get_point(results, mp_pose.PoseLandmark.LEFT_SHOULDER, w, h)
-hip      = get_point(results, mp_pose.PoseLandmark.LEFT_HIP, w, h)
-ear      = get_point(results, mp_pose.PoseLandmark.LEFT_EAR, w, h)
-
-torso_len = np.linalg.norm(shoulder - hip)
-raw_dist = point_line_distance(ear, hip, shoulder)
-norm_dist = abs(raw_dist) / torso_len
-
-if norm_dist > POSTURE_THRESHOLD:
-    posture = "Z GARBIONY"
-    color = (0, 0, 255)
-else:
-    posture = "WYPROSTOWANY"
-    color = (0, 255, 0)
-
-# Punkty
-cv2.circle(img, tuple(shoulder.astype(int)), 6, (255, 0, 0), -1)
-cv2.circle(img, tuple(hip.astype(int)), 6, (255, 0, 0), -1)
-cv2.circle(img, tuple(ear.astype(int)), 6, (0, 255, 255), -1)
-
-# Linia tułowia
-cv2.line(
-    img,
-    tuple(hip.astype(int)),
-    tuple(shoulder.astype(int)),
-    (255, 255, 255),
-    2
-)
-
-# Tekst
-cv2.putText(
-    img,
-    f"Postawa: {posture}",
-    (30, 40),
-    cv2.FONT_HERSHEY_SIMPLEX,
-    1,
-    color,
-    2
-)
-
-cv2.putText(
-    img,
-    f"Wskaznik: {norm_dist:.3f}",
-    (30, 80),
-    cv2.FONT_HERSHEY_SIMPLEX,
-    0.8,
-    (255, 255, 255),
-    2
-)
-
-cv2.imshow("Posture Monitor", img)
-cv2.waitKey(0)
-cv2.destroyAllWindows()
+
+def choose_side(results):
+    """
+    Strona sylwetki lepiej widoczna dla kamery (suma widoczności ucha, barku i biodra)
+    """
+    landmarks = results.pose_landmarks.landmark
+    scores = {}
+    for side in ("LEFT", "RIGHT"):
+        scores[side] = sum(
+            landmarks[getattr(mp_pose.PoseLandmark, f"{side}_{name}")].visibility
+            for name in ("EAR", "SHOULDER", "HIP")
+        )
+    return max(scores, key=scores.get)
+
+
+def annotate(img, shoulder, hip, ear, norm_dist, is_good):
+    """Rysuje punkty, linię tułowia i wynik na kopii zdjęcia"""
+    img = img.copy()
+    posture = "WYPROSTOWANY" if is_good else "Z GARBIONY"
+    color = (0, 255, 0) if is_good else (0, 0, 255)
+
+    # Punkty
+    cv2.circle(img, tuple(shoulder.astype(int)), 6, (255, 0, 0), -1)
+    cv2.circle(img, tuple(hip.astype(int)), 6, (255, 0, 0), -1)
+    cv2.circle(img, tuple(ear.astype(int)), 6, (0, 255, 255), -1)
+
+    # Linia tułowia
+    cv2.line(img, tuple(hip.astype(int)), tuple(shoulder.astype(int)), (255, 255, 255), 2)
+
+    # Tekst
+    cv2.putText(img, f"Postawa: {posture}", (30, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+    cv2.putText(img, f"Wskaznik: {norm_dist:.3f}", (30, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return img
+
+
+def analyze_image(task):
+    """
+    Analiza jednego zdjęcia w procesie roboczym
+
+    Zwraca (wynik, zakodowane_oznaczone_zdjęcie albo None). Zdjęcie jest
+    kodowane tutaj, a zapisywane na dysk przez wątek w procesie głównym.
+    """
+    path, threshold, annotate_images = task
+    result = {"path": path, "detected": False, "side": None, "norm_dist": None, "posture": None, "error": None}
+
+    img = cv2.imread(path) # tablica numpy z wartościami dla każdego piksela
+    if img is None:
+        result["error"] = "nie udało się wczytać obrazu"
+        return result, None
+
+    h, w, _ = img.shape
+    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB) # konwersja BGR (OpenCV) do RGB (MediaPipe)
+
+    try:
+        results = _pose.process(rgb) # punkty x, y, z i na ile widoczny jest element
+    except Exception as e:
+        result["error"] = str(e)
+        return result, None
+
+    if not results.pose_landmarks:
+        result["error"] = "nie wykryto sylwetki"
+        return result, None
+
+    side = choose_side(results)
+    shoulder = get_point(results, getattr(mp_pose.PoseLandmark, f"{side}_SHOULDER"), w, h)
+    hip      = get_point(results, getattr(mp_pose.PoseLandmark, f"{side}_HIP"), w, h)
+    ear      = get_point(results, getattr(mp_pose.PoseLandmark, f"{side}_EAR"), w, h)
+
+    torso_len = np.linalg.norm(shoulder - hip)
+    if torso_len < 1:
+        result["error"] = "tułów niewidoczny"
+        return result, None
+
+    norm_dist = float(abs(point_line_distance(ear, hip, shoulder)) / torso_len)
+    is_good = norm_dist <= threshold
+
+    result.update({
+        "detected": True,
+        "side": side.lower(),
+        "norm_dist": round(norm_dist, 4),
+        "posture": "good" if is_good else "bad"
+    })
+
+    encoded = None
+    if annotate_images:
+        ok, buffer = cv2.imencode(Path(path).suffix or ".png", annotate(img, shoulder, hip, ear, norm_dist, is_good))
+        if ok:
+            encoded = buffer.tobytes()
+    return result, encoded
+
+
+def write_results(results, output, fmt):
+    """Zapis wyników do CSV albo JSON (plik lub stdout)"""
+    stream = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+    try:
+        if fmt == "json":
+            json.dump(results, stream, ensure_ascii=False, indent=2)
+            stream.write("\n")
+        else:
+            writer = csv.DictWriter(stream, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    finally:
+        if output:
+            stream.close()
+
+
+def annotation_root(images):
+    """Wspólny katalog zdjęć - podkatalogi poniżej niego są powtarzane w --annotate"""
+    try:
+        return os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in images])
+    except ValueError:
+        # Zdjęcia na różnych dyskach (Windows) - brak wspólnego katalogu
+        return None
+
+
+def annotated_path(annotate_dir, path, root=None):
+    """
+    Ścieżka oznaczonego zdjęcia z zachowaniem podkatalogów względem root,
+    więc zdjęcia o tej samej nazwie z różnych katalogów się nie nadpisują
+    """
+    path = os.path.abspath(path)
+    relative = os.path.relpath(path, root) if root else os.path.splitdrive(path)[1].lstrip("\\/")
+    stem, suffix = os.path.splitext(relative)
+    return os.path.join(annotate_dir, f"{stem}_oznaczone{suffix}")
+
+
+def save_bytes(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wsadowa analiza postawy na zdjęciach")
+    parser.add_argument("inputs", nargs="+", help="Pliki, wzorce (np. 'zdjecia/*.jpg') lub katalogi")
+    parser.add_argument("-o", "--output", help="Plik wynikowy .csv lub .json (domyślnie CSV na stdout)")
+    parser.add_argument("--format", choices=["csv", "json"], help="Format wyników (domyślnie z rozszerzenia)")
+    parser.add_argument("--annotate", metavar="KATALOG", help="Zapisz oznaczone zdjęcia do katalogu")
+    parser.add_argument("--threshold", type=float, default=POSTURE_THRESHOLD, help="Próg garbienia")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Liczba procesów")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=1, help="Złożoność modelu")
+    parser.add_argument("--min-confidence", type=float, default=0.6, help="Minimalne zaufanie detekcji")
+    args = parser.parse_args()
+
+    images = collect_images(args.inputs)
+    if not images:
+        print("Nie znaleziono zdjęć", file=sys.stderr)
+        return 1
+
+    fmt = args.format or ("json" if args.output and args.output.lower().endswith(".json") else "csv")
+    root = None
+    if args.annotate:
+        os.makedirs(args.annotate, exist_ok=True)
+        root = annotation_root(images)
+
+    workers = max(1, min(args.workers, len(images)))
+    tasks = [(path, args.threshold, bool(args.annotate)) for path in images]
+    # Duże paczki zmniejszają narzut komunikacji, małe wyrównują obciążenie procesów
+    chunksize = max(1, len(images) // (workers * 8))
+
+    results = []
+    saves = []  # (ścieżka, future) zapisów oznaczonych zdjęć
+    start = time.perf_counter()
+
+    # Zapis oznaczonych zdjęć w tle - analiza nie czeka na dysk
+    with ThreadPoolExecutor(max_workers=2) as writer, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(args.model_complexity, args.min_confidence)) as pool:
+        for result, encoded in pool.map(analyze_image, tasks, chunksize=chunksize):
+            results.append(result)
+            if encoded is not None:
+                target = annotated_path(args.annotate, result["path"], root)
+                saves.append((target, writer.submit(save_bytes, target, encoded)))
+
+    elapsed = time.perf_counter() - start
+    write_results(results, args.output, fmt)
+
+    # Pula zapisu jest już zamknięta - wszystkie zapisy zakończone
+    failed_saves = [(target, future.exception()) for target, future in saves if future.exception() is not None]
+    for target, error in failed_saves:
+        print(f"Nie zapisano {target}: {error}", file=sys.stderr)
+
+    detected = sum(1 for r in results if r["detected"])
+    bad = sum(1 for r in results if r["posture"] == "bad")
+    print(f"Zdjęć: {len(results)}, wykryto sylwetkę: {detected}, zgarbionych: {bad}", file=sys.stderr)
+    print(f"Czas: {elapsed:.2f}s, {len(results) / elapsed:.1f} zdjęć/s ({workers} procesów)", file=sys.stderr)
+    if failed_saves:
+        print(f"Nieudane zapisy oznaczonych zdjęć: {len(failed_saves)}/{len(saves)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Moduł z kalibracją backendu wykrywania sylwetki
+Mierzy czas analizy dostępnych konfiguracji (MediaPipe solutions z
+model_complexity 0/1/2, PoseLandmarker lite/full/heavy, MoveNet z różną
+liczbą wątków) na kilku klatkach rozgrzewkowych i wybiera najdokładniejszą,
+która mieści się w budżecie opóźnienia jednej analizy.
+
+Wynik jest zapisywany per maszyna w ~/.posture_monitor/calibration.json,
+więc kolejne uruchomienia pomijają pomiar. Zapisywany jest tylko pomiar na
+klatkach z kamery - pomiar na klatkach syntetycznych zaniża czas analizy.
+
+Użycie:
+    python backend_calibration.py --latency-budget 40
+    python backend_calibration.py --latency-budget 40 --camera 0 --recalibrate
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from pose_backends import create_backend
+
+
+CACHE_PATH = Path.home() / ".posture_monitor" / "calibration.json"
+
+# Liczby wątków sprawdzane dla MoveNet (MediaPipe nie pozwala ich ustawić)
+THREAD_COUNTS = (1, 2, 4)
+
+# Ile sekund czekać przy starcie aplikacji na klatki z kamery do pomiaru
+STARTUP_FRAME_TIMEOUT = 5.0
+
+
+def default_candidates() -> List[Dict]:
+    """
+    Konfiguracje do sprawdzenia z oceną dokładności (wyższa = dokładniejszy model)
+
+    solutions i tasks przy tej samej ocenie to ten sam model BlazePose -
+    wygrywa szybszy.
+    """
+    candidates = [
+        {'backend': 'mediapipe-solutions', 'options': {'model_complexity': 2}, 'accuracy': 3},
+        {'backend': 'mediapipe-tasks', 'options': {'variant': 'heavy'}, 'accuracy': 3},
+        {'backend': 'mediapipe-solutions', 'options': {'model_complexity': 1}, 'accuracy': 2},
+        {'backend': 'mediapipe-tasks', 'options': {'variant': 'full'}, 'accuracy': 2},
+        {'backend': 'mediapipe-solutions', 'options': {'model_complexity': 0}, 'accuracy': 1},
+        {'backend': 'mediapipe-tasks', 'options': {'variant': 'lite'}, 'accuracy': 1},
+    ]
+    cpus = os.cpu_count() or 1
+    for threads in THREAD_COUNTS:
+        if threads <= cpus:
+            candidates.append({'backend': 'movenet-onnx', 'options': {'threads': threads}, 'accuracy': 0})
+    return candidates
+
+
+def candidate_label(backend: str, options: Dict) -> str:
+    """Krótki opis konfiguracji, np. 'mediapipe-tasks variant=full'"""
+    return " ".join([backend] + [f"{k}={v}" for k, v in sorted(options.items())])
+
+
+def machine_key() -> str:
+    """Identyfikator maszyny i wersji MediaPipe - inny klucz oznacza ponowną kalibrację"""
+    try:
+        from importlib.metadata import version
+        mediapipe_version = version('mediapipe')
+    except Exception:
+        mediapipe_version = 'brak'
+    return "|".join([
+        platform.node(),
+        platform.machine(),
+        platform.processor() or '-',
+        str(os.cpu_count()),
+        f"mediapipe-{mediapipe_version}"
+    ])
+
+
+def synthetic_frames(count: int = 3, width: int = 640, height: int = 480) -> List[np.ndarray]:
+    """
+    Klatki rozgrzewkowe, gdy kamera nie jest dostępna
+
+    Bez osoby w kadrze MediaPipe nie uruchamia modelu punktów, więc pomiar
+    na takich klatkach zaniża czas - klatki z kamery są lepsze.
+    """
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def collect_frames(latest: Callable[[], Tuple], count: int = 3, timeout: float = 2.0) -> List[np.ndarray]:
+    """
+    Kolejne różne klatki z kamery jako klatki rozgrzewkowe
+
+    Args:
+        latest: Funkcja zwracająca (numer, klatka, timestamp) - CaptureThread.latest
+                albo CameraManager.read_latest
+    """
+    frames = []
+    last_seq = None
+    deadline = time.monotonic() + timeout
+    while len(frames) < count and time.monotonic() < deadline:
+        seq, frame, _ = latest()
+        if frame is not None and seq != last_seq:
+            frames.append(frame.copy())
+            last_seq = seq
+        else:
+            time.sleep(0.01)
+    return frames
+
+
+def _prepare_frames(frames: List[np.ndarray], inference_long_edge: Optional[int]) -> List[np.ndarray]:
+    """BGR -> RGB w rozmiarze analizy (jak PostureDetector._resize_for_inference)"""
+    prepared = []
+    for frame in frames:
+        h, w = frame.shape[:2]
+        if inference_long_edge and max(h, w) > inference_long_edge:
+            scale = inference_long_edge / max(h, w)
+            frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+        prepared.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return prepared
+
+
+def benchmark_candidate(candidate: Dict, frames: List[np.ndarray], warmup: int = 2,
+                        runs: int = 5, model_path: Optional[str] = None) -> Dict:
+    """
+    Zmierz jedną konfigurację
+
+    Returns:
+        Kopia candidate z polami ok, load_ms, median_ms, p95_ms albo error
+    """
+    result = dict(candidate, label=candidate_label(candidate['backend'], candidate['options']))
+    start = time.perf_counter()
+    try:
+        backend = create_backend(candidate['backend'], model_path, candidate['options'])
+    except Exception as e:
+        result.update(ok=False, error=str(e))
+        return result
+    result['load_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    timestamp_ms = 0
+    times = []
+    try:
+        for i in range(warmup + runs):
+            rgb = frames[i % len(frames)]
+            timestamp_ms += 33
+            start = time.perf_counter()
+            backend.infer(rgb, timestamp_ms)
+            if i >= warmup:
+                times.append((time.perf_counter() - start) * 1000)
+    except Exception as e:
+        result.update(ok=False, error=str(e))
+        return result
+    finally:
+        backend.close()
+
+    times.sort()
+    result.update(
+        ok=True,
+        median_ms=round(statistics.median(times), 2),
+        p95_ms=round(times[min(len(times) - 1, int(0.95 * len(times)))], 2)
+    )
+    return result
+
+
+def choose(results: List[Dict], budget_ms: float) -> Optional[Dict]:
+    """
+    Najdokładniejsza konfiguracja mieszcząca się w budżecie (przy remisie szybsza)
+    Gdy żadna się nie mieści - najszybsza działająca.
+    """
+    working = [r for r in results if r.get('ok')]
+    if not working:
+        return None
+    within = [r for r in working if r['median_ms'] <= budget_ms]
+    if within:
+        return min(within, key=lambda r: (-r['accuracy'], r['median_ms']))
+    return min(working, key=lambda r: r['median_ms'])
+
+
+def run_calibration(budget_ms: float, frames: Optional[List[np.ndarray]] = None,
+                    inference_long_edge: Optional[int] = 480, candidates: Optional[List[Dict]] = None,
+                    warmup: int = 2, runs: int = 5) -> Dict:
+    """Zmierz wszystkie konfiguracje i wybierz jedną (bez zapisu)"""
+    source = 'kamera' if frames else 'syntetyczne'
+    rgb_frames = _prepare_frames(frames or synthetic_frames(), inference_long_edge)
+
+    results = []
+    for candidate in candidates or default_candidates():
+        result = benchmark_candidate(candidate, rgb_frames, warmup=warmup, runs=runs)
+        if result['ok']:
+            print(f"Kalibracja: {result['label']} {result['median_ms']:.1f} ms", file=sys.stderr)
+        else:
+            print(f"Kalibracja: {result['label']} niedostępny ({result['error']})", file=sys.stderr)
+        results.append(result)
+
+    chosen = choose(results, budget_ms)
+    return {
+        'machine': machine_key(),
+        'budget_ms': budget_ms,
+        'inference_long_edge': inference_long_edge,
+        'frames': source,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'results': results,
+        'chosen': None if chosen is None else {
+            'backend': chosen['backend'],
+            'options': chosen['options'],
+            'label': chosen['label'],
+            'median_ms': chosen['median_ms'],
+            'within_budget': chosen['median_ms'] <= budget_ms
+        }
+    }
+
+
+def load_cached(budget_ms: float, inference_long_edge: Optional[int] = 480,
+                path: Path = CACHE_PATH) -> Optional[Dict]:
+    """Zapisana kalibracja tej maszyny dla tego samego budżetu i rozmiaru analizy"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f).get(machine_key())
+    except (OSError, ValueError):
+        return None
+    if entry is None or entry.get('budget_ms') != budget_ms \
+            or entry.get('inference_long_edge') != inference_long_edge \
+            or entry.get('frames') != 'kamera':
+        return None
+    return entry
+
+
+def save_cached(entry: Dict, path: Path = CACHE_PATH):
+    """Zapisz kalibrację (wpisy innych maszyn w tym samym pliku zostają)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    data[entry['machine']] = entry
+
+    # Zapis przez plik tymczasowy - przerwany zapis nie psuje kalibracji
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def calibrate(budget_ms: float, frames: Optional[List[np.ndarray]] = None,
+              inference_long_edge: Optional[int] = 480, force: bool = False,
+              path: Path = CACHE_PATH) -> Dict:
+    """
+    Kalibracja z pamięci podręcznej albo nowy pomiar
+
+    Pomiar bez klatek z kamery (syntetyczne) nie jest zapisywany - obowiązuje
+    tylko w tym uruchomieniu, następne zmierzy ponownie.
+
+    Returns:
+        Wpis kalibracji; pole 'cached' mówi, czy pomiar został pominięty
+    """
+    if not force:
+        entry = load_cached(budget_ms, inference_long_edge, path)
+        if entry is not None:
+            return dict(entry, cached=True)
+
+    entry = run_calibration(budget_ms, frames, inference_long_edge)
+    if entry['frames'] == 'kamera':
+        save_cached(entry, path)
+    return dict(entry, cached=False)
+
+
+def detector_settings(entry: Optional[Dict]) -> Dict:
+    """Argumenty PostureDetector dla wybranej konfiguracji (pusty słownik = bez zmian)"""
+    if not entry or not entry.get('chosen'):
+        return {}
+    chosen = entry['chosen']
+    return {'backend': chosen['backend'], 'backend_options': dict(chosen['options'])}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Kalibracja backendu wykrywania sylwetki")
+    parser.add_argument("--latency-budget", type=float, default=40.0,
+                        help="Maksymalny czas jednej analizy w ms")
+    parser.add_argument("--inference-size", type=int, default=480,
+                        help="Dłuższy bok klatki dla modelu (0 = pełna rozdzielczość)")
+    parser.add_argument("--camera", type=int, help="Klatki rozgrzewkowe z tej kamery (domyślnie syntetyczne)")
+    parser.add_argument("--frames", type=int, default=3, help="Liczba klatek rozgrzewkowych")
+    parser.add_argument("--recalibrate", action="store_true", help="Zmierz ponownie mimo zapisanego wyniku")
+    args = parser.parse_args()
+
+    frames = None
+    if args.camera is not None:
+        capture = cv2.VideoCapture(args.camera)
+        frames = []
+        while capture.isOpened() and len(frames) < args.frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(frame)
+        capture.release()
+        if not frames:
+            print(f"Brak klatek z kamery {args.camera} - używam syntetycznych", file=sys.stderr)
+
+    entry = calibrate(args.latency_budget, frames, args.inference_size or None, force=args.recalibrate)
+    if entry['cached']:
+        print(f"Zapisana kalibracja z {entry['timestamp']}", file=sys.stderr)
+    elif entry['frames'] != 'kamera':
+        print("Pomiar na klatkach syntetycznych nie został zapisany", file=sys.stderr)
+
+    for result in entry['results']:
+        status = f"{result['median_ms']:7.1f} ms" if result.get('ok') else "   niedostępny"
+        print(f"  {result['label']:<40} {status}")
+
+    chosen = entry['chosen']
+    if chosen is None:
+        print("Żaden backend nie działa", file=sys.stderr)
+        return 1
+    suffix = "" if chosen['within_budget'] else " (ponad budżetem - najszybszy dostępny)"
+    print(f"Wybrano: {chosen['label']} ({chosen['median_ms']:.1f} ms){suffix}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
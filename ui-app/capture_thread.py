@@ -0,0 +1,225 @@
+"""
+Moduł z wątkiem przechwytywania obrazu z kamery
+Wątek jest właścicielem cv2.VideoCapture i trzyma tylko najnowszą klatkę
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from frame_pool import FramePool
+
+
+def default_capture_backend() -> int:
+    """Backend OpenCV odpowiedni dla systemu"""
+    if sys.platform == 'win32':
+        return cv2.CAP_DSHOW
+    elif sys.platform.startswith('linux'):
+        return cv2.CAP_V4L2
+    elif sys.platform == 'darwin':
+        return cv2.CAP_AVFOUNDATION
+    return cv2.CAP_ANY
+
+
+def parse_source(source: Union[int, str]) -> Union[int, str]:
+    """Zamienia '0', '1'... na indeks kamery, pozostałe wartości to plik lub URL"""
+    if isinstance(source, str) and source.strip().isdigit():
+        return int(source)
+    return source
+
+
+def open_capture(source: Union[int, str], width: int = 0, height: int = 0,
+                 fps: float = 0, mjpg: bool = True) -> Optional[cv2.VideoCapture]:
+    """
+    Otwiera kamerę (indeks) albo plik / strumień (ścieżka, URL) bez Qt
+
+    Dla kamer ustawia MJPG, rozdzielczość i FPS, jeśli podano.
+    Zwraca None, jeśli źródła nie da się otworzyć.
+    """
+    source = parse_source(source)
+
+    if isinstance(source, int):
+        capture = cv2.VideoCapture(source, default_capture_backend())
+        if not capture.isOpened():
+            capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            return None
+
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # V4L2 wymaga ustawienia FOURCC przed rozdzielczością
+        if mjpg:
+            capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        if width and height:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            capture.set(cv2.CAP_PROP_FPS, fps)
+        return capture
+
+    capture = cv2.VideoCapture(source)
+    return capture if capture.isOpened() else None
+
+
+def playback_fps(capture: cv2.VideoCapture, source: Union[int, str]) -> float:
+    """
+    FPS nagrania dla plików wideo, 0 dla kamer i strumieni sieciowych
+
+    Kamera i strumień oddają klatki w swoim tempie, plik dekodowany jest tak
+    szybko, jak pozwala procesor - trzeba go odtwarzać w tempie nagrania.
+    """
+    source = parse_source(source)
+    if isinstance(source, int) or not os.path.isfile(source):
+        return 0.0
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    return fps if fps and fps > 0 else 0.0
+
+
+class CaptureThread(threading.Thread):
+    """
+    Wątek w tle odczytujący klatki z cv2.VideoCapture
+
+    Najnowsza klatka trzymana jest w jednym slocie chronionym blokadą.
+    Konsumenci (podgląd, analiza) pobierają ją bez blokowania na read().
+    Klatka nadpisana zanim ktokolwiek ją odczytał liczona jest jako porzucona.
+
+    Z buffer_pool klatki są odczytywane do buforów z FramePool
+    (read(image=...)) zamiast nowej tablicy przy każdym odczycie.
+    Z pace_fps (pliki wideo, patrz playback_fps) odczyt jest wstrzymywany
+    tak, by klatki pojawiały się w tempie nagrania.
+    """
+
+    def __init__(self, capture: cv2.VideoCapture, name: str = "CaptureThread", buffer_pool: bool = False,
+                 pace_fps: float = 0.0):
+        super().__init__(name=name, daemon=True)
+        self._capture = capture
+        self._frame_interval = 1.0 / pace_fps if pace_fps and pace_fps > 0 else 0.0
+        # Opublikowana klatka, podgląd, analiza i bufor do zapisu - z zapasem
+        self._pool = FramePool(max_buffers=6) if buffer_pool else None
+        self._frame_shape = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        # Slot z najnowszą klatką
+        self._frame: Optional[np.ndarray] = None
+        self._frame_seq = 0
+        self._frame_timestamp = 0.0
+        self._frame_consumed = True
+
+        # Liczniki
+        self._frames_captured = 0
+        self._frames_dropped = 0
+        self._read_failures = 0
+
+    @property
+    def capture(self) -> cv2.VideoCapture:
+        return self._capture
+
+    def run(self):
+        consecutive_failures = 0
+        next_read = time.monotonic()
+
+        while not self._stop_event.is_set():
+            if self._frame_interval:
+                # Plik: następna klatka dopiero w chwili, w której pojawiłaby się w nagraniu
+                delay = next_read - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+                # Po zatrzymaniu (np. długi odczyt) nie nadrabiamy seriami
+                next_read = max(next_read + self._frame_interval, time.monotonic())
+
+            ret, frame = self._read()
+            timestamp = time.monotonic()
+
+            if not ret or frame is None:
+                self._read_failures += 1
+                consecutive_failures += 1
+                # Nie kręć się w pętli gdy kamera chwilowo nie oddaje obrazu
+                self._stop_event.wait(min(0.01 * consecutive_failures, 0.5))
+                continue
+
+            consecutive_failures = 0
+
+            with self._lock:
+                if not self._frame_consumed:
+                    self._frames_dropped += 1
+                self._frame = frame
+                self._frame_seq += 1
+                self._frame_timestamp = timestamp
+                self._frame_consumed = False
+                self._frames_captured += 1
+
+        # Wątek jest właścicielem kamery - zwalnia ją dopiero po wyjściu z read()
+        self._capture.release()
+
+    def _read(self):
+        if self._pool is None:
+            return self._capture.read()
+
+        if self._frame_shape is None:
+            # Kształt klatki znany dopiero po pierwszym odczycie
+            ret, frame = self._capture.read()
+        else:
+            buffer = self._pool.acquire(self._frame_shape)
+            ret, frame = self._capture.read(image=buffer)
+            if ret and frame is buffer:
+                return ret, frame
+            del buffer
+        if ret and frame is not None:
+            # OpenCV zaalokował nową tablicę (pierwsza klatka albo inny rozmiar)
+            self._frame_shape = frame.shape
+            frame = self._pool.adopt(frame)
+        return ret, frame
+
+    def latest(self) -> Tuple[int, Optional[np.ndarray], float]:
+        """
+        Zwraca najnowszą klatkę bez blokowania
+
+        Returns:
+            (numer_sekwencyjny, klatka, timestamp_monotoniczny)
+            Klatka jest tylko do odczytu - wątek nie modyfikuje jej po publikacji
+        """
+        with self._lock:
+            self._frame_consumed = True
+            return self._frame_seq, self._frame, self._frame_timestamp
+
+    def wait_for_frame(self, timeout: float = 2.0) -> bool:
+        """Czekaj aż pojawi się pierwsza klatka"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._frame is not None:
+                    return True
+            if not self.is_alive():
+                return False
+            time.sleep(0.01)
+        return False
+
+    def stats(self) -> dict:
+        """Zwraca liczniki wątku przechwytywania"""
+        with self._lock:
+            stats = {
+                'captured': self._frames_captured,
+                'dropped': self._frames_dropped,
+                'read_failures': self._read_failures
+            }
+        if self._pool is not None:
+            pool = self._pool.stats()
+            stats['buffer_allocations'] = pool['allocations']
+            stats['buffer_reuses'] = pool['reuses']
+        return stats
+
+    @property
+    def dropped_frames(self) -> int:
+        with self._lock:
+            return self._frames_dropped
+
+    def stop(self, timeout: float = 1.0):
+        """Zatrzymaj wątek (kamera zostanie zwolniona przez wątek)"""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
@@ -0,0 +1,88 @@
+"""
+Moduł z pulą wstępnie zaalokowanych buforów klatek
+Przechwytywanie (VideoCapture.read(image=...)), zmiana rozmiaru i konwersja
+kolorów (parametr dst=) zapisują do buforów z puli zamiast tworzyć nowe tablice.
+W stanie ustalonym liczba alokacji na klatkę spada do zera, więc w wielogodzinnych
+sesjach nie rośnie fragmentacja pamięci ani RSS.
+
+Bufor wraca do puli sam, gdy nikt poza pulą go nie trzyma (podgląd, wątek analizy,
+widok-wycinek) - konsumenci nie muszą niczego zwalniać, a bufor w użyciu nie
+zostanie nadpisany.
+"""
+
+import sys
+import threading
+from typing import List, Tuple
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Bufory ndarray wielokrotnego użytku z licznikami alokacji
+
+    Gdy wszystkie pasujące bufory są w użyciu, powstaje nowy (liczony jako
+    alokacja); pula trzyma co najwyżej max_buffers tablic.
+    """
+
+    def __init__(self, max_buffers: int = 4):
+        self.max_buffers = max_buffers
+        self._buffers: List[np.ndarray] = []
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.reuses = 0
+
+        # Liczba referencji wolnego bufora zależy od interpretera - mierzona tą samą drogą
+        self._buffers.append(np.empty(0, dtype=np.uint8))
+        self._free_refs = self._refcount(0)
+        self._buffers.clear()
+
+    def _refcount(self, index: int) -> int:
+        return sys.getrefcount(self._buffers[index])
+
+    def _is_free(self, index: int) -> bool:
+        return self._refcount(index) <= self._free_refs
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Wolny bufor o podanym kształcie (zawartość nieokreślona)"""
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        with self._lock:
+            for i in range(len(self._buffers)):
+                buf = self._buffers[i]
+                if buf.shape == shape and buf.dtype == dtype:
+                    del buf
+                    if self._is_free(i):
+                        self.reuses += 1
+                        return self._buffers[i]
+            return self._add(np.empty(shape, dtype=dtype))
+
+    def adopt(self, array: np.ndarray) -> np.ndarray:
+        """
+        Przyjmij tablicę zaalokowaną poza pulą (np. przez OpenCV przy zmianie rozdzielczości)
+        Liczona jako alokacja - w stanie ustalonym nie powinna się zdarzać
+        """
+        with self._lock:
+            return self._add(array)
+
+    def _add(self, array: np.ndarray) -> np.ndarray:
+        self.allocations += 1
+        if len(self._buffers) >= self.max_buffers:
+            # Zwolnij wolny bufor (najpierw o innym kształcie - po zmianie rozdzielczości)
+            free = [i for i in range(len(self._buffers)) if self._is_free(i)]
+            free.sort(key=lambda i: self._buffers[i].shape == array.shape)
+            if not free:
+                # Wszystkie w użyciu - tablica poza pulą
+                return array
+            del self._buffers[free[0]]
+        self._buffers.append(array)
+        return array
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'allocations': self.allocations,
+                'reuses': self.reuses,
+                'buffers': len(self._buffers),
+                'bytes': sum(b.nbytes for b in self._buffers)
+            }
@@ -0,0 +1,380 @@
+"""
+Monitor postawy bez GUI (kioski, serwery, cienkie klienty)
+Pętla: przechwytywanie -> analiza -> zapis do bazy, wyniki jako
+JSON w kolejnych liniach (NDJSON) na stdout albo przez gniazdo Unix
+
+Nie importuje PySide6 - start jest szybszy, a zużycie pamięci mniejsze niż w aplikacji GUI
+
+Użycie:
+    python headless_monitor.py --camera 0 --interval 5
+    python headless_monitor.py --camera 0 --socket /tmp/posture.sock
+    python headless_monitor.py --camera 0 --calibrate-baseline 20
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+import backend_calibration
+from capture_thread import CaptureThread, open_capture, playback_fps
+from motion_gate import MotionGate
+from person_tracker import PERSON_MODES
+from posture_baseline import BaselineCollector, BaselineStore
+from posture_filter import PostureFilter
+from pose_backends import BACKENDS
+from posture_detector import PostureDetector
+from posture_metrics import parse_metric_threshold
+from statistics_store import StatisticsStore
+
+
+class StdoutSink:
+    """
+    Wyniki jako linie JSON na standardowym wyjściu
+    Strumień jest zapamiętany przy tworzeniu - main() kieruje print() modułów na stderr,
+    więc na stdout trafiają wyłącznie linie JSON
+    """
+
+    def __init__(self, stream=None):
+        self._stream = stream or sys.stdout
+
+    def write(self, record: dict):
+        self._stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._stream.flush()
+
+    def close(self):
+        pass
+
+
+class UnixSocketSink:
+    """
+    Serwer gniazda Unix rozsyłający linie JSON do wszystkich podłączonych klientów
+    Klient, który się rozłączył, jest po cichu usuwany
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen(8)
+        self._clients = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._acceptor = threading.Thread(target=self._accept_loop, name="SocketAcceptor", daemon=True)
+        self._acceptor.start()
+        print(f"Gniazdo wyników: {path}", file=sys.stderr)
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                break
+            with self._lock:
+                self._clients.append(client)
+
+    def write(self, record: dict):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            alive = []
+            for client in self._clients:
+                try:
+                    client.sendall(line)
+                    alive.append(client)
+                except OSError:
+                    client.close()
+            self._clients = alive
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients = []
+        self._server.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class HeadlessMonitor:
+    """Pętla monitorowania postawy bez Qt"""
+
+    def __init__(self, detector: PostureDetector, capture_thread: CaptureThread, sink,
+                 store: Optional[StatisticsStore] = None, interval: float = 5.0,
+                 motion_gate: Optional[MotionGate] = None, bad_posture_threshold: int = 30,
+                 posture_filter: Optional[PostureFilter] = None):
+        self.detector = detector
+        self.capture_thread = capture_thread
+        self.sink = sink
+        self.store = store
+        self.interval = interval
+        self.motion_gate = motion_gate
+        self.bad_posture_threshold = bad_posture_threshold
+        self.posture_filter = posture_filter
+
+        self._stop_event = threading.Event()
+        self._session_id = None
+        self._session_start = None
+        self._bad_posture_duration = 0.0
+        self._last_seq = 0
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self, max_checks: int = 0):
+        if self.store is not None:
+            self._session_start = datetime.now()
+            self._session_id = self.store.start_session(self._session_start, notes="headless")
+            print(f"Sesja rozpoczęta: ID={self._session_id}", file=sys.stderr)
+
+        checks = 0
+        next_tick = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                self._stop_event.wait(max(0.0, next_tick - time.monotonic()))
+                if self._stop_event.is_set():
+                    break
+                next_tick += self.interval
+
+                if self._tick():
+                    checks += 1
+                    if max_checks and checks >= max_checks:
+                        break
+        finally:
+            if self.store is not None and self._session_id is not None:
+                duration = self.store.end_session(self._session_id, self._session_start)
+                print(f"Sesja zakończona: ID={self._session_id}, czas={duration}min", file=sys.stderr)
+
+    def _tick(self) -> bool:
+        """Jedna analiza; zwraca False, gdy nie było nowej klatki"""
+        seq, frame, _ = self.capture_thread.latest()
+        if frame is None or seq == self._last_seq:
+            return False
+        self._last_seq = seq
+
+        start = time.perf_counter()
+        reused = False
+        result = None
+        signature = None
+
+        if self.motion_gate is not None:
+            result, signature = self.motion_gate.check(frame)
+            reused = result is not None
+
+        if result is None:
+            result = self.detector.analyze_posture(frame)
+            if self.motion_gate is not None:
+                self.motion_gate.store_result(signature, result)
+
+        is_good, norm_dist, landmarks = result
+        detected = landmarks is not None
+        raw_norm_dist = norm_dist
+        if self.posture_filter is not None and detected:
+            is_good, norm_dist, landmarks = self.posture_filter.update(norm_dist, landmarks)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if detected and not is_good:
+            self._bad_posture_duration += self.interval
+        else:
+            self._bad_posture_duration = 0.0
+
+        if self.store is not None:
+            self.store.add_check(self._session_id, is_good, norm_dist, detected, reused,
+                                 raw_coefficient=raw_norm_dist,
+                                 metrics=landmarks.get('metrics') if detected else None,
+                                 failed_metrics=landmarks.get('failed_metrics') if detected else None,
+                                 person_id=landmarks.get('person_id') if detected else None)
+            if detected and not reused and landmarks.get('people'):
+                self.store.add_person_checks(self._session_id, landmarks['people'])
+
+        self.sink.write({
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'detected': detected,
+            'is_good': bool(is_good),
+            'norm_dist': round(float(norm_dist), 4),
+            'raw_norm_dist': round(float(raw_norm_dist), 4),
+            'side': landmarks.get('used_side') if detected else None,
+            'metrics': landmarks.get('metrics') if detected else None,
+            'failed_metrics': landmarks.get('failed_metrics', []) if detected else [],
+            'person_id': landmarks.get('person_id') if detected else None,
+            'people': landmarks.get('people', []) if detected else [],
+            'reused': reused,
+            'bad_posture_seconds': round(self._bad_posture_duration, 1),
+            'warning': self._bad_posture_duration >= self.bad_posture_threshold,
+            'elapsed_ms': round(elapsed_ms, 1),
+            'dropped_frames': self.capture_thread.dropped_frames
+        })
+        return True
+
+
+def calibrate_baseline(detector: PostureDetector, capture_thread: CaptureThread,
+                       seconds: float) -> Optional[dict]:
+    """Kalibracja osobista: surowe norm_dist kolejnych klatek przez podany czas"""
+    collector = BaselineCollector(seconds)
+    last_seq = 0
+    print(f"Kalibracja postawy: usiądź prosto przez {seconds:.0f} s...", file=sys.stderr)
+    while not collector.done:
+        seq, frame, capture_time = capture_thread.latest()
+        if frame is None or seq == last_seq:
+            time.sleep(0.02)
+            continue
+        last_seq = seq
+        _, norm_dist, landmarks = detector.analyze_posture(frame, int(capture_time * 1000))
+        collector.add(norm_dist, landmarks.get('used_side') if landmarks else None)
+
+    entry = collector.result()
+    if entry is None:
+        print(f"Kalibracja nieudana - za mało pomiarów ({collector.samples}, "
+              f"bez sylwetki: {collector.missed})", file=sys.stderr)
+    return entry
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Monitor postawy bez GUI (wyniki jako NDJSON)")
+    parser.add_argument("--camera", default="0", help="Indeks kamery, plik wideo lub URL strumienia")
+    parser.add_argument("--interval", type=float, default=5.0, help="Odstęp między analizami w sekundach")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Próg garbienia")
+    parser.add_argument("--bad-posture-threshold", type=int, default=30,
+                        help="Po ilu sekundach złej postawy ustawić pole warning")
+    parser.add_argument("--inference-size", type=int, default=480,
+                        help="Dłuższy bok klatki dla MediaPipe (0 = pełna rozdzielczość)")
+    parser.add_argument("--motion-threshold", type=float, default=4.0,
+                        help="Próg zmiany obrazu dla pominięcia analizy (0 = zawsze analizuj)")
+    parser.add_argument("--roi", action="store_true", help="Analizuj tylko obszar wokół sylwetki")
+    parser.add_argument("--hysteresis", type=float, default=0.02,
+                        help="Pas wokół progu garbienia, w którym ocena się nie zmienia")
+    parser.add_argument("--no-smoothing", action="store_true", help="Bez wygładzania i histerezy")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto",
+                        help="Backend wykrywania sylwetki (domyślnie MediaPipe)")
+    parser.add_argument("--pose-model", help="Plik modelu dla backendu (.task, .onnx)")
+    parser.add_argument("--latency-budget", type=float, default=0.0,
+                        help="Wybierz najdokładniejszy model mieszczący się w tylu ms na analizę "
+                             "(kalibracja przy pierwszym uruchomieniu, 0 = wyłączone)")
+    parser.add_argument("--recalibrate", action="store_true", help="Powtórz kalibrację mimo zapisanego wyniku")
+    parser.add_argument("--buffer-pool", action="store_true",
+                        help="Klatki w buforach wielokrotnego użytku (bez alokacji na klatkę)")
+    parser.add_argument("--calibrate-baseline", type=float, default=0.0, metavar="SECONDS",
+                        help="Przed monitorowaniem zmierz osobistą linię bazową (siedząc prosto) i zapisz ją")
+    parser.add_argument("--no-baseline", action="store_true",
+                        help="Ignoruj zapisaną linię bazową kamery (globalny próg)")
+    parser.add_argument("--max-people", type=int, default=1,
+                        help="Wykrywaj do tylu osób (mediapipe-tasks) i oceniaj zablokowaną osobę główną")
+    parser.add_argument("--person-mode", choices=PERSON_MODES, default="primary",
+                        help="primary - tylko osoba główna, all - także osobne wyniki pozostałych osób")
+    parser.add_argument("--metric-threshold", type=parse_metric_threshold, action="append", default=[],
+                        help="Próg metryki nazwa=wartość, np. neck_angle=45 (można powtarzać)")
+    parser.add_argument("--resolution", default="640x480", help="Rozdzielczość kamery")
+    parser.add_argument("--fps", type=float, default=15, help="FPS kamery")
+    parser.add_argument("--socket", help="Ścieżka gniazda Unix zamiast stdout")
+    parser.add_argument("--no-db", action="store_true", help="Nie zapisuj wyników do statistics.db")
+    parser.add_argument("--max-checks", type=int, default=0, help="Zakończ po tylu analizach (0 = bez limitu)")
+    args = parser.parse_args()
+
+    # stdout należy do NDJSON - komunikaty modułów (backend, model, baza) idą na stderr
+    result_stream = sys.stdout
+    sys.stdout = sys.stderr
+
+    start = time.perf_counter()
+
+    try:
+        width, height = (int(v) for v in args.resolution.lower().split("x"))
+    except ValueError:
+        print(f"Niepoprawna rozdzielczość: {args.resolution}", file=sys.stderr)
+        return 2
+
+    capture = open_capture(args.camera, width, height, args.fps)
+    if capture is None:
+        print(f"Nie można otworzyć źródła: {args.camera}", file=sys.stderr)
+        return 1
+
+    capture_thread = CaptureThread(capture, name="HeadlessCapture", buffer_pool=args.buffer_pool,
+                                   pace_fps=playback_fps(capture, args.camera))
+    capture_thread.start()
+
+    detector_kwargs = {'backend': args.backend, 'pose_model': args.pose_model}
+    if args.latency_budget > 0 and args.backend == 'auto':
+        inference_long_edge = args.inference_size or None
+        entry = None if args.recalibrate else backend_calibration.load_cached(args.latency_budget, inference_long_edge)
+        if entry is None:
+            # Pomiar na prawdziwych klatkach - z osobą w kadrze działa cały model
+            frames = backend_calibration.collect_frames(capture_thread.latest)
+            entry = backend_calibration.calibrate(args.latency_budget, frames, inference_long_edge, force=True)
+        detector_kwargs.update(backend_calibration.detector_settings(entry))
+        if entry['chosen'] is not None:
+            print(f"Kalibracja: {entry['chosen']['label']} ({entry['chosen']['median_ms']:.1f} ms)", file=sys.stderr)
+
+    baseline_store = BaselineStore()
+    detector = PostureDetector(
+        posture_threshold=args.threshold,
+        metric_thresholds=dict(args.metric_threshold),
+        inference_long_edge=args.inference_size or None,
+        roi_tracking=args.roi,
+        buffer_pool=args.buffer_pool,
+        baseline=None if args.no_baseline else baseline_store.get(args.camera),
+        num_poses=args.max_people,
+        person_mode=args.person_mode,
+        **detector_kwargs
+    )
+
+    if not capture_thread.wait_for_frame():
+        print("Brak obrazu ze źródła", file=sys.stderr)
+        capture_thread.stop()
+        detector.release()
+        return 1
+
+    if args.calibrate_baseline > 0:
+        entry = calibrate_baseline(detector, capture_thread, args.calibrate_baseline)
+        if entry is not None:
+            baseline_store.save(args.camera, entry)
+            print(f"Linia bazowa zapisana: {baseline_store.path}", file=sys.stderr)
+            detector.set_baseline(entry)
+    if detector.baseline:
+        sides = ", ".join(f"{side} {stats['median']:.3f}" for side, stats in sorted(detector.baseline['sides'].items()))
+        print(f"Linia bazowa kamery {args.camera}: {sides}", file=sys.stderr)
+
+    sink = UnixSocketSink(args.socket) if args.socket else StdoutSink(result_stream)
+    store = None if args.no_db else StatisticsStore()
+    motion_gate = MotionGate(threshold=args.motion_threshold) if args.motion_threshold > 0 else None
+    posture_filter = None if args.no_smoothing else PostureFilter(
+        args.threshold, margin=args.hysteresis, max_gap=max(30.0, 3 * args.interval))
+
+    monitor = HeadlessMonitor(detector, capture_thread, sink, store=store, interval=args.interval,
+                              motion_gate=motion_gate, bad_posture_threshold=args.bad_posture_threshold,
+                              posture_filter=posture_filter)
+
+    def handle_signal(signum, frame):
+        monitor.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    print(f"Gotowy po {(time.perf_counter() - start) * 1000:.0f} ms (backend: {detector.api_type})", file=sys.stderr)
+
+    try:
+        monitor.run(max_checks=args.max_checks)
+    finally:
+        if args.buffer_pool:
+            capture_stats = capture_thread.stats()
+            detector_stats = detector.buffer_stats()
+            print(f"Alokacje buforów: przechwytywanie {capture_stats['buffer_allocations']} "
+                  f"na {capture_stats['captured']} klatek, analiza {detector_stats['allocations']} "
+                  f"(ponowne użycia {detector_stats['reuses']})", file=sys.stderr)
+        capture_thread.stop()
+        detector.release()
+        sink.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Moduł do uruchamiania analizy postawy poza wątkiem GUI
+Wyniki wracają do PostureMonitor przez sygnały (połączenie kolejkowane)
+"""
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+
+from process_inference import InferenceProcess
+
+
+class _InferenceRunner(QObject):
+    """Obiekt żyjący w wątku roboczym - wywołuje analyze_posture"""
+
+    finished = Signal(bool, float, object, float, int)
+
+    def __init__(self, detector):
+        super().__init__()
+        self._detector = detector
+
+    @Slot(object, object, int)
+    def process(self, frame: np.ndarray, timestamp_ms, generation: int):
+        start = time.perf_counter()
+        try:
+            is_good, norm_dist, landmarks = self._detector.analyze_posture(frame, timestamp_ms)
+        except Exception as e:
+            print(f"Błąd w wątku analizy: {e}")
+            is_good, norm_dist, landmarks = False, 0.0, None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.finished.emit(is_good, norm_dist, landmarks, elapsed_ms, generation)
+
+
+class InferenceWorker(QObject):
+    """
+    Uruchamia PostureDetector.analyze_posture w osobnym QThread
+
+    Jednocześnie trwa co najwyżej jedna analiza. Klatka przekazana
+    w trakcie trwającej analizy jest pomijana, a nie kolejkowana.
+    Po discard_pending() wynik trwającej analizy nie jest już przekazywany.
+    """
+
+    resultReady = Signal(bool, float, object)  # is_good, norm_dist, landmarks
+    _frameSubmitted = Signal(object, object, int)
+
+    def __init__(self, detector):
+        super().__init__()
+        self._busy = False
+        self._generation = 0
+        self._submitted_count = 0
+        self._skipped_count = 0
+        self._last_inference_ms = 0.0
+
+        self._thread = QThread()
+        self._thread.setObjectName("InferenceThread")
+        self._runner = _InferenceRunner(detector)
+        self._runner.moveToThread(self._thread)
+
+        # Obiekty żyją w różnych wątkach - Qt użyje połączeń kolejkowanych
+        self._frameSubmitted.connect(self._runner.process)
+        self._runner.finished.connect(self._on_finished)
+
+        self._thread.start()
+
+    @property
+    def is_busy(self) -> bool:
+        return self._busy
+
+    @property
+    def last_inference_ms(self) -> float:
+        return self._last_inference_ms
+
+    def submit(self, frame: np.ndarray, timestamp_ms: Optional[int] = None) -> bool:
+        """
+        Przekaż klatkę do analizy
+
+        Args:
+            timestamp_ms: Czas przechwycenia klatki (zegar monotoniczny CaptureThread)
+
+        Returns:
+            True jeśli klatka trafiła do analizy, False jeśli pominięto ją,
+            bo poprzednia analiza jeszcze trwa
+        """
+        if frame is None:
+            return False
+
+        if self._busy:
+            self._skipped_count += 1
+            return False
+
+        self._busy = True
+        self._submitted_count += 1
+        self._frameSubmitted.emit(frame, timestamp_ms, self._generation)
+        return True
+
+    def discard_pending(self):
+        """Wyniki klatek przekazanych do tej pory nie zostaną wyemitowane"""
+        self._generation += 1
+
+    @Slot(bool, float, object, float, int)
+    def _on_finished(self, is_good: bool, norm_dist: float, landmarks, elapsed_ms: float, generation: int):
+        self._busy = False
+        self._last_inference_ms = elapsed_ms
+        if generation != self._generation:
+            return
+        self.resultReady.emit(is_good, norm_dist, landmarks)
+
+    def stats(self) -> dict:
+        return {
+            'submitted': self._submitted_count,
+            'skipped': self._skipped_count,
+            'last_inference_ms': round(self._last_inference_ms, 1)
+        }
+
+    def stop(self):
+        """Zatrzymaj wątek roboczy (czeka na zakończenie trwającej analizy)"""
+        if self._thread.isRunning():
+            self._thread.quit()
+            self._thread.wait()
+
+
+class ProcessInferenceWorker(QObject):
+    """
+    Ten sam interfejs co InferenceWorker, ale analiza działa w osobnym procesie
+
+    Klatki trafiają do procesu przez pamięć współdzieloną, a wyniki odbiera
+    wątek czytający i przekazuje je sygnałem do wątku GUI.
+    """
+
+    resultReady = Signal(bool, float, object)  # is_good, norm_dist, landmarks
+    ready = Signal(str)  # Proces załadował model (nazwa API)
+    failed = Signal(str)  # Proces nie zdołał załadować modelu
+    _resultReceived = Signal(bool, float, object, float, int)
+
+    def __init__(self, detector_kwargs: dict = None):
+        super().__init__()
+        self._process = InferenceProcess(detector_kwargs=detector_kwargs)
+        self._last_inference_ms = 0.0
+        self._generation = 0
+
+        self._resultReceived.connect(self._on_result)
+
+        self._stop_event = threading.Event()
+        self._reader = threading.Thread(target=self._read_results, name="InferenceResultReader", daemon=True)
+        self._reader.start()
+
+    @property
+    def is_busy(self) -> bool:
+        return self._process.is_busy
+
+    @property
+    def last_inference_ms(self) -> float:
+        return self._last_inference_ms
+
+    def submit(self, frame: np.ndarray, timestamp_ms: Optional[int] = None) -> bool:
+        """
+        Przekaż klatkę do procesu analizy (pomija ją, gdy proces jest zajęty)
+        Proces nadaje własne znaczniki czasu - timestamp_ms jest ignorowany
+        """
+        return self._process.submit(frame, tag=self._generation) is not None
+
+    def discard_pending(self):
+        """Wyniki klatek przekazanych do tej pory nie zostaną wyemitowane"""
+        self._generation += 1
+
+    def set_baseline(self, baseline: Optional[dict]):
+        """Linia bazowa detektora w procesie analizy"""
+        self._process.set_baseline(baseline)
+
+    def _read_results(self):
+        ready_reported = False
+        while not self._stop_event.is_set():
+            result = self._process.get_result(timeout=0.2)
+
+            if not ready_reported and self._process.ready_event.is_set():
+                ready_reported = True
+                self.ready.emit(self._process.api_type or "")
+            if self._process.error is not None:
+                self.failed.emit(self._process.error)
+                break
+
+            if result is None:
+                continue
+            _, generation, is_good, norm_dist, landmarks, elapsed_ms = result
+            # Emisja z wątku spoza Qt - odbiorca w wątku GUI dostanie ją kolejkowo
+            self._resultReceived.emit(is_good, norm_dist, landmarks, elapsed_ms, generation)
+
+    @Slot(bool, float, object, float, int)
+    def _on_result(self, is_good: bool, norm_dist: float, landmarks, elapsed_ms: float, generation: int):
+        self._last_inference_ms = elapsed_ms
+        # Porównanie w wątku GUI - tym samym, który wywołuje discard_pending
+        if generation != self._generation:
+            return
+        self.resultReady.emit(is_good, norm_dist, landmarks)
+
+    def stats(self) -> dict:
+        stats = self._process.stats()
+        stats['last_inference_ms'] = round(self._last_inference_ms, 1)
+        return stats
+
+    def stop(self):
+        """Zatrzymaj proces analizy i wątek czytający"""
+        self._stop_event.set()
+        self._process.stop()
+        self._reader.join(1.0)
+
+
+class LiveStreamWorker(QObject):
+    """
+    Ten sam interfejs co InferenceWorker dla backendu w trybie LIVE_STREAM
+
+    submit() tylko przekazuje klatkę do MediaPipe (detect_async) i wraca od razu,
+    a klatki, których model nie nadąża analizować, MediaPipe pomija sam.
+    Wynik przychodzi z wątku MediaPipe i trafia do wątku GUI sygnałem.
+    """
+
+    resultReady = Signal(bool, float, object)  # is_good, norm_dist, landmarks
+    _resultReceived = Signal(bool, float, object, float, int)
+
+    def __init__(self, detector):
+        super().__init__()
+        self._detector = detector
+        self._submit_times = {}  # timestamp_ms użyty przez detektor -> (perf_counter przy wysłaniu, generacja)
+        self._generation = 0
+        # RLock - backend bez trybu asynchronicznego wywołuje callback w wątku submit()
+        self._lock = threading.RLock()
+        self._last_inference_ms = 0.0
+        self._stopped = False
+
+        self._resultReceived.connect(self._on_result)
+
+    @property
+    def is_busy(self) -> bool:
+        # Nigdy nie blokuje - nadmiarowe klatki pomija MediaPipe
+        return False
+
+    @property
+    def last_inference_ms(self) -> float:
+        return self._last_inference_ms
+
+    def submit(self, frame: np.ndarray, timestamp_ms: Optional[int] = None) -> bool:
+        """
+        Przekaż klatkę do analizy bez czekania na wynik
+
+        Args:
+            timestamp_ms: Czas przechwycenia klatki (zegar monotoniczny CaptureThread)
+        """
+        if frame is None:
+            return False
+        if timestamp_ms is None:
+            timestamp_ms = int(time.monotonic() * 1000)
+        with self._lock:
+            # Wpis pod podanym znacznikiem na wypadek wyniku przed powrotem z detektora
+            self._submit_times[timestamp_ms] = (time.perf_counter(), self._generation)
+            used = self._detector.analyze_posture_async(frame, timestamp_ms, self._on_backend_result)
+            if used is None:
+                self._submit_times.pop(timestamp_ms, None)
+                return False
+            if used != timestamp_ms:
+                # Detektor podbił nierosnący znacznik - wynik przyjdzie z tym użytym
+                entry = self._submit_times.pop(timestamp_ms, None)
+                if entry is not None:
+                    self._submit_times[used] = entry
+        return True
+
+    def _on_backend_result(self, is_good: bool, norm_dist: float, landmarks, timestamp_ms: int):
+        """Wywoływane z wątku MediaPipe"""
+        if self._stopped:
+            return
+        with self._lock:
+            sent = self._submit_times.pop(timestamp_ms, None)
+            # Klatki starsze od tej zostały pominięte przez MediaPipe
+            for ts in [ts for ts in self._submit_times if ts < timestamp_ms]:
+                del self._submit_times[ts]
+        if sent is None:
+            elapsed_ms, generation = 0.0, self._generation
+        else:
+            elapsed_ms, generation = (time.perf_counter() - sent[0]) * 1000, sent[1]
+        self._resultReceived.emit(is_good, norm_dist, landmarks, elapsed_ms, generation)
+
+    def discard_pending(self):
+        """Wyniki klatek przekazanych do tej pory nie zostaną wyemitowane"""
+        self._generation += 1
+
+    @Slot(bool, float, object, float, int)
+    def _on_result(self, is_good: bool, norm_dist: float, landmarks, elapsed_ms: float, generation: int):
+        self._last_inference_ms = elapsed_ms
+        if generation != self._generation:
+            return
+        self.resultReady.emit(is_good, norm_dist, landmarks)
+
+    def stats(self) -> dict:
+        return {
+            'submitted': self._detector.async_submitted,
+            'completed': self._detector.async_completed,
+            'dropped': self._detector.async_dropped,
+            'last_inference_ms': round(self._last_inference_ms, 1)
+        }
+
+    def stop(self):
+        """Nie ma własnego wątku - wyniki po zatrzymaniu nie są już przekazywane"""
+        self._stopped = True
@@ -0,0 +1,142 @@
+"""
+Moduł z wektorowymi obliczeniami na punktach sylwetki
+Wynik MediaPipe (solutions albo tasks API) zamieniany jest raz na tablicę
+(33, 4) float32: x, y, z, visibility. Metryki obu stron ciała liczone są
+operacjami na tablicach - także dla wielu klatek naraz (analiza offline).
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+NUM_LANDMARKS = 33
+
+# Indeksy BlazePose (takie same w solutions i tasks API)
+LEFT_EAR, RIGHT_EAR = 7, 8
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+SIDES = ('LEFT', 'RIGHT')
+# Wiersz = strona ciała, kolumny = ucho, ramię, biodro
+SIDE_INDICES = np.array([
+    [LEFT_EAR, LEFT_SHOULDER, LEFT_HIP],
+    [RIGHT_EAR, RIGHT_SHOULDER, RIGHT_HIP]
+])
+
+VISIBILITY_THRESHOLD = 0.5
+MIN_TORSO_LEN = 20.0  # piksele - krótszy tułów daje niestabilny współczynnik
+
+
+def landmarks_to_array(landmarks) -> Optional[np.ndarray]:
+    """
+    Lista landmarków MediaPipe -> tablica (33, 4) float32 (x, y, z, visibility)
+    Brak visibility (None) traktowany jest jak punkt niewidoczny
+    """
+    if landmarks is None:
+        return None
+    array = np.array(
+        [(lm.x, lm.y, lm.z, getattr(lm, 'visibility', 1.0) or 0.0) for lm in landmarks],
+        dtype=np.float32
+    )
+    if array.shape != (NUM_LANDMARKS, 4):
+        return None
+    return array
+
+
+def to_frame_coords(array: np.ndarray, region: Tuple[int, int, int, int], w: int, h: int) -> np.ndarray:
+    """
+    Przelicz x, y z układu analizowanego wycinka na znormalizowany układ pełnej klatki
+    (region = pełna klatka zwraca tablicę bez zmian)
+    """
+    x0, y0, x1, y1 = region
+    if (x0, y0, x1, y1) == (0, 0, w, h):
+        return array
+    out = array.copy()
+    out[:, 0] = x0 / w + array[:, 0] * ((x1 - x0) / w)
+    out[:, 1] = y0 / h + array[:, 1] * ((y1 - y0) / h)
+    return out
+
+
+def side_confidence(array: np.ndarray) -> float:
+    """Średnia widoczność ucha, ramienia i biodra dla lepiej widocznej strony"""
+    return float(array[SIDE_INDICES, 3].mean(axis=1).max())
+
+
+def score_landmarks(arrays: np.ndarray, frame_size: Union[Tuple[int, int], np.ndarray],
+                    threshold: float = 0.20, visibility_threshold: float = VISIBILITY_THRESHOLD,
+                    min_torso_len: float = MIN_TORSO_LEN,
+                    offsets: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Ocena postawy dla wielu klatek naraz
+
+    Dla każdej strony: ucho, ramię i biodro muszą być widoczne; wybierana jest
+    strona z dłuższym tułowiem (przy remisie lewa). norm_dist to odległość ucha
+    od linii biodro-ramię podzielona przez długość tułowia.
+
+    Args:
+        arrays: (N, 33, 4) albo (33, 4) - współrzędne znormalizowane do pełnej klatki;
+                brak sylwetki można oznaczyć wierszami NaN
+        frame_size: (w, h) wspólne dla wszystkich klatek albo tablica (N, 2)
+        threshold: Próg garbienia
+        offsets: Przesunięcie progu dla każdej strony (2,) - osobista linia bazowa
+                 (posture_baseline.side_offsets); None = bez przesunięcia.
+                 norm_dist zostaje bez zmian - przesunięcie dotyczy tylko oceny
+
+    Returns:
+        Słownik tablic (N,): valid, is_good, norm_dist, raw_dist, torso_len, side (0 = LEFT, 1 = RIGHT),
+        offset (przesunięcie progu wybranej strony) oraz 'points' (N, 3, 2) - ucho, ramię,
+        biodro wybranej strony w pikselach
+    """
+    arrays = np.asarray(arrays, dtype=np.float32)
+    if arrays.ndim == 2:
+        arrays = arrays[None]
+    n = arrays.shape[0]
+
+    scale = np.broadcast_to(np.asarray(frame_size, dtype=np.float32).reshape(-1, 2), (n, 2))
+
+    # (N, 2 strony, 3 punkty, ...)
+    side_xy = arrays[:, SIDE_INDICES, :2] * scale[:, None, None, :]
+    side_vis = np.nan_to_num(arrays[:, SIDE_INDICES, 3], nan=0.0)
+
+    ear, shoulder, hip = side_xy[:, :, 0], side_xy[:, :, 1], side_xy[:, :, 2]
+    visible = np.all(side_vis >= visibility_threshold, axis=2)
+
+    axis = shoulder - hip
+    torso = np.nan_to_num(np.linalg.norm(axis, axis=2))
+    torso = np.where(visible, torso, 0.0)
+
+    side = np.argmax(torso, axis=1)  # remis -> lewa (pierwszy indeks)
+    rows = np.arange(n)
+    torso_len = torso[rows, side]
+    valid = torso_len >= min_torso_len
+
+    chosen_axis = axis[rows, side]
+    to_ear = ear[rows, side] - hip[rows, side]
+    cross = chosen_axis[:, 0] * to_ear[:, 1] - chosen_axis[:, 1] * to_ear[:, 0]
+
+    safe_torso = np.where(valid, torso_len, 1.0)
+    raw_dist = np.where(valid, cross / safe_torso, 0.0)
+    norm_dist = np.abs(raw_dist) / safe_torso
+    offset = np.asarray(offsets, dtype=np.float32)[side] if offsets is not None \
+        else np.zeros(n, dtype=np.float32)
+
+    return {
+        'valid': valid,
+        'is_good': valid & (norm_dist - offset <= threshold),
+        'norm_dist': norm_dist,
+        'offset': offset,
+        'raw_dist': raw_dist,
+        'torso_len': torso_len,
+        'side': side,
+        'points': side_xy[rows, side]
+    }
+
+
+def stack_landmarks(arrays: Sequence[Optional[np.ndarray]]) -> np.ndarray:
+    """Lista tablic (33, 4) albo None -> (N, 33, 4); brak sylwetki = wiersze NaN"""
+    out = np.full((len(arrays), NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for i, array in enumerate(arrays):
+        if array is not None:
+            out[i] = array
+    return out
@@ -1,16 +1,32 @@
 import sys
 import os
+import argparse
+import multiprocessing
 from pathlib import Path
 from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
-from PySide6.QtGui import QIcon, QPixmap, QPainter, QColor, QFont
+import threading
+import time
+from PySide6.QtGui import QIcon, QPixmap, QPainter, QColor, QFont, QImage
 from PySide6.QtQml import QQmlApplicationEngine
+from PySide6.QtQuick import QQuickImageProvider
 from PySide6.QtCore import QObject, Signal, Slot, QTimer, Property, QUrl
-from PySide6.QtMultimedia import QMediaDevices, QCameraDevice
+from PySide6.QtMultimedia import QMediaDevices, QCameraDevice, QVideoFrameFormat
 import cv2
 import numpy as np
-import tempfile
 
-from posture_detector import PostureDetector
+from posture_detector import PostureDetector, POSE_CONNECTIONS
+import backend_calibration
+from capture_thread import CaptureThread, open_capture
+from inference_worker import InferenceWorker, LiveStreamWorker, ProcessInferenceWorker
+from model_registry import VARIANTS as MODEL_VARIANTS, ModelRegistry
+from motion_gate import MotionGate
+from person_tracker import PERSON_MODES
+from posture_baseline import BaselineCollector, BaselineStore, DEFAULT_DURATION as BASELINE_DURATION, \
+    default_baseline_path, personal_limit
+from posture_filter import PostureFilter
+from posture_metrics import METRIC_LABELS, parse_metric_threshold
+from pose_backends import BACKENDS
+from multi_camera import CameraChannel, InferenceScheduler
 from statistics_manager import StatisticsManager
 
 try:
@@ -45,26 +61,136 @@ def create_tray_icon():
     return QIcon(pixmap)
 
 
+def _pixel_format_to_fourcc(pixel_format) -> str:
+    """Mapuje format piksela Qt na kod FOURCC używany przez OpenCV"""
+    mapping = {
+        QVideoFrameFormat.Format_Jpeg: "MJPG",
+        QVideoFrameFormat.Format_YUYV: "YUYV",
+        QVideoFrameFormat.Format_UYVY: "UYVY",
+        QVideoFrameFormat.Format_NV12: "NV12",
+        QVideoFrameFormat.Format_YUV420P: "I420",
+    }
+    return mapping.get(pixel_format, "")
+
+
+def select_camera_format(formats: list, target_width: int, target_height: int,
+                         target_fps: float) -> dict:
+    """
+    Wybiera najmniejszy format spełniający docelową rozdzielczość i FPS
+
+    Przy tej samej rozdzielczości preferowany jest MJPG (mniejsze obciążenie USB).
+    Jeśli żaden format nie spełnia wymagań, zwracany jest najbliższy.
+
+    Args:
+        formats: Lista słowników {'width', 'height', 'max_fps', 'fourcc'}
+    """
+    if not formats:
+        return {}
+
+    def sort_key(f):
+        return (f['width'] * f['height'], 0 if f['fourcc'] == "MJPG" else 1, -f['max_fps'])
+
+    big_enough = [f for f in formats if f['width'] >= target_width and f['height'] >= target_height]
+    fast_enough = [f for f in big_enough if f['max_fps'] >= target_fps]
+
+    if fast_enough:
+        return min(fast_enough, key=sort_key)
+    if big_enough:
+        # Żaden nie osiąga docelowego FPS - weź najszybszy, potem najmniejszy
+        return min(big_enough, key=lambda f: (-f['max_fps'],) + sort_key(f))
+    # Kamera ma tylko mniejsze formaty - weź największy
+    return max(formats, key=lambda f: (f['width'] * f['height'], f['max_fps']))
+
+
+class CameraImageProvider(QQuickImageProvider):
+    """
+    Dostarcza klatki z kamery do QML bez zapisu na dysk
+    Klatka BGR (ndarray) jest opakowywana w QImage bez ponownego kodowania
+    """
+
+    PROVIDER_ID = "camera"
+
+    def __init__(self):
+        super().__init__(QQuickImageProvider.Image)
+        self._lock = threading.Lock()
+        self._frame = None  # Referencja do ndarray - QImage nie kopiuje danych
+        self._image = QImage()
+        self._frame_counter = 0
+
+    def set_frame(self, frame: np.ndarray) -> str:
+        """Ustaw nową klatkę i zwróć URL do użycia w QML"""
+        if not frame.flags['C_CONTIGUOUS']:
+            frame = np.ascontiguousarray(frame)
+
+        h, w = frame.shape[:2]
+        image = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+
+        with self._lock:
+            self._frame = frame
+            self._image = image
+            self._frame_counter += 1
+            counter = self._frame_counter
+
+        return f"image://{self.PROVIDER_ID}/frame?{counter}"
+
+    def clear(self):
+        """Usuń ostatnią klatkę"""
+        with self._lock:
+            self._frame = None
+            self._image = QImage()
+
+    def requestImage(self, image_id, size, requested_size):
+        with self._lock:
+            image = self._image
+            frame = self._frame
+
+        if image.isNull() or frame is None:
+            return QImage()
+
+        if size is not None:
+            size.setWidth(image.width())
+            size.setHeight(image.height())
+
+        if requested_size.isValid() and requested_size.width() > 0 and requested_size.height() > 0:
+            return image.scaled(requested_size)
+
+        # Kopia tylko przy przekazaniu do renderera - ndarray może zostać zwolniony
+        # zanim scenegraph zakończy upload tekstury
+        return image.copy()
+
+
 class CameraManager(QObject):
     frameReady = Signal()
     availableCamerasChanged = Signal()
     cameraErrorOccurred = Signal(str)
 
-    def __init__(self):
+    def __init__(self, target_width: int = 640, target_height: int = 480, target_fps: float = 30,
+                 detect_on_init: bool = True, buffer_pool: bool = False):
         super().__init__()
+        self._buffer_pool = buffer_pool
         self.camera = None
         self.current_frame = None
         self.is_camera_open = False
+        self._capture_thread = None
+        self._frame_size = (0, 0)
         self._available_cameras = []
         self._current_camera_id = 0
         self._current_backend = None
 
-        # Wykryj dostępne kamery przy starcie
-        self._detect_available_cameras()
+        # Docelowy format - wystarczający do estymacji pozy
+        self._target_width = target_width
+        self._target_height = target_height
+        self._target_fps = target_fps
+        self._current_format = {}
+
+        # Wykryj dostępne kamery przy starcie (albo później, np. w tle)
+        if detect_on_init:
+            self._detect_available_cameras()
 
     def _detect_available_cameras(self):
         """Wykrywa dostępne kamery używając Qt QMediaDevices"""
-        self._available_cameras = []
+        # Lista budowana lokalnie i podmieniana na końcu - wykrywanie może iść w tle
+        available_cameras = []
 
         print("\n=== Wykrywanie kamer (Qt QMediaDevices) ===")
 
@@ -85,14 +211,26 @@ class CameraManager(QObject):
                     max_res = max(formats, key=lambda f: f.resolution().width() * f.resolution().height())
                     resolution = f"{max_res.resolution().width()}x{max_res.resolution().height()}"
 
+                video_formats = [
+                    {
+                        'width': f.resolution().width(),
+                        'height': f.resolution().height(),
+                        'min_fps': f.minFrameRate(),
+                        'max_fps': f.maxFrameRate(),
+                        'fourcc': _pixel_format_to_fourcc(f.pixelFormat())
+                    }
+                    for f in formats
+                ]
+
                 camera_info = {
                     'id': idx,  # Indeks dla OpenCV
                     'device_id': device_id,
                     'name': name,
                     'resolution': resolution,
+                    'formats': video_formats,
                     'qt_device': camera_device
                 }
-                self._available_cameras.append(camera_info)
+                available_cameras.append(camera_info)
                 print(f"  [{idx}] {name} - {resolution}")
         else:
             print("  Nie znaleziono zadnych kamer!")
@@ -103,6 +241,7 @@ class CameraManager(QObject):
 
         print("=" * 45)
 
+        self._available_cameras = available_cameras
         self.availableCamerasChanged.emit()
 
     @Slot(result='QVariantList')
@@ -116,39 +255,82 @@ class CameraManager(QObject):
         """Odśwież listę dostępnych kamer"""
         self._detect_available_cameras()
 
+    def use_camera_list(self, cameras: list):
+        """Użyj listy kamer wykrytej przez inny CameraManager (bez ponownego wykrywania)"""
+        self._available_cameras = list(cameras)
+
+    @property
+    def capture_thread(self):
+        """Wątek przechwytywania otwartej kamery (None gdy zamknięta)"""
+        return self._capture_thread
+
+    def set_target_format(self, width: int, height: int, fps: float):
+        """Ustaw docelową rozdzielczość i FPS (zastosowane przy następnym otwarciu)"""
+        self._target_width = width
+        self._target_height = height
+        self._target_fps = fps
+
+    def _apply_format(self, camera_formats: list):
+        """Negocjuje format kamery: najpierw FOURCC, potem rozdzielczość i FPS"""
+        chosen = select_camera_format(camera_formats, self._target_width,
+                                      self._target_height, self._target_fps)
+
+        if chosen:
+            width, height = chosen['width'], chosen['height']
+            fps = min(self._target_fps, chosen['max_fps']) if chosen['max_fps'] > 0 else self._target_fps
+            fourcc = chosen['fourcc']
+        else:
+            # Qt nie podał listy formatów - poproś o cel i przyjmij to, co da sterownik
+            width, height = self._target_width, self._target_height
+            fps = self._target_fps
+            fourcc = "MJPG"
+
+        # V4L2 wymaga ustawienia FOURCC przed rozdzielczością
+        if fourcc == "MJPG":
+            self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.camera.set(cv2.CAP_PROP_FPS, fps)
+
+        self._current_format = {
+            'requested': f"{width}x{height}@{fps:g} {fourcc or '?'}",
+            'width': int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': self.camera.get(cv2.CAP_PROP_FPS) or fps,
+            'fourcc': self._read_fourcc() or fourcc
+        }
+        print(f"  Format: zadany {self._current_format['requested']}, "
+              f"otrzymany {self._current_format['width']}x{self._current_format['height']}"
+              f"@{self._current_format['fps']:g} {self._current_format['fourcc']}")
+
+    def _read_fourcc(self) -> str:
+        code = int(self.camera.get(cv2.CAP_PROP_FOURCC))
+        if code <= 0:
+            return ""
+        return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ")
+
     def open_camera(self, camera_id: int = 0) -> bool:
         """Otwiera kamerę używając OpenCV"""
         self.release()
 
         # Pobierz nazwę kamery
         camera_name = f"Kamera {camera_id}"
+        camera_formats = []
         for cam in self._available_cameras:
             if cam['id'] == camera_id:
                 camera_name = cam['name']
+                camera_formats = cam.get('formats', [])
                 break
 
         print(f"\nOtwieram: {camera_name} (index: {camera_id})...")
 
-        # Wybierz backend w zależności od systemu
-        if sys.platform == 'win32':
-            backend = cv2.CAP_DSHOW
-        elif sys.platform.startswith('linux'):
-            backend = cv2.CAP_V4L2
-        elif sys.platform == 'darwin':
-            backend = cv2.CAP_AVFOUNDATION
-        else:
-            backend = cv2.CAP_ANY
-
         try:
-            self.camera = cv2.VideoCapture(camera_id, backend)
+            # Otwarcie wspólne z trybem bez GUI (backend systemu, potem domyślny);
+            # format negocjowany tutaj według listy formatów z Qt
+            self.camera = open_capture(camera_id, mjpg=False)
 
-            if not self.camera.isOpened():
-                # Sprobuj bez specyficznego backendu
-                print("  Probuje z domyslnym backendem...")
-                self.camera = cv2.VideoCapture(camera_id)
-
-            if self.camera.isOpened():
-                self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            if self.camera is not None:
+                self._apply_format(camera_formats)
 
                 # Kilka prób odczytu
                 for attempt in range(5):
@@ -160,6 +342,14 @@ class CameraManager(QObject):
                         width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH))
                         height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
                         fps = int(self.camera.get(cv2.CAP_PROP_FPS)) or 30
+                        # Rozmiar z faktycznej klatki - niektóre sterowniki raportują co innego
+                        self._frame_size = (frame.shape[1], frame.shape[0])
+                        self._current_format['width'], self._current_format['height'] = self._frame_size
+
+                        # Od teraz kamerą zarządza wątek przechwytywania
+                        self._capture_thread = CaptureThread(self.camera, name=f"Capture-{camera_id}",
+                                                             buffer_pool=self._buffer_pool)
+                        self._capture_thread.start()
 
                         print(f"  [OK] Otwarto! {width}x{height} @ {fps}fps")
                         return True
@@ -175,22 +365,54 @@ class CameraManager(QObject):
         return False
 
     def read_frame(self) -> np.ndarray:
-        if not self.is_camera_open or self.camera is None:
-            return None
-
-        ret, frame = self.camera.read()
-        if ret and frame is not None:
+        """Zwraca najnowszą klatkę z wątku przechwytywania (nie blokuje)"""
+        _, frame, _ = self.read_latest()
+        return frame
+
+    def read_latest(self):
+        """
+        Zwraca (numer_sekwencyjny, klatka, timestamp) najnowszej klatki
+        Numer pozwala pominąć klatkę, która była już przetworzona
+        """
+        if not self.is_camera_open or self._capture_thread is None:
+            return 0, None, 0.0
+
+        seq, frame, timestamp = self._capture_thread.latest()
+        if frame is not None:
             self.current_frame = frame
             self.frameReady.emit()
-            return frame
-        return None
+        return seq, frame, timestamp
+
+    @Slot(result=int)
+    def get_dropped_frames(self) -> int:
+        """Liczba klatek nadpisanych zanim zostały odczytane"""
+        if self._capture_thread is None:
+            return 0
+        return self._capture_thread.dropped_frames
+
+    def get_capture_stats(self) -> dict:
+        """Liczniki wątku przechwytywania"""
+        if self._capture_thread is None:
+            return {'captured': 0, 'dropped': 0, 'read_failures': 0}
+        return self._capture_thread.stats()
 
     def release(self):
-        if self.camera is not None:
+        if self._capture_thread is not None:
+            stats = self._capture_thread.stats()
+            print(f"Przechwytywanie: {stats['captured']} klatek, porzucono {stats['dropped']}")
+            if 'buffer_allocations' in stats:
+                print(f"Bufory klatek: {stats['buffer_allocations']} alokacji, "
+                      f"{stats['buffer_reuses']} ponownych użyć")
+            # Wątek sam zwalnia kamerę po zakończeniu odczytu
+            self._capture_thread.stop()
+            self._capture_thread = None
+        elif self.camera is not None:
             self.camera.release()
-            self.camera = None
+        self.camera = None
+        self.current_frame = None
         self.is_camera_open = False
         self._current_backend = None
+        self._current_format = {}
 
     @Slot(result=str)
     def get_camera_info(self) -> str:
@@ -205,12 +427,17 @@ class CameraManager(QObject):
                 camera_name = cam['name']
                 break
 
-        width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = int(self.camera.get(cv2.CAP_PROP_FPS)) or 30
+        width, height = self._frame_size
+        fmt = self._current_format
+        if fmt:
+            return f"{camera_name} - {width}x{height} @ {fmt['fps']:g}fps {fmt['fourcc']}".rstrip()
 
         return f"{camera_name} - {width}x{height}"
 
+    def get_current_format(self) -> dict:
+        """Zwraca wynegocjowany format aktualnej kamery"""
+        return dict(self._current_format)
+
 
 class PostureMonitor(QObject):
     statusChanged = Signal(str)
@@ -223,9 +450,54 @@ class PostureMonitor(QObject):
     fpsChanged = Signal(int)
     requestMinimizeToTray = Signal()  # Sygnał do minimalizacji okna
     cameraAvailableChanged = Signal(bool)  # Sygnał o dostępności kamery
-
-    def __init__(self, statistics_manager):
+    overlayChanged = Signal()  # Nowe dane nakładki (punkty sylwetki) dla QML
+    detectorReadyChanged = Signal(bool)  # Model postawy załadowany - można monitorować
+    startupTimingsChanged = Signal()
+    skippedTicksChanged = Signal()  # Takt analizy pominięty - poprzednia analiza w toku
+    calibrationChanged = Signal()  # Nowy wynik kalibracji backendu (albo zmiana jej stanu)
+    baselineChanged = Signal()  # Postęp kalibracji osobistej albo nowa linia bazowa
+    _detectorLoaded = Signal(object, float)  # Z wątku ładującego: (detektor, czas_ms)
+    _extraCamerasOpened = Signal(int, object)  # Z wątku otwierania kamer: (generacja, [(id, CameraManager)])
+    _calibrationFinished = Signal()  # Z wątku kalibracji: można uruchomić proces analizy
+    _recalibrationFinished = Signal()  # Z wątku ponownej kalibracji: wznów analizę
+
+    def __init__(self, statistics_manager, inference_mode: str = "thread",
+                 inference_long_edge: int = 480, motion_threshold: float = 4.0,
+                 roi_tracking: bool = False, deferred_init: bool = True,
+                 cpu_budget: float = 0.5, hysteresis: float = 0.02, smoothing: bool = True,
+                 backend: str = "auto", pose_model: str = None,
+                 latency_budget: float = 0.0, recalibrate: bool = False, buffer_pool: bool = False,
+                 num_poses: int = 1, person_mode: str = "primary", metric_thresholds: dict = None):
+        """
+        Args:
+            statistics_manager: Menedżer statystyk sesji
+            inference_mode: 'sync' (wątek GUI), 'thread' (QThread),
+                            'process' (osobny proces + pamięć współdzielona) lub
+                            'live' (tasks API w trybie LIVE_STREAM, wyniki przez callback)
+            inference_long_edge: Dłuższy bok klatki analizowanej przez MediaPipe (0 = pełna)
+            motion_threshold: Próg zmiany obrazu, poniżej którego poprzedni wynik
+                              jest używany ponownie (0 = zawsze analizuj)
+            roi_tracking: Analizuj wycinek wokół sylwetki zamiast całej klatki
+            deferred_init: Ładuj model w tle, a kamery wykryj po pokazaniu okna (watch_window) -
+                           monitoring jest dostępny po sygnale detectorReadyChanged
+            cpu_budget: Ułamek rdzenia na analizę przy monitorowaniu kilku kamer
+            hysteresis: Pas wokół progu - ocena zmienia się dopiero po jego przekroczeniu
+            smoothing: Wygładzaj norm_dist i punkty sylwetki w czasie (One-Euro)
+            backend: Backend wykrywania sylwetki (pose_backends.BACKENDS)
+            pose_model: Plik modelu dla backendu
+            latency_budget: Budżet jednej analizy w ms - przy backendzie 'auto' wybierz
+                            najdokładniejszy model, który się w nim mieści (0 = bez kalibracji)
+            recalibrate: Zmierz ponownie mimo zapisanej kalibracji tej maszyny
+            buffer_pool: Przechwytywanie i przygotowanie klatki do analizy w buforach
+                         wielokrotnego użytku (bez alokacji na klatkę)
+            num_poses: Ile osób wykrywać (> 1: ocena zablokowanej osoby głównej,
+                       przechodzące osoby nie przejmują statystyk)
+            person_mode: 'primary' albo 'all' (osobne wyniki pozostałych osób w bazie)
+            metric_thresholds: Progi metryk posture_metrics (uzupełniają domyślne)
+        """
         super().__init__()
+        self._startup_begin = time.perf_counter()
+        self._startup_timings = {}
         self._is_monitoring = False  # Czy analiza postawy jest wlaczona
         self._is_camera_active = False  # Czy podglad kamery jest wlaczony
         self._auto_minimize_on_start = False  # Czy minimalizować po starcie
@@ -240,23 +512,87 @@ class PostureMonitor(QObject):
         self._analysis_timer = QTimer()
         self._analysis_timer.timeout.connect(self._analyze_posture)
 
-        self.detector = PostureDetector(posture_threshold=0.20)
-        self.camera_manager = CameraManager()
+        self._posture_threshold = 0.20
+        self._detector_kwargs = {
+            'posture_threshold': self._posture_threshold,
+            'inference_long_edge': inference_long_edge or None,
+            'roi_tracking': roi_tracking,
+            'backend': backend,
+            'pose_model': pose_model,
+            'buffer_pool': buffer_pool,
+            'num_poses': num_poses,
+            'person_mode': person_mode,
+            'metric_thresholds': metric_thresholds
+        }
+        self._inference_mode = inference_mode
+        self._latency_budget = latency_budget if backend == "auto" else 0.0
+        self._recalibrate = recalibrate
+        self._calibration = {}
+        self._calibrating = False
+        self._analysis_paused = False  # Analiza wstrzymana na czas ponownej kalibracji
+        self._detector_ready = False
+        self.detector = None
+        self.inference_worker = None
+
+        self._detectorLoaded.connect(self._on_detector_loaded)
+        self._calibrationFinished.connect(self._start_process_worker)
+        self._recalibrationFinished.connect(self._resume_analysis)
+
+        self.camera_manager = CameraManager(detect_on_init=not deferred_init, buffer_pool=buffer_pool)
+        print(f"Tryb analizy: {inference_mode}")
+
+        if inference_mode == "process":
+            if self._latency_budget > 0:
+                # Proces startuje już z wybraną konfiguracją - kalibracja najpierw, w tle
+                threading.Thread(target=self._calibrate_background, name="BackendCalibration", daemon=True).start()
+            else:
+                self._start_process_worker()
+        elif deferred_init:
+            threading.Thread(target=self._load_detector_background, name="DetectorLoader", daemon=True).start()
+        else:
+            start = time.perf_counter()
+            self._on_detector_loaded(self._create_detector(), (time.perf_counter() - start) * 1000)
+
+        # Jednoczesne monitorowanie kilku kamer (dodatkowe kamery obok wybranej)
+        self._monitored_cameras = []
+        self._extra_camera_managers = []
+        self._scheduler = None
+        self._multi_camera_generation = 0  # Otwieranie kamer w tle po zatrzymaniu jest nieaktualne
+        self._cpu_budget = cpu_budget
+        self._extraCamerasOpened.connect(self._on_extra_cameras_opened)
+
+        # Pomijanie analizy, gdy scena się nie zmieniła
+        self.motion_gate = MotionGate(threshold=motion_threshold) if motion_threshold > 0 else None
+        self._pending_signature = None
+        self._busy_skips = 0  # Takty timera pominięte, bo poprzednia analiza jeszcze trwała
+
+        # Wygładzanie wyniku w czasie - ocena i statystyki korzystają z wygładzonego stanu
+        self.posture_filter = PostureFilter(self._posture_threshold, margin=hysteresis,
+                                            max_gap=max(30.0, 3 * self._analysis_interval / 1000)) \
+            if smoothing else None
 
         self.camera_manager.cameraErrorOccurred.connect(self._on_camera_error)
         self.camera_manager.availableCamerasChanged.connect(self._on_cameras_changed)
 
         self.stats_manager = statistics_manager
         self._good_posture_count = 0
+
+        # Osobista linia bazowa (baseline.json obok statistics.db), osobno dla każdej kamery
+        self.baseline_store = BaselineStore(default_baseline_path(statistics_manager.db_path))
+        self._baseline_collector = None
+        self._baseline_seq = 0
+        self._baseline_timer = QTimer()
+        self._baseline_timer.timeout.connect(self._baseline_tick)
         self._bad_posture_count = 0
 
         self._bad_posture_duration = 0
         self._bad_posture_threshold = 30
         self._last_was_bad_posture = False
 
-        self._temp_dir = tempfile.gettempdir()
-        self._camera_snapshot_path = os.path.join(self._temp_dir, "posture_monitor_snapshot.jpg")
+        # Podgląd przekazywany do QML przez image provider (bez plików tymczasowych)
+        self.image_provider = CameraImageProvider()
         self._current_camera_image = ""
+        self._last_preview_seq = 0
 
         self._selected_camera_id = 0
 
@@ -264,11 +600,253 @@ class PostureMonitor(QObject):
         self._last_landmarks = None
         self._last_is_good_posture = True
         self._last_norm_dist = 0.0
+        self._overlay = {}
+
+        # QMediaDevices tylko w wątku GUI: przy deferred_init kamery wykrywane są
+        # po pierwszej wyrenderowanej klatce okna (watch_window), model ładuje się w tle
+        self._deferred_cameras = deferred_init
+        self._watched_window = None
+        self._window_start = self._startup_begin
+        if not deferred_init:
+            # Automatycznie uruchom podglad kamery
+            QTimer.singleShot(500, self._auto_start_preview)
+
+    # ========== START APLIKACJI ==========
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._startup_begin) * 1000
+
+    def _apply_calibration(self, frame_timeout: float = 0.0):
+        """
+        Kalibracja backendu (zapisana albo nowy pomiar) -> ustawienia detektora
+
+        Args:
+            frame_timeout: Ile czekać na klatki z kamery do nowego pomiaru
+                           (0 w wątku GUI - kamera rusza dopiero po starcie)
+        """
+        if self._latency_budget <= 0:
+            return
+        self._calibrating = True
+        self.calibrationChanged.emit()
+        try:
+            inference_long_edge = self._detector_kwargs['inference_long_edge']
+            frames = None
+            if self._recalibrate or backend_calibration.load_cached(self._latency_budget,
+                                                                    inference_long_edge) is None:
+                # Nowy pomiar na klatkach z kamery; bez nich wynik nie zostanie zapisany
+                frames = backend_calibration.collect_frames(self.camera_manager.read_latest,
+                                                            timeout=frame_timeout) or None
+            entry = backend_calibration.calibrate(self._latency_budget, frames, inference_long_edge,
+                                                  force=self._recalibrate)
+            self._detector_kwargs.update(backend_calibration.detector_settings(entry))
+            self._calibration = entry
+            if entry['chosen'] is not None:
+                print(f"Kalibracja: {entry['chosen']['label']} ({entry['chosen']['median_ms']:.1f} ms)")
+        except Exception as e:
+            print(f"Kalibracja nieudana, używam domyślnego backendu: {e}")
+        finally:
+            self._recalibrate = False
+            self._calibrating = False
+            self.calibrationChanged.emit()
+
+    def _calibrate_background(self):
+        start = time.perf_counter()
+        self._apply_calibration(frame_timeout=backend_calibration.STARTUP_FRAME_TIMEOUT)
+        self.record_startup_phase('calibration', (time.perf_counter() - start) * 1000)
+        self._calibrationFinished.emit()
+
+    @Slot()
+    def _start_process_worker(self):
+        """Proces sam ładuje MediaPipe - w GUI detektor nie jest potrzebny"""
+        self.inference_worker = ProcessInferenceWorker(self._detector_kwargs)
+        self.inference_worker.resultReady.connect(self._on_analysis_result)
+        self.inference_worker.ready.connect(self._on_process_ready)
+        self.inference_worker.failed.connect(self._on_detector_failed)
+
+    def _create_detector(self, frame_timeout: float = 0.0):
+        """Tworzy PostureDetector (import MediaPipe, ew. pobranie modelu)"""
+        self._apply_calibration(frame_timeout)
+        kwargs = self._detector_kwargs
+        if self._inference_mode == "live":
+            # Tylko główny detektor działa w LIVE_STREAM - harmonogram kilku kamer
+            # wywołuje analizę synchronicznie i dostaje detektory z _detector_kwargs
+            options = dict(kwargs.get('backend_options') or {}) if kwargs['backend'] == 'mediapipe-tasks' else {}
+            if kwargs['backend'] not in ('auto', 'mediapipe-tasks'):
+                print(f"Tryb live wymaga backendu mediapipe-tasks (zamiast {kwargs['backend']})")
+            options['live_stream'] = True
+            kwargs = dict(kwargs, backend='mediapipe-tasks', backend_options=options)
+        try:
+            return PostureDetector(**kwargs)
+        except Exception as e:
+            print(f"Nie można utworzyć detektora: {e}")
+            return None
 
-        print(f"Snapshot path: {self._camera_snapshot_path}")
+    def _load_detector_background(self):
+        start = time.perf_counter()
+        detector = self._create_detector(frame_timeout=backend_calibration.STARTUP_FRAME_TIMEOUT)
+        # Sygnał z wątku tła trafia do wątku GUI jako połączenie kolejkowane
+        self._detectorLoaded.emit(detector, (time.perf_counter() - start) * 1000)
 
-        # Automatycznie uruchom podglad kamery
-        QTimer.singleShot(500, self._auto_start_preview)
+    def _detect_cameras(self):
+        start = time.perf_counter()
+        self.camera_manager.refresh_cameras()
+        self._on_cameras_detected((time.perf_counter() - start) * 1000)
+
+    def watch_window(self, window, started: float):
+        """Faza 'window' = pierwsza wyrenderowana klatka okna (started - perf_counter startu)"""
+        self._window_start = started
+        if not window.isVisible():
+            # Okno startuje ukryte - nie czekaj na klatkę, której nie będzie
+            self.record_startup_phase('window', (time.perf_counter() - started) * 1000)
+            if self._deferred_cameras:
+                QTimer.singleShot(0, self._detect_cameras)
+            return
+        self._watched_window = window
+        # frameSwapped przychodzi z wątku renderującego - slot obiektu w wątku GUI = kolejkowane
+        window.frameSwapped.connect(self._on_first_frame_swapped)
+
+    @Slot(object, float)
+    def _on_detector_loaded(self, detector, elapsed_ms: float):
+        """Model gotowy (wątek GUI) - przygotuj analizę"""
+        if self._inference_mode != "process":
+            if detector is None:
+                self._on_detector_failed("Nie można zainicjalizować MediaPipe")
+                return
+            self.detector = detector
+            if self._inference_mode == "thread":
+                self.inference_worker = InferenceWorker(self.detector)
+                self.inference_worker.resultReady.connect(self._on_analysis_result)
+            elif self._inference_mode == "live":
+                self.inference_worker = LiveStreamWorker(self.detector)
+                self.inference_worker.resultReady.connect(self._on_analysis_result)
+
+        self._detector_ready = True
+        self._apply_baseline()
+        self.record_startup_phase('detector', elapsed_ms)
+        self.detectorReadyChanged.emit(True)
+        self.statusChanged.emit("Model postawy gotowy")
+
+    @Slot(str)
+    def _on_process_ready(self, api_type: str):
+        """Proces analizy załadował model"""
+        self._on_detector_loaded(None, self._elapsed_ms())
+
+    @Slot(str)
+    def _on_detector_failed(self, error: str):
+        print(f"BŁĄD ładowania detektora: {error}")
+        self.statusChanged.emit(f"Błąd modelu: {error}")
+        self.notificationAdded.emit(f"Błąd modelu: {error}", "teraz", "error")
+        if self._detector_ready:
+            # Proces analizy zakończył się w trakcie pracy - bez niego nie ma analizy
+            self.stopMonitoring()
+            self._detector_ready = False
+            self.detectorReadyChanged.emit(False)
+
+    @Slot()
+    def _on_first_frame_swapped(self):
+        if self._watched_window is None:
+            return
+        self._watched_window.frameSwapped.disconnect(self._on_first_frame_swapped)
+        self._watched_window = None
+        self.record_startup_phase('window', (time.perf_counter() - self._window_start) * 1000)
+        if self._deferred_cameras:
+            # Po powrocie do pętli zdarzeń - okno jest już widoczne
+            QTimer.singleShot(0, self._detect_cameras)
+
+    def _on_cameras_detected(self, elapsed_ms: float):
+        self.record_startup_phase('cameras', elapsed_ms)
+        self._auto_start_preview()
+
+    def record_startup_phase(self, phase: str, elapsed_ms: float):
+        """Zapisz czas fazy startu (ms) i wypisz podsumowanie, gdy start się zakończy"""
+        self._startup_timings[phase] = round(elapsed_ms, 1)
+        print(f"Start: {phase} {elapsed_ms:.0f} ms")
+
+        if all(name in self._startup_timings for name in ('detector', 'cameras')) \
+                and 'ready' not in self._startup_timings:
+            self._startup_timings['ready'] = round(self._elapsed_ms(), 1)
+            print("Czasy startu (ms): " + ", ".join(f"{k}={v}" for k, v in self._startup_timings.items()))
+        self.startupTimingsChanged.emit()
+
+    @Slot(result='QVariantMap')
+    def getStartupTimings(self):
+        """Czasy faz startu w milisekundach"""
+        return dict(self._startup_timings)
+
+    @Property(bool, notify=detectorReadyChanged)
+    def isDetectorReady(self):
+        return self._detector_ready
+
+    @Property('QVariantMap', notify=calibrationChanged)
+    def calibration(self):
+        """Wynik kalibracji backendu dla dialogu ustawień"""
+        entry = self._calibration
+        chosen = entry.get('chosen') or {}
+        return {
+            'enabled': self._latency_budget > 0,
+            'running': self._calibrating,
+            'budget_ms': self._latency_budget,
+            'cached': entry.get('cached', False),
+            'timestamp': entry.get('timestamp', ""),
+            'frames': entry.get('frames', ""),
+            'chosen': chosen.get('label', ""),
+            'chosen_ms': chosen.get('median_ms', 0.0),
+            'within_budget': chosen.get('within_budget', False),
+            'results': [
+                {
+                    'label': r['label'],
+                    'ok': r.get('ok', False),
+                    'median_ms': r.get('median_ms', 0.0),
+                    'within_budget': r.get('ok', False) and r['median_ms'] <= self._latency_budget,
+                    'chosen': r['label'] == chosen.get('label')
+                }
+                for r in entry.get('results', [])
+            ]
+        }
+
+    @Slot()
+    def recalibrate(self):
+        """
+        Nowy pomiar na klatkach z kamery - wybór obowiązuje od następnego uruchomienia
+        Analiza postawy jest wstrzymana na czas pomiaru, żeby nie zawyżała czasów
+        """
+        if self._latency_budget <= 0 or self._calibrating:
+            return
+        self._calibrating = True
+        self.calibrationChanged.emit()
+        self._pause_analysis()
+        threading.Thread(target=self._recalibrate_background, name="BackendCalibration", daemon=True).start()
+
+    def _recalibrate_background(self):
+        try:
+            frames = backend_calibration.collect_frames(self.camera_manager.read_latest) \
+                if self._is_camera_active else None
+            self._calibration = backend_calibration.calibrate(
+                self._latency_budget, frames, self._detector_kwargs['inference_long_edge'], force=True)
+            self.notificationAdded.emit("Kalibracja zakończona - nowy model od następnego uruchomienia",
+                                        "teraz", "success")
+        except Exception as e:
+            print(f"Kalibracja nieudana: {e}")
+        finally:
+            self._calibrating = False
+            self.calibrationChanged.emit()
+            self._recalibrationFinished.emit()
+
+    def _pause_analysis(self):
+        """Wstrzymaj analizę (timer i harmonogram kilku kamer) bez kończenia sesji"""
+        self._analysis_paused = True
+        self._analysis_timer.stop()
+        if self._scheduler is not None:
+            self._scheduler.pause()
+
+    @Slot()
+    def _resume_analysis(self):
+        self._analysis_paused = False
+        if not self._is_monitoring:
+            return
+        if self._scheduler is not None:
+            self._scheduler.resume()
+        self._analysis_timer.start(self._analysis_interval)
 
     def _on_camera_error(self, error_msg: str):
         """Obsluga bledow kamery"""
@@ -311,6 +889,53 @@ class PostureMonitor(QObject):
     def previewFps(self):
         return self._preview_fps
 
+    @Property(int, notify=skippedTicksChanged)
+    def skippedTicks(self):
+        """Takty analizy w tej sesji pominięte, bo poprzednia analiza jeszcze trwała"""
+        return self._busy_skips
+
+    @Property('QVariantMap', notify=overlayChanged)
+    def overlay(self):
+        """Dane do rysowania sylwetki i statusu w QML nad surowym obrazem"""
+        return self._overlay
+
+    @Property('QVariantList', constant=True)
+    def poseConnections(self):
+        return [list(pair) for pair in POSE_CONNECTIONS]
+
+    def _update_overlay(self):
+        """Zbuduj dane nakładki z ostatniego wyniku analizy"""
+        if not self._is_monitoring:
+            self._overlay = {}
+            self.overlayChanged.emit()
+            return
+
+        landmarks = self._last_landmarks
+        overlay = {
+            'detected': landmarks is not None,
+            'isGood': self._last_is_good_posture,
+            'normDist': self._last_norm_dist,
+            'threshold': self._posture_threshold
+        }
+
+        if landmarks is not None:
+            w, h = landmarks.get('frame_size', (1, 1))
+            camera_id = landmarks.get('camera_id', self._selected_camera_id)
+            # Sylwetkę rysujemy tylko, gdy wynik pochodzi z kamery widocznej w podglądzie
+            overlay['skeleton'] = camera_id == self._selected_camera_id
+            if self._scheduler is not None:
+                overlay['cameraId'] = camera_id
+            overlay.update({
+                'points': landmarks.get('points', []),
+                'side': landmarks.get('used_side', 'LEFT'),
+                'shoulder': [float(landmarks['shoulder'][0]) / w, float(landmarks['shoulder'][1]) / h],
+                'hip': [float(landmarks['hip'][0]) / w, float(landmarks['hip'][1]) / h],
+                'ear': [float(landmarks['ear'][0]) / w, float(landmarks['ear'][1]) / h]
+            })
+
+        self._overlay = overlay
+        self.overlayChanged.emit()
+
     # ========== PODGLAD KAMERY (ciagly) ==========
 
     @Slot()
@@ -345,6 +970,7 @@ class PostureMonitor(QObject):
 
         print("Zatrzymuje podglad...")
         self._preview_timer.stop()
+        self._cancel_baseline_calibration()
 
         # Jesli monitoring tez jest wlaczony, zatrzymaj go
         if self._is_monitoring:
@@ -359,31 +985,14 @@ class PostureMonitor(QObject):
         if not self._is_camera_active:
             return
 
-        frame = self.camera_manager.read_frame()
-        if frame is None:
+        seq, frame, _ = self.camera_manager.read_latest()
+        if frame is None or seq == self._last_preview_seq:
             return
+        self._last_preview_seq = seq
 
-        display_frame = frame.copy()
-
-        # Jesli analiza wlaczona i mamy landmarks - rysuj je
-        if self._is_monitoring and self._last_landmarks is not None:
-            display_frame = self.detector.draw_landmarks(
-                display_frame, self._last_is_good_posture,
-                self._last_norm_dist, self._last_landmarks
-            )
-        elif self._is_monitoring and self._last_landmarks is None:
-            # Analiza wlaczona ale nie wykryto osoby
-            cv2.putText(display_frame, "NIE WYKRYTO OSOBY",
-                        (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-
-        try:
-            cv2.imwrite(self._camera_snapshot_path, display_frame)
-            import time
-            path_for_url = self._camera_snapshot_path.replace("\\", "/")
-            self._current_camera_image = f"file:///{path_for_url}?t={int(time.time() * 1000)}"
-            self.cameraImageChanged.emit(self._current_camera_image)
-        except:
-            pass
+        # Surowa klatka bez kopii - sylwetkę i status rysuje QML (właściwość overlay)
+        self._current_camera_image = self.image_provider.set_frame(frame)
+        self.cameraImageChanged.emit(self._current_camera_image)
 
     # ========== ANALIZA POSTAWY (monitoring) ==========
 
@@ -392,6 +1001,10 @@ class PostureMonitor(QObject):
         """Uruchom analize postawy (wymaga aktywnego podgladu)"""
         print("Rozpoczynam monitoring postawy...")
 
+        if not self._detector_ready:
+            self.statusChanged.emit("Model postawy jeszcze się ładuje")
+            return
+
         # Jesli podglad nie jest aktywny, uruchom go
         if not self._is_camera_active:
             self.startPreview()
@@ -401,7 +1014,20 @@ class PostureMonitor(QObject):
         if self._is_monitoring:
             return
 
+        if self._baseline_collector is not None:
+            self.statusChanged.emit("Trwa kalibracja postawy")
+            return
+
+        if self._analysis_paused:
+            self.statusChanged.emit("Trwa kalibracja backendu")
+            return
+
         self.stats_manager.start_session()
+        self._busy_skips = 0
+        self.skippedTicksChanged.emit()
+
+        if self._monitored_cameras:
+            self._start_multi_camera()
 
         self._is_monitoring = True
         self._analysis_timer.start(self._analysis_interval)
@@ -434,28 +1060,96 @@ class PostureMonitor(QObject):
         self._last_landmarks = None
         self._last_is_good_posture = True
         self._last_norm_dist = 0.0
+        self._update_overlay()
+        self._stop_multi_camera()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        self._pending_signature = None
+        if self.posture_filter is not None:
+            self.posture_filter.reset()
+        if self.detector is not None and self.detector.buffer_stats():
+            stats = self.detector.buffer_stats()
+            print(f"Bufory analizy: {stats['allocations']} alokacji, {stats['reuses']} ponownych użyć")
 
         self.stats_manager.end_session()
 
     def _analyze_posture(self):
         """Analizuj postawe (wywolywane przez timer)"""
-        if not self._is_monitoring or not self._is_camera_active:
+        if not self._is_monitoring or not self._is_camera_active or not self._detector_ready \
+                or self._analysis_paused:
             return
 
-        frame = self.camera_manager.read_frame()
+        _, frame, capture_time = self.camera_manager.read_latest()
         if frame is None:
             return
+        # Czas przechwycenia z CaptureThread (zegar monotoniczny) - rosnący znacznik dla MediaPipe
+        timestamp_ms = int(capture_time * 1000)
+
+        if self._scheduler is not None:
+            # Kilka kamer - harmonogram analizuje w tle, tu tylko fuzja wyników
+            if self._scheduler.total_inferences() == 0:
+                return
+            self._handle_analysis_result(*self._scheduler.fused_result())
+            return
+
+        signature = None
+        if self.motion_gate is not None:
+            cached, signature = self.motion_gate.check(frame)
+            if cached is not None:
+                # Scena bez zmian - użyj poprzedniego wyniku zamiast MediaPipe
+                self._handle_analysis_result(*cached, reused=True)
+                return
+
+        if self.inference_worker is not None:
+            # Wynik przyjdzie sygnałem; gdy poprzednia analiza trwa, klatka jest pomijana
+            if self.inference_worker.submit(frame, timestamp_ms):
+                self._pending_signature = signature
+            else:
+                self._busy_skips += 1
+                self.skippedTicksChanged.emit()
+            return
 
         # Analizuj postawe
-        is_good_posture, norm_dist, landmarks = self.detector.analyze_posture(frame)
+        is_good_posture, norm_dist, landmarks = self.detector.analyze_posture(frame, timestamp_ms)
+        self._pending_signature = signature
+        self._handle_analysis_result(is_good_posture, norm_dist, landmarks)
+
+    @Slot(bool, float, object)
+    def _on_analysis_result(self, is_good_posture: bool, norm_dist: float, landmarks):
+        """Wynik analizy z wątku roboczego"""
+        if self._baseline_collector is not None:
+            self._collect_baseline(norm_dist, landmarks)
+            return
+        # Wynik mógł dotrzeć już po zatrzymaniu monitoringu
+        if not self._is_monitoring:
+            return
+        self._handle_analysis_result(is_good_posture, norm_dist, landmarks)
+
+    def _handle_analysis_result(self, is_good_posture: bool, norm_dist: float, landmarks,
+                                reused: bool = False):
+        """Zapisz wynik analizy, zaktualizuj statystyki i powiadomienia"""
+        if not reused and self.motion_gate is not None:
+            self.motion_gate.store_result(self._pending_signature, (is_good_posture, norm_dist, landmarks))
+            self._pending_signature = None
+
+        # Surowy wynik zostaje w bazie obok wygładzonego
+        raw_norm_dist = norm_dist
+        if self.posture_filter is not None and landmarks is not None:
+            is_good_posture, norm_dist, landmarks = self.posture_filter.update(norm_dist, landmarks)
 
         # Zapisz wyniki do wyswietlania na podgladzie
         self._last_landmarks = landmarks
         self._last_is_good_posture = is_good_posture
         self._last_norm_dist = norm_dist
+        self._update_overlay()
 
         detection_successful = landmarks is not None
-        self.stats_manager.add_check(is_good_posture, norm_dist, detection_successful)
+        self.stats_manager.add_check(is_good_posture, norm_dist, detection_successful, reused,
+                                     raw_coefficient=raw_norm_dist,
+                                     metrics=landmarks.get('metrics') if detection_successful else None,
+                                     failed_metrics=landmarks.get('failed_metrics') if detection_successful else None,
+                                     person_id=landmarks.get('person_id') if detection_successful else None,
+                                     people=landmarks.get('people') if detection_successful and not reused else None)
 
         # Logika licznika zlej postawy
         if not detection_successful:
@@ -477,13 +1171,223 @@ class PostureMonitor(QObject):
             self.notificationAdded.emit("Nie wykryto osoby", "teraz", "warning")
             return
 
+        # Metryki poza progiem (kąt szyi, barki...) - także przy dobrym norm_dist
+        problems = ", ".join(METRIC_LABELS.get(name, name) for name in landmarks.get('failed_metrics') or [])
         if is_good_posture:
             self._good_posture_count += 1
-            self.notificationAdded.emit(f"Dobra postawa ({norm_dist:.3f})", "teraz", "success")
+            if problems:
+                self.notificationAdded.emit(f"Dobra postawa ({norm_dist:.3f}), ale: {problems}", "teraz", "warning")
+            else:
+                self.notificationAdded.emit(f"Dobra postawa ({norm_dist:.3f})", "teraz", "success")
         else:
             self._bad_posture_count += 1
-            self.notificationAdded.emit(f"Zla postawa ({norm_dist:.3f})", "teraz", "warning")
+            suffix = f" - {problems}" if problems else ""
+            self.notificationAdded.emit(f"Zla postawa ({norm_dist:.3f}){suffix}", "teraz", "warning")
     
+    # ========== KALIBRACJA OSOBISTA (linia bazowa) ==========
+
+    def _set_detector_baseline(self, baseline):
+        if self._inference_mode == "process":
+            if self.inference_worker is not None:
+                self.inference_worker.set_baseline(baseline)
+        elif self.detector is not None:
+            self.detector.set_baseline(baseline)
+
+    def _discard_pending_results(self):
+        """Wyniki analiz zleconych do tej pory nie wrócą do _on_analysis_result"""
+        if self.inference_worker is not None:
+            self.inference_worker.discard_pending()
+
+    def _apply_baseline(self):
+        """Linia bazowa wybranej kamery -> detektor; wcześniejsze wyniki są w innej skali"""
+        self._set_detector_baseline(self.baseline_store.get(self._selected_camera_id))
+        self._discard_pending_results()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        if self.posture_filter is not None:
+            self.posture_filter.reset()
+        self.baselineChanged.emit()
+
+    @Property('QVariantMap', notify=baselineChanged)
+    def baseline(self):
+        """Stan kalibracji osobistej wybranej kamery dla dialogu ustawień"""
+        entry = self.baseline_store.get(self._selected_camera_id) or {}
+        collector = self._baseline_collector
+        return {
+            'running': collector is not None,
+            'progress': collector.progress if collector is not None else 0.0,
+            'samples': collector.samples if collector is not None else 0,
+            'camera': self._selected_camera_id,
+            'calibrated': bool(entry),
+            'timestamp': entry.get('timestamp', ""),
+            'sides': [
+                {
+                    'side': side,
+                    'median': stats['median'],
+                    'mad': stats['mad'],
+                    'limit': round(personal_limit(stats), 3),
+                    'samples': stats['samples']
+                }
+                for side, stats in sorted(entry.get('sides', {}).items())
+            ]
+        }
+
+    @Slot(int)
+    def startBaselineCalibration(self, seconds: int):
+        """Zbieraj norm_dist przez podany czas, gdy użytkownik siedzi prosto"""
+        if self._baseline_collector is not None:
+            return
+        if not self._detector_ready or not self._is_camera_active:
+            self.statusChanged.emit("Kalibracja wymaga gotowego modelu i włączonej kamery")
+            return
+        if self._is_monitoring:
+            self.statusChanged.emit("Zatrzymaj monitoring przed kalibracją")
+            return
+
+        # Analiza zlecona przed kalibracją (np. tuż przed zatrzymaniem monitoringu) nie jest pomiarem
+        self._discard_pending_results()
+        self._baseline_collector = BaselineCollector(seconds if seconds > 0 else BASELINE_DURATION)
+        self._baseline_seq = 0
+        self._baseline_timer.start(300)
+        self.statusChanged.emit("Kalibracja: usiądź prosto i patrz w ekran")
+        self.baselineChanged.emit()
+
+    @Slot()
+    def clearBaseline(self):
+        """Usuń linię bazową wybranej kamery (powrót do globalnego progu)"""
+        if self.baseline_store.remove(self._selected_camera_id):
+            self._apply_baseline()
+            self.notificationAdded.emit("Usunięto kalibrację postawy", "teraz", "success")
+
+    def _baseline_tick(self):
+        collector = self._baseline_collector
+        if collector is None:
+            self._baseline_timer.stop()
+            return
+        if collector.done:
+            self._finish_baseline_calibration()
+            return
+        self.baselineChanged.emit()
+
+        seq, frame, capture_time = self.camera_manager.read_latest()
+        if frame is None or seq == self._baseline_seq:
+            return
+        self._baseline_seq = seq
+        timestamp_ms = int(capture_time * 1000)
+
+        if self.inference_worker is not None:
+            # Wynik wróci przez _on_analysis_result; zajęty worker pomija klatkę
+            self.inference_worker.submit(frame, timestamp_ms)
+            return
+        _, norm_dist, landmarks = self.detector.analyze_posture(frame, timestamp_ms)
+        self._collect_baseline(norm_dist, landmarks)
+
+    def _collect_baseline(self, norm_dist: float, landmarks):
+        self._baseline_collector.add(norm_dist, landmarks.get('used_side') if landmarks else None)
+
+    def _finish_baseline_calibration(self):
+        collector = self._baseline_collector
+        self._baseline_timer.stop()
+        self._baseline_collector = None
+
+        entry = collector.result()
+        if entry is None:
+            self.notificationAdded.emit(
+                f"Kalibracja nieudana - za mało pomiarów ({collector.samples}, bez sylwetki: {collector.missed})",
+                "teraz", "error")
+        else:
+            self.baseline_store.save(self._selected_camera_id, entry)
+            sides = ", ".join(f"{side} {stats['median']:.3f}" for side, stats in sorted(entry['sides'].items()))
+            print(f"Linia bazowa kamery {self._selected_camera_id}: {sides}")
+            self.notificationAdded.emit("Kalibracja postawy zapisana", "teraz", "success")
+        # Nowa albo (po nieudanej kalibracji) poprzednia linia bazowa
+        self._apply_baseline()
+
+    def _cancel_baseline_calibration(self):
+        if self._baseline_collector is None:
+            return
+        self._baseline_timer.stop()
+        self._baseline_collector = None
+        self._apply_baseline()
+
+    # ========== WIELE KAMER ==========
+
+    def _start_multi_camera(self):
+        """Otwórz dodatkowe kamery w tle; harmonogram rusza po ich otwarciu"""
+        extra_ids = [cid for cid in self._monitored_cameras if cid != self._selected_camera_id]
+        if not extra_ids or self.camera_manager.capture_thread is None:
+            return
+
+        # Obiekty Qt tworzone w wątku GUI, w tle tylko blokujące otwieranie przez OpenCV
+        managers = []
+        for camera_id in extra_ids:
+            manager = CameraManager(detect_on_init=False, buffer_pool=self._detector_kwargs['buffer_pool'])
+            manager.use_camera_list(self.camera_manager._available_cameras)
+            manager.cameraErrorOccurred.connect(self._on_camera_error)
+            managers.append((camera_id, manager))
+
+        self._multi_camera_generation += 1
+        threading.Thread(target=self._open_extra_cameras, args=(self._multi_camera_generation, managers),
+                         name="MultiCameraOpener", daemon=True).start()
+
+    def _open_extra_cameras(self, generation: int, managers: list):
+        opened = [(camera_id, manager) for camera_id, manager in managers if manager.open_camera(camera_id)]
+        self._extraCamerasOpened.emit(generation, opened)
+
+    @Slot(int, object)
+    def _on_extra_cameras_opened(self, generation: int, opened: list):
+        """Kamery otwarte (wątek GUI) - uruchom wspólny harmonogram analizy"""
+        if generation != self._multi_camera_generation or not self._is_monitoring \
+                or self.camera_manager.capture_thread is None:
+            # Monitoring zatrzymany albo zmieniona kamera w trakcie otwierania
+            for _, manager in opened:
+                manager.release()
+            return
+
+        # Wybrana kamera dzieli wątek przechwytywania z podglądem
+        channels = [CameraChannel(self._selected_camera_id, self.camera_manager.capture_thread)]
+        for camera_id, manager in opened:
+            self._extra_camera_managers.append(manager)
+            channels.append(CameraChannel(camera_id, manager.capture_thread))
+
+        if len(channels) < 2:
+            self._stop_multi_camera()
+            return
+
+        self._scheduler = InferenceScheduler(
+            channels,
+            detector_factory=lambda camera_id: PostureDetector(
+                **self._detector_kwargs, baseline=self.baseline_store.get(camera_id)),
+            cpu_budget=self._cpu_budget,
+            result_max_age=max(15.0, 3 * self._analysis_interval / 1000)
+        )
+        if self._analysis_paused:
+            self._scheduler.pause()
+        self._scheduler.start()
+        print(f"Monitoring {len(channels)} kamer (budżet CPU: {self._cpu_budget:.0%})")
+
+    def _stop_multi_camera(self):
+        self._multi_camera_generation += 1
+        if self._scheduler is not None:
+            for entry in self._scheduler.stats():
+                print(f"  Kamera {entry['camera_id']}: {entry['inferences']} analiz, "
+                      f"{entry['inference_ms']} ms/analizę")
+            self._scheduler.stop()
+            self._scheduler = None
+        for manager in self._extra_camera_managers:
+            manager.release()
+        self._extra_camera_managers = []
+
+    @Slot('QVariantList')
+    def setMonitoredCameras(self, camera_ids):
+        """Ustaw kamery monitorowane jednocześnie (zastosowane przy następnym starcie analizy)"""
+        self._monitored_cameras = [int(cid) for cid in camera_ids]
+        print(f"Kamery monitorowane jednocześnie: {self._monitored_cameras or 'tylko wybrana'}")
+
+    @Slot(result='QVariantList')
+    def getMonitoredCameras(self):
+        return list(self._monitored_cameras)
+
     @Slot(int)
     def setPreviewFps(self, fps: int):
         """Ustaw FPS podgladu (30, 20, 10, 5, 1)"""
@@ -500,6 +1404,8 @@ class PostureMonitor(QObject):
         """Ustaw interwal analizy postawy"""
         self._analysis_interval = seconds * 1000
         print(f"Interwal analizy: {seconds}s")
+        if self.posture_filter is not None:
+            self.posture_filter.max_gap = max(30.0, 3 * seconds)
         if self._is_monitoring:
             self._analysis_timer.setInterval(self._analysis_interval)
 
@@ -525,6 +1431,8 @@ class PostureMonitor(QObject):
 
         self._selected_camera_id = camera_id
         print(f"Wybrano kamere: {camera_id}")
+        self._cancel_baseline_calibration()
+        self._apply_baseline()
 
         # Restartuj podglad z nowa kamera
         if self._is_camera_active:
@@ -566,22 +1474,64 @@ class PostureMonitor(QObject):
         print("Sprzatanie PostureMonitor...")
         self.stopMonitoring()
         self.stopPreview()
-        self.detector.release()
-
-        if os.path.exists(self._camera_snapshot_path):
-            try:
-                os.remove(self._camera_snapshot_path)
-            except:
-                pass
+        if self.inference_worker is not None:
+            self.inference_worker.stop()
+        if self.detector is not None:
+            self.detector.release()
+        self.image_provider.clear()
 
 
 def main():
+    app_start = time.perf_counter()
     print("=" * 60)
     print("Monitor Postawy - Z ROZBUDOWANYMI STATYSTYKAMI")
     print("=" * 60)
 
+    parser = argparse.ArgumentParser(description="Monitor Postawy")
+    parser.add_argument("--inference", choices=["sync", "thread", "process", "live"], default="thread",
+                        help="Gdzie uruchamiać analizę postawy (domyślnie: thread; "
+                             "live = tasks API w trybie LIVE_STREAM)")
+    parser.add_argument("--inference-size", type=int, default=480,
+                        help="Dłuższy bok klatki dla MediaPipe w pikselach (0 = pełna rozdzielczość)")
+    parser.add_argument("--motion-threshold", type=float, default=4.0,
+                        help="Próg zmiany obrazu dla pominięcia analizy (0 = zawsze analizuj)")
+    parser.add_argument("--roi", action="store_true",
+                        help="Analizuj tylko obszar wokół ostatnio wykrytej sylwetki")
+    parser.add_argument("--cameras", default="",
+                        help="Kamery monitorowane jednocześnie, np. 0,2")
+    parser.add_argument("--cpu-budget", type=float, default=0.5,
+                        help="Ułamek rdzenia na analizę przy wielu kamerach")
+    parser.add_argument("--camera-resolution", default="640x480",
+                        help="Docelowa rozdzielczość kamery, np. 640x480")
+    parser.add_argument("--camera-fps", type=float, default=30,
+                        help="Docelowy FPS kamery")
+    parser.add_argument("--hysteresis", type=float, default=0.02,
+                        help="Pas wokół progu garbienia, w którym ocena się nie zmienia")
+    parser.add_argument("--no-smoothing", action="store_true",
+                        help="Oceniaj każdą analizę osobno (bez wygładzania i histerezy)")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto",
+                        help="Backend wykrywania sylwetki (domyślnie MediaPipe)")
+    parser.add_argument("--pose-model", help="Plik modelu dla backendu (.task, .onnx)")
+    parser.add_argument("--latency-budget", type=float, default=0.0,
+                        help="Wybierz najdokładniejszy model mieszczący się w tylu ms na analizę "
+                             "(kalibracja przy pierwszym uruchomieniu, 0 = wyłączone)")
+    parser.add_argument("--recalibrate", action="store_true",
+                        help="Powtórz kalibrację mimo zapisanego wyniku")
+    parser.add_argument("--buffer-pool", action="store_true",
+                        help="Klatki w buforach wielokrotnego użytku (bez alokacji na klatkę)")
+    parser.add_argument("--max-people", type=int, default=1,
+                        help="Wykrywaj do tylu osób (mediapipe-tasks) - oceniana jest zablokowana osoba główna")
+    parser.add_argument("--person-mode", choices=PERSON_MODES, default="primary",
+                        help="primary - tylko osoba główna, all - także osobne statystyki pozostałych osób")
+    parser.add_argument("--metric-threshold", type=parse_metric_threshold, action="append", default=[],
+                        help="Próg metryki nazwa=wartość, np. neck_angle=45 (można powtarzać)")
+    parser.add_argument("--prefetch-models", metavar="WARIANTY",
+                        help="Pobierz w tle brakujące modele tasks, np. lite,full "
+                             "(dostępne od następnego uruchomienia)")
+    args, qt_args = parser.parse_known_args()
+
     # Używamy QApplication zamiast QGuiApplication dla System Tray
-    app = QApplication(sys.argv)
+    app = QApplication([sys.argv[0]] + qt_args)
     app.setApplicationName("Posture Monitor")
     app.setQuitOnLastWindowClosed(False)  # Nie zamykaj gdy okno jest ukryte
 
@@ -589,13 +1539,39 @@ def main():
     statistics_manager = StatisticsManager()
 
     # Monitor postawy
-    posture_monitor = PostureMonitor(statistics_manager)
+    posture_monitor = PostureMonitor(statistics_manager, inference_mode=args.inference,
+                                     inference_long_edge=args.inference_size,
+                                     motion_threshold=args.motion_threshold,
+                                     roi_tracking=args.roi,
+                                     cpu_budget=args.cpu_budget,
+                                     hysteresis=args.hysteresis,
+                                     smoothing=not args.no_smoothing,
+                                     backend=args.backend,
+                                     pose_model=args.pose_model,
+                                     latency_budget=args.latency_budget,
+                                     recalibrate=args.recalibrate,
+                                     buffer_pool=args.buffer_pool,
+                                     num_poses=args.max_people,
+                                     person_mode=args.person_mode,
+                                     metric_thresholds=dict(args.metric_threshold))
+    if args.prefetch_models:
+        variants = [v.strip() for v in args.prefetch_models.split(",") if v.strip() in MODEL_VARIANTS]
+        # Jedyne użycie sieci - w tle, start aplikacji na nie nie czeka
+        ModelRegistry().prefetch_async(variants)
+    if args.cameras:
+        posture_monitor.setMonitoredCameras([int(c) for c in args.cameras.split(",") if c.strip()])
+    try:
+        target_width, target_height = (int(v) for v in args.camera_resolution.lower().split("x"))
+        posture_monitor.camera_manager.set_target_format(target_width, target_height, args.camera_fps)
+    except ValueError:
+        print(f"Niepoprawna rozdzielczość: {args.camera_resolution}, używam domyślnej")
 
     # QML Engine
     engine = QQmlApplicationEngine()
     root_context = engine.rootContext()
     root_context.setContextProperty("postureMonitor", posture_monitor)
     root_context.setContextProperty("statisticsManager", statistics_manager)
+    engine.addImageProvider(CameraImageProvider.PROVIDER_ID, posture_monitor.image_provider)
 
     # Załaduj QML
     qml_file = Path(__file__).resolve().parent / "main_advanced_stats.qml"
@@ -609,13 +1585,17 @@ def main():
         return 1
 
     print(f"Ladowanie QML z: {qml_file}")
+    qml_start = time.perf_counter()
     engine.load(QUrl.fromLocalFile(str(qml_file)))
 
     if not engine.rootObjects():
         print("Nie mozna zaladowac QML")
         return 1
 
+    posture_monitor.record_startup_phase('qml_load', (time.perf_counter() - qml_start) * 1000)
+
     root = engine.rootObjects()[0]
+    posture_monitor.watch_window(root, app_start)
     root.setProperty("closeOnExit", False)  # Domyślnie ukryj zamiast zamykać
 
     # ============================================
@@ -675,4 +1655,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     sys.exit(main())
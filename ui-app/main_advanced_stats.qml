@@ -423,6 +423,129 @@ ApplicationWindow {
                                     asynchronous: false
                                     visible: postureMonitor.cameraImage !== ""
                                 }
+
+                                // Nakładka z sylwetką i statusem - rysowana z danych, nie na klatce
+                                Canvas {
+                                    id: postureOverlay
+                                    anchors.fill: cameraImage
+                                    visible: cameraImage.visible && isMonitoring
+                                    renderStrategy: Canvas.Cooperative
+
+                                    property var overlay: postureMonitor.overlay
+                                    property var connections: postureMonitor.poseConnections
+
+                                    onOverlayChanged: requestPaint()
+                                    onWidthChanged: requestPaint()
+                                    onHeightChanged: requestPaint()
+
+                                    Connections {
+                                        target: cameraImage
+                                        function onPaintedWidthChanged() { postureOverlay.requestPaint() }
+                                        function onPaintedHeightChanged() { postureOverlay.requestPaint() }
+                                    }
+
+                                    onPaint: {
+                                        var ctx = getContext("2d")
+                                        ctx.reset()
+
+                                        if (!overlay || overlay.detected === undefined)
+                                            return
+
+                                        // Obszar faktycznie zajmowany przez obraz (PreserveAspectFit)
+                                        var pw = cameraImage.paintedWidth
+                                        var ph = cameraImage.paintedHeight
+                                        var ox = (width - pw) / 2
+                                        var oy = (height - ph) / 2
+
+                                        function px(p) { return ox + p[0] * pw }
+                                        function py(p) { return oy + p[1] * ph }
+
+                                        if (!overlay.detected) {
+                                            ctx.fillStyle = "#ff0000"
+                                            ctx.font = "bold 18px sans-serif"
+                                            ctx.fillText("NIE WYKRYTO OSOBY", ox + 15, oy + 30)
+                                            return
+                                        }
+
+                                        var color = overlay.isGood ? "#00ff00" : "#ff0000"
+                                        var points = overlay.points || []
+
+                                        // Wynik z innej kamery - w podglądzie tylko status
+                                        if (overlay.skeleton) {
+                                            // Szkielet
+                                            ctx.strokeStyle = "#c8c8c8"
+                                            ctx.lineWidth = 2
+                                            ctx.beginPath()
+                                            for (var i = 0; i < connections.length; i++) {
+                                                var a = points[connections[i][0]]
+                                                var b = points[connections[i][1]]
+                                                if (!a || !b || a[2] < 0.5 || b[2] < 0.5)
+                                                    continue
+                                                ctx.moveTo(px(a), py(a))
+                                                ctx.lineTo(px(b), py(b))
+                                            }
+                                            ctx.stroke()
+
+                                            ctx.fillStyle = color
+                                            for (var j = 0; j < points.length; j++) {
+                                                if (points[j][2] < 0.5)
+                                                    continue
+                                                ctx.beginPath()
+                                                ctx.arc(px(points[j]), py(points[j]), 3, 0, 2 * Math.PI)
+                                                ctx.fill()
+                                            }
+
+                                            // Punkty użyte do oceny postawy
+                                            var shoulder = overlay.shoulder
+                                            var hip = overlay.hip
+                                            var ear = overlay.ear
+
+                                            ctx.lineWidth = 4
+                                            ctx.strokeStyle = color
+                                            ctx.beginPath()
+                                            ctx.moveTo(px(hip), py(hip))
+                                            ctx.lineTo(px(shoulder), py(shoulder))
+                                            ctx.stroke()
+
+                                            ctx.lineWidth = 2
+                                            ctx.strokeStyle = "#ffff00"
+                                            ctx.beginPath()
+                                            ctx.moveTo(px(shoulder), py(shoulder))
+                                            ctx.lineTo(px(ear), py(ear))
+                                            ctx.stroke()
+
+                                            ctx.lineWidth = 3
+                                            var marked = [[shoulder, color], [hip, color], [ear, "#ffff00"]]
+                                            for (var k = 0; k < marked.length; k++) {
+                                                ctx.strokeStyle = marked[k][1]
+                                                ctx.beginPath()
+                                                ctx.arc(px(marked[k][0]), py(marked[k][0]), 10, 0, 2 * Math.PI)
+                                                ctx.stroke()
+                                            }
+                                        }
+
+                                        // Ramka ze statusem
+                                        ctx.fillStyle = "#000000"
+                                        ctx.fillRect(ox + 10, oy + 10, 300, 80)
+                                        ctx.strokeStyle = color
+                                        ctx.lineWidth = 2
+                                        ctx.strokeRect(ox + 10, oy + 10, 300, 80)
+
+                                        ctx.fillStyle = color
+                                        ctx.font = "bold 18px sans-serif"
+                                        ctx.fillText("Postawa: " + (overlay.isGood ? "WYPROSTOWANY" : "ZGARBIONY"), ox + 20, oy + 36)
+
+                                        ctx.fillStyle = "#ffffff"
+                                        ctx.font = "13px sans-serif"
+                                        ctx.fillText("Wskaznik: " + overlay.normDist.toFixed(3) + " (prog: " + overlay.threshold + ")", ox + 20, oy + 60)
+
+                                        ctx.fillStyle = "#b4b4b4"
+                                        ctx.font = "11px sans-serif"
+                                        ctx.fillText("Strona: " + overlay.side +
+                                                     (overlay.cameraId !== undefined ? "  |  Kamera " + overlay.cameraId : ""),
+                                                     ox + 20, oy + 80)
+                                    }
+                                }
                             }
 
                             Rectangle {
@@ -487,18 +610,28 @@ ApplicationWindow {
                                         font.bold: true
                                         Layout.alignment: Qt.AlignHCenter
                                     }
+
+                                    Text {
+                                        text: "Pominięte takty: " + postureMonitor.skippedTicks
+                                        visible: isMonitoring && postureMonitor.skippedTicks > 0
+                                        color: "white"
+                                        font.pixelSize: 9
+                                        Layout.alignment: Qt.AlignHCenter
+                                    }
                                 }
                             }
 
                             Button {
                                 id: startStopButton
-                                text: !hasCameraAvailable ? "BRAK KAMERY" : (isMonitoring ? "STOP ANALIZA" : "START ANALIZA")
+                                text: !hasCameraAvailable ? "BRAK KAMERY" :
+                                      (!postureMonitor.isDetectorReady ? "ŁADOWANIE MODELU..." :
+                                      (isMonitoring ? "STOP ANALIZA" : "START ANALIZA"))
                                 font.pixelSize: 16
                                 font.bold: true
                                 Layout.preferredWidth: 220
                                 Layout.preferredHeight: 50
                                 Layout.alignment: Qt.AlignHCenter
-                                enabled: hasCameraAvailable
+                                enabled: hasCameraAvailable && postureMonitor.isDetectorReady
 
                                 background: Rectangle {
                                     color: !startStopButton.enabled ? "#95a5a6" :
@@ -1867,277 +2000,476 @@ ApplicationWindow {
         id: settingsDialog
         title: "Ustawienia"
         width: 500
-        height: 760
+        height: 800
         anchors.centerIn: parent
         modal: true
 
         property var availableCameras: []
+        property var monitoredCameras: []
 
         onOpened: {
             // Odśwież listę kamer przy otwieraniu dialogu
             availableCameras = postureMonitor.getAvailableCameras()
+            monitoredCameras = postureMonitor.getMonitoredCameras()
             cameraComboBox.model = availableCameras
             cameraComboBox.currentIndex = postureMonitor.getSelectedCamera()
         }
 
-        ColumnLayout {
+        // Sekcje ustawień przewijane - lista kalibracji nie mieści się obok pozostałych
+        ScrollView {
             anchors.fill: parent
-            spacing: 15
+            contentWidth: availableWidth
+            clip: true
 
-            // Sekcja kamery
-            Rectangle {
-                Layout.fillWidth: true
-                Layout.preferredHeight: 160
-                color: "#e8f4fd"
-                border.color: "#3498db"
-                border.width: 1
-                radius: 10
+            ColumnLayout {
+                width: parent.width
+                spacing: 15
 
-                ColumnLayout {
-                    anchors.fill: parent
-                    anchors.margins: 15
-                    spacing: 10
+                // Sekcja kamery
+                Rectangle {
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: settingsDialog.availableCameras.length > 1 ? 200 : 160
+                    color: "#e8f4fd"
+                    border.color: "#3498db"
+                    border.width: 1
+                    radius: 10
 
-                    RowLayout {
-                        Layout.fillWidth: true
+                    ColumnLayout {
+                        anchors.fill: parent
+                        anchors.margins: 15
+                        spacing: 10
 
-                        Text {
-                            text: "📷 Kamera"
-                            font.pixelSize: 14
-                            font.bold: true
+                        RowLayout {
                             Layout.fillWidth: true
-                        }
 
-                        Button {
-                            text: "🔄 Odśwież"
-                            font.pixelSize: 11
-                            onClicked: {
-                                postureMonitor.refreshCameras()
-                                settingsDialog.availableCameras = postureMonitor.getAvailableCameras()
-                                cameraComboBox.model = settingsDialog.availableCameras
+                            Text {
+                                text: "📷 Kamera"
+                                font.pixelSize: 14
+                                font.bold: true
+                                Layout.fillWidth: true
+                            }
+
+                            Button {
+                                text: "🔄 Odśwież"
+                                font.pixelSize: 11
+                                onClicked: {
+                                    postureMonitor.refreshCameras()
+                                    settingsDialog.availableCameras = postureMonitor.getAvailableCameras()
+                                    cameraComboBox.model = settingsDialog.availableCameras
+                                }
                             }
                         }
-                    }
 
-                    ComboBox {
-                        id: cameraComboBox
-                        Layout.fillWidth: true
-                        Layout.preferredHeight: 40
+                        ComboBox {
+                            id: cameraComboBox
+                            Layout.fillWidth: true
+                            Layout.preferredHeight: 40
 
-                        textRole: "name"
-                        valueRole: "id"
+                            textRole: "name"
+                            valueRole: "id"
 
-                        onActivated: function(index) {
-                            if (index >= 0 && settingsDialog.availableCameras.length > index) {
-                                var cameraId = settingsDialog.availableCameras[index].id
-                                postureMonitor.setSelectedCamera(cameraId)
-                                console.log("Wybrano kamerę:", cameraId)
+                            onActivated: function(index) {
+                                if (index >= 0 && settingsDialog.availableCameras.length > index) {
+                                    var cameraId = settingsDialog.availableCameras[index].id
+                                    postureMonitor.setSelectedCamera(cameraId)
+                                    console.log("Wybrano kamerę:", cameraId)
+                                }
                             }
                         }
-                    }
 
-                    Text {
-                        text: settingsDialog.availableCameras.length > 0 ?
-                              "Rozdzielczość: " + (settingsDialog.availableCameras[cameraComboBox.currentIndex]?.resolution || "Nieznana") :
-                              "Nie wykryto żadnych kamer"
-                        font.pixelSize: 11
-                        color: "#7f8c8d"
-                    }
+                        Text {
+                            text: settingsDialog.availableCameras.length > 0 ?
+                                  "Rozdzielczość: " + (settingsDialog.availableCameras[cameraComboBox.currentIndex]?.resolution || "Nieznana") :
+                                  "Nie wykryto żadnych kamer"
+                            font.pixelSize: 11
+                            color: "#7f8c8d"
+                        }
 
-                    Text {
-                        text: "Wskazówka: Jeśli kamera nie działa, kliknij Odśwież lub sprawdź czy nie jest używana przez inną aplikację."
-                        font.pixelSize: 10
-                        color: "#95a5a6"
-                        wrapMode: Text.Wrap
-                        Layout.fillWidth: true
-                    }
-                }
-            }
+                        // Dodatkowe kamery analizowane jednocześnie (np. kamera boczna)
+                        Flow {
+                            Layout.fillWidth: true
+                            spacing: 8
+                            visible: settingsDialog.availableCameras.length > 1
 
-            // Sekcja FPS podgladu
-            Rectangle {
-                Layout.fillWidth: true
-                Layout.preferredHeight: 100
-                color: "#ecf0f1"
-                radius: 10
+                            Text {
+                                text: "Monitoruj jednocześnie:"
+                                font.pixelSize: 11
+                                color: "#2c3e50"
+                            }
 
-                ColumnLayout {
-                    anchors.fill: parent
-                    anchors.margins: 15
-                    spacing: 10
+                            Repeater {
+                                model: settingsDialog.availableCameras
+
+                                CheckBox {
+                                    text: modelData.name
+                                    font.pixelSize: 10
+                                    checked: settingsDialog.monitoredCameras.indexOf(modelData.id) >= 0
+                                    onToggled: {
+                                        var ids = settingsDialog.monitoredCameras.slice()
+                                        var pos = ids.indexOf(modelData.id)
+                                        if (checked && pos < 0)
+                                            ids.push(modelData.id)
+                                        else if (!checked && pos >= 0)
+                                            ids.splice(pos, 1)
+                                        settingsDialog.monitoredCameras = ids
+                                        postureMonitor.setMonitoredCameras(ids)
+                                    }
+                                }
+                            }
+                        }
 
-                    Text {
-                        text: "🎬 FPS podgladu kamery"
-                        font.pixelSize: 14
-                        font.bold: true
+                        Text {
+                            text: "Wskazówka: Jeśli kamera nie działa, kliknij Odśwież lub sprawdź czy nie jest używana przez inną aplikację."
+                            font.pixelSize: 10
+                            color: "#95a5a6"
+                            wrapMode: Text.Wrap
+                            Layout.fillWidth: true
+                        }
                     }
+                }
 
-                    RowLayout {
-                        Layout.fillWidth: true
+                // Sekcja FPS podgladu
+                Rectangle {
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: 100
+                    color: "#ecf0f1"
+                    radius: 10
 
-                        ComboBox {
-                            id: fpsComboBox
+                    ColumnLayout {
+                        anchors.fill: parent
+                        anchors.margins: 15
+                        spacing: 10
+
+                        Text {
+                            text: "🎬 FPS podgladu kamery"
+                            font.pixelSize: 14
+                            font.bold: true
+                        }
+
+                        RowLayout {
                             Layout.fillWidth: true
-                            model: [30, 20, 15, 10, 5, 2, 1]
-                            currentIndex: 3  // Domyslnie 10 FPS
 
-                            onActivated: function(index) {
-                                postureMonitor.setPreviewFps(model[index])
+                            ComboBox {
+                                id: fpsComboBox
+                                Layout.fillWidth: true
+                                model: [30, 20, 15, 10, 5, 2, 1]
+                                currentIndex: 3  // Domyslnie 10 FPS
+
+                                onActivated: function(index) {
+                                    postureMonitor.setPreviewFps(model[index])
+                                }
                             }
-                        }
 
-                        Text {
-                            text: "FPS"
-                            font.pixelSize: 12
+                            Text {
+                                text: "FPS"
+                                font.pixelSize: 12
+                            }
                         }
                     }
                 }
-            }
-
-            // Sekcja interwalu analizy
-            Rectangle {
-                Layout.fillWidth: true
-                Layout.preferredHeight: 100
-                color: "#ecf0f1"
-                radius: 10
 
-                ColumnLayout {
-                    anchors.fill: parent
-                    anchors.margins: 15
-                    spacing: 10
+                // Sekcja interwalu analizy
+                Rectangle {
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: 100
+                    color: "#ecf0f1"
+                    radius: 10
 
-                    Text {
-                        text: "📊 Interwal analizy postawy"
-                        font.pixelSize: 14
-                        font.bold: true
-                    }
+                    ColumnLayout {
+                        anchors.fill: parent
+                        anchors.margins: 15
+                        spacing: 10
 
-                    RowLayout {
-                        Layout.fillWidth: true
+                        Text {
+                            text: "📊 Interwal analizy postawy"
+                            font.pixelSize: 14
+                            font.bold: true
+                        }
 
-                        SpinBox {
-                            id: analysisIntervalSpinBox
-                            from: 1
-                            to: 60
-                            value: 5
-                            stepSize: 1
+                        RowLayout {
                             Layout.fillWidth: true
 
-                            onValueChanged: {
-                                postureMonitor.setAnalysisInterval(value)
+                            SpinBox {
+                                id: analysisIntervalSpinBox
+                                from: 1
+                                to: 60
+                                value: 5
+                                stepSize: 1
+                                Layout.fillWidth: true
+
+                                onValueChanged: {
+                                    postureMonitor.setAnalysisInterval(value)
+                                }
+                            }
+
+                            Text {
+                                text: "sekund"
+                                font.pixelSize: 12
                             }
                         }
+                    }
+                }
+
+                // Sekcja progu ostrzeżenia
+                Rectangle {
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: 100
+                    color: "#ecf0f1"
+                    radius: 10
+
+                    ColumnLayout {
+                        anchors.fill: parent
+                        anchors.margins: 15
+                        spacing: 10
 
                         Text {
-                            text: "sekund"
-                            font.pixelSize: 12
+                            text: "⚠️ Próg ostrzeżenia o złej postawie"
+                            font.pixelSize: 14
+                            font.bold: true
+                        }
+
+                        RowLayout {
+                            Layout.fillWidth: true
+
+                            SpinBox {
+                                id: badPostureThresholdSpinBox
+                                from: 5
+                                to: 120
+                                value: 30
+                                stepSize: 5
+                                Layout.fillWidth: true
+
+                                onValueChanged: {
+                                    postureMonitor.setBadPostureThreshold(value)
+                                }
+                            }
+
+                            Text {
+                                text: "sekund"
+                                font.pixelSize: 12
+                            }
                         }
                     }
                 }
-            }
 
-            // Sekcja progu ostrzeżenia
-            Rectangle {
-                Layout.fillWidth: true
-                Layout.preferredHeight: 100
-                color: "#ecf0f1"
-                radius: 10
+                // Sekcja zachowania aplikacji
+                Rectangle {
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: 110
+                    color: "#f0e6ff"
+                    border.color: "#9b59b6"
+                    border.width: 1
+                    radius: 10
 
-                ColumnLayout {
-                    anchors.fill: parent
-                    anchors.margins: 15
-                    spacing: 10
+                    ColumnLayout {
+                        anchors.fill: parent
+                        anchors.margins: 15
+                        spacing: 8
 
-                    Text {
-                        text: "⚠️ Próg ostrzeżenia o złej postawie"
-                        font.pixelSize: 14
-                        font.bold: true
+                        Text {
+                            text: "🖥️ Zachowanie aplikacji"
+                            font.pixelSize: 14
+                            font.bold: true
+                            color: "#8e44ad"
+                        }
+
+                        RowLayout {
+                            Layout.fillWidth: true
+                            spacing: 10
+
+                            CheckBox {
+                                id: autoMinimizeCheckbox
+                                checked: postureMonitor.getAutoMinimizeOnStart()
+
+                                onCheckedChanged: {
+                                    postureMonitor.setAutoMinimizeOnStart(checked)
+                                }
+                            }
+
+                            ColumnLayout {
+                                spacing: 2
+
+                                Text {
+                                    text: "Minimalizuj do zasobnika po starcie"
+                                    font.pixelSize: 13
+                                }
+
+                                Text {
+                                    text: "Aplikacja ukryje się po kliknięciu START. Kliknij ikonę w zasobniku aby przywrócić."
+                                    font.pixelSize: 10
+                                    color: "#7f8c8d"
+                                    wrapMode: Text.Wrap
+                                    Layout.preferredWidth: 380
+                                }
+                            }
+                        }
                     }
+                }
 
-                    RowLayout {
-                        Layout.fillWidth: true
+                // Sekcja kalibracji backendu (--latency-budget)
+                Rectangle {
+                    id: calibrationSection
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: calibrationColumn.implicitHeight + 30
+                    color: "#fef9e7"
+                    border.color: "#f1c40f"
+                    border.width: 1
+                    radius: 10
+
+                    property var calibration: postureMonitor.calibration
 
-                        SpinBox {
-                            id: badPostureThresholdSpinBox
-                            from: 5
-                            to: 120
-                            value: 30
-                            stepSize: 5
+                    ColumnLayout {
+                        id: calibrationColumn
+                        anchors.left: parent.left
+                        anchors.right: parent.right
+                        anchors.top: parent.top
+                        anchors.margins: 15
+                        spacing: 6
+
+                        RowLayout {
                             Layout.fillWidth: true
 
-                            onValueChanged: {
-                                postureMonitor.setBadPostureThreshold(value)
+                            Text {
+                                text: "⏱️ Kalibracja modelu"
+                                font.pixelSize: 14
+                                font.bold: true
+                                Layout.fillWidth: true
+                            }
+
+                            Button {
+                                text: calibrationSection.calibration.running ? "Mierzę..." : "🔄 Kalibruj ponownie"
+                                font.pixelSize: 11
+                                enabled: calibrationSection.calibration.enabled && !calibrationSection.calibration.running
+                                onClicked: postureMonitor.recalibrate()
                             }
                         }
 
                         Text {
-                            text: "sekund"
+                            property var calibration: calibrationSection.calibration
+                            text: !calibration.enabled ? "Wyłączona - uruchom z --latency-budget <ms>, aby wybrać model automatycznie" :
+                                  !calibration.chosen ? "Brak wyniku kalibracji" :
+                                  "Wybrano: " + calibration.chosen + " (" + calibration.chosen_ms.toFixed(1) + " ms, budżet "
+                                  + calibration.budget_ms + " ms" + (calibration.within_budget ? "" : " - przekroczony") + ")"
                             font.pixelSize: 12
+                            color: "#2c3e50"
+                            wrapMode: Text.Wrap
+                            Layout.fillWidth: true
+                        }
+
+                        Text {
+                            property var calibration: calibrationSection.calibration
+                            visible: !!calibration.timestamp
+                            text: (calibration.cached ? "Zapisany wynik z " : "Zmierzono ") + calibration.timestamp
+                                  + " (klatki: " + calibration.frames + ")"
+                            font.pixelSize: 10
+                            color: "#7f8c8d"
+                        }
+
+                        Repeater {
+                            model: calibrationSection.calibration.results || []
+
+                            RowLayout {
+                                Layout.fillWidth: true
+
+                                Text {
+                                    text: (modelData.chosen ? "▶ " : "   ") + modelData.label
+                                    font.pixelSize: 11
+                                    font.bold: modelData.chosen
+                                    color: modelData.ok ? "#2c3e50" : "#95a5a6"
+                                    Layout.fillWidth: true
+                                    elide: Text.ElideRight
+                                }
+
+                                Text {
+                                    text: modelData.ok ? modelData.median_ms.toFixed(1) + " ms" : "niedostępny"
+                                    font.pixelSize: 11
+                                    color: !modelData.ok ? "#95a5a6" : modelData.within_budget ? "#27ae60" : "#e74c3c"
+                                }
+                            }
                         }
                     }
                 }
-            }
 
-            // Sekcja zachowania aplikacji
-            Rectangle {
-                Layout.fillWidth: true
-                Layout.preferredHeight: 110
-                color: "#f0e6ff"
-                border.color: "#9b59b6"
-                border.width: 1
-                radius: 10
+                // Sekcja kalibracji osobistej (linia bazowa postawy dla wybranej kamery)
+                Rectangle {
+                    id: baselineSection
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: baselineColumn.implicitHeight + 30
+                    color: "#eafaf1"
+                    border.color: "#2ecc71"
+                    border.width: 1
+                    radius: 10
 
-                ColumnLayout {
-                    anchors.fill: parent
-                    anchors.margins: 15
-                    spacing: 8
+                    property var baseline: postureMonitor.baseline
 
-                    Text {
-                        text: "🖥️ Zachowanie aplikacji"
-                        font.pixelSize: 14
-                        font.bold: true
-                        color: "#8e44ad"
-                    }
+                    ColumnLayout {
+                        id: baselineColumn
+                        anchors.left: parent.left
+                        anchors.right: parent.right
+                        anchors.top: parent.top
+                        anchors.margins: 15
+                        spacing: 6
 
-                    RowLayout {
-                        Layout.fillWidth: true
-                        spacing: 10
+                        RowLayout {
+                            Layout.fillWidth: true
 
-                        CheckBox {
-                            id: autoMinimizeCheckbox
-                            checked: postureMonitor.getAutoMinimizeOnStart()
+                            Text {
+                                text: "🧍 Kalibracja postawy (kamera " + baselineSection.baseline.camera + ")"
+                                font.pixelSize: 14
+                                font.bold: true
+                                Layout.fillWidth: true
+                            }
 
-                            onCheckedChanged: {
-                                postureMonitor.setAutoMinimizeOnStart(checked)
+                            Button {
+                                text: baselineSection.baseline.running
+                                      ? "Mierzę... " + Math.round(baselineSection.baseline.progress * 100) + "%"
+                                      : "📏 Kalibruj (20 s)"
+                                font.pixelSize: 11
+                                enabled: !baselineSection.baseline.running && postureMonitor.isCameraActive
+                                         && !postureMonitor.isMonitoring
+                                onClicked: postureMonitor.startBaselineCalibration(20)
+                            }
+
+                            Button {
+                                text: "Usuń"
+                                font.pixelSize: 11
+                                visible: baselineSection.baseline.calibrated
+                                enabled: !baselineSection.baseline.running
+                                onClicked: postureMonitor.clearBaseline()
                             }
                         }
 
-                        ColumnLayout {
-                            spacing: 2
+                        Text {
+                            text: baselineSection.baseline.running
+                                  ? "Usiądź prosto i patrz w ekran (pomiary: " + baselineSection.baseline.samples + ")"
+                                  : baselineSection.baseline.calibrated
+                                    ? "Próg liczony względem Twojej naturalnej postawy (" + baselineSection.baseline.timestamp + ")"
+                                    : "Brak kalibracji - używany jest wspólny próg. Kalibracja wymaga włączonej kamery i zatrzymanego monitoringu."
+                            font.pixelSize: 12
+                            color: "#2c3e50"
+                            wrapMode: Text.Wrap
+                            Layout.fillWidth: true
+                        }
 
-                            Text {
-                                text: "Minimalizuj do zasobnika po starcie"
-                                font.pixelSize: 13
-                            }
+                        Repeater {
+                            model: baselineSection.baseline.sides || []
 
                             Text {
-                                text: "Aplikacja ukryje się po kliknięciu START. Kliknij ikonę w zasobniku aby przywrócić."
-                                font.pixelSize: 10
+                                text: (modelData.side === "LEFT" ? "Lewa" : "Prawa") + " strona: mediana "
+                                      + modelData.median.toFixed(3) + ", rozrzut " + modelData.mad.toFixed(3)
+                                      + ", limit " + modelData.limit.toFixed(3) + " (" + modelData.samples + " pomiarów)"
+                                font.pixelSize: 11
                                 color: "#7f8c8d"
-                                wrapMode: Text.Wrap
-                                Layout.preferredWidth: 380
                             }
                         }
                     }
                 }
-            }
-
-            Item { Layout.fillHeight: true }
 
-            Button {
-                text: "✓ Zamknij"
-                Layout.alignment: Qt.AlignRight
-                onClicked: settingsDialog.close()
+                Button {
+                    text: "✓ Zamknij"
+                    Layout.alignment: Qt.AlignRight
+                    onClicked: settingsDialog.close()
+                }
             }
         }
     }
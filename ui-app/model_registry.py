@@ -0,0 +1,320 @@
+"""
+Moduł z lokalnym rejestrem modeli pose landmarker (tasks API)
+Modele są szukane tylko na dysku - w katalogu z POSTURE_MODEL_DIR (albo podanym
+jawnie), w danych pakietu (ui-app/models), w ~/.posture_monitor/models i w starym
+~/.mediapipe/models. Każdy plik musi zgadzać się z sumą SHA-256 z pliku
+manifest.json w tym samym katalogu; model bez wpisu albo z inną sumą jest pomijany.
+
+Sieć jest używana wyłącznie przez jawne polecenie prefetch (albo prefetch_async
+w tle) - start aplikacji nigdy nie czeka na pobieranie. Pobierana jest ustalona
+wersja modelu (MODEL_VERSION), a plik trafia do rejestru tylko wtedy, gdy jego
+suma zgadza się z przypiętą w KNOWN_SHA256 (albo podaną w --sha256); wariant bez
+przypiętej sumy nie jest pobierany. Na maszynach bez sieci wystarczy skopiować
+katalog z modelami razem z manifest.json.
+
+Użycie:
+    python model_registry.py list
+    python model_registry.py prefetch --variant lite --variant full
+    python model_registry.py prefetch --variant heavy --sha256 heavy=<suma SHA-256>
+    python model_registry.py register /media/usb/pose_landmarker_heavy.task
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+VARIANTS = ('lite', 'full', 'heavy')
+MANIFEST_NAME = "manifest.json"
+MODEL_VERSION = "1"  # Ustalona wersja zamiast 'latest' - przypięta suma musi dotyczyć tego pliku
+MODEL_URL = ("https://storage.googleapis.com/mediapipe-models/pose_landmarker/{name}/float16/"
+             + MODEL_VERSION + "/{name}.task")
+
+# Sumy SHA-256 plików MODEL_URL w wersji MODEL_VERSION (wariant -> suma hex);
+# uzupełniane przy zmianie wersji z zaufanej kopii: sha256sum pose_landmarker_<wariant>.task
+KNOWN_SHA256: Dict[str, str] = {}
+
+PACKAGE_MODEL_DIR = Path(__file__).resolve().parent / "models"
+USER_MODEL_DIR = Path.home() / ".posture_monitor" / "models"
+LEGACY_MODEL_DIR = Path.home() / ".mediapipe" / "models"
+
+
+class ModelNotFoundError(FileNotFoundError):
+    """Brak zweryfikowanego modelu w katalogach rejestru"""
+
+
+class ModelIntegrityError(OSError):
+    """Pobrany model nie ma przypiętej sumy albo się z nią nie zgadza"""
+
+
+def model_filename(variant: str) -> str:
+    if variant not in VARIANTS:
+        raise ValueError(f"Nieznany wariant modelu: {variant} (dostępne: {', '.join(VARIANTS)})")
+    return f"pose_landmarker_{variant}.task"
+
+
+def _sha256(data) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    mapping = _map_file(path)
+    try:
+        return _sha256(mapping)
+    finally:
+        mapping.close()
+
+
+def parse_pinned_digest(value: str):
+    """Typ argparse dla --sha256: 'wariant=suma' -> (wariant, suma małymi literami)"""
+    variant, sep, digest = value.partition("=")
+    variant, digest = variant.strip(), digest.strip().lower()
+    if not sep or variant not in VARIANTS:
+        raise argparse.ArgumentTypeError(
+            f"oczekiwano wariant=suma, wariant jeden z: {', '.join(VARIANTS)}")
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        raise argparse.ArgumentTypeError(f"niepoprawna suma SHA-256: {digest}")
+    return variant, digest
+
+
+def _map_file(path: Path) -> mmap.mmap:
+    """Plik zmapowany tylko do odczytu - strony są wczytywane przez system na żądanie"""
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_manifest(directory: Path) -> Dict[str, str]:
+    try:
+        with open(Path(directory) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest_entry(directory: Path, filename: str, digest: str):
+    """Dopisz sumę pliku do manifestu katalogu (zapis przez plik tymczasowy)"""
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    manifest[filename] = digest
+    tmp_path = directory / (MANIFEST_NAME + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, directory / MANIFEST_NAME)
+
+
+class ModelRegistry:
+    """Wyszukiwanie, weryfikacja i wczytywanie modeli z lokalnych katalogów"""
+
+    def __init__(self, model_dir: Optional[str] = None):
+        """
+        Args:
+            model_dir: Katalog sprawdzany jako pierwszy (domyślnie zmienna POSTURE_MODEL_DIR)
+        """
+        model_dir = model_dir or os.environ.get("POSTURE_MODEL_DIR")
+        self.model_dir = Path(model_dir).expanduser() if model_dir else None
+
+    def search_dirs(self) -> List[Path]:
+        dirs = [self.model_dir, PACKAGE_MODEL_DIR, USER_MODEL_DIR, LEGACY_MODEL_DIR]
+        return [d for d in dirs if d is not None]
+
+    def candidates(self, variant: str) -> List[Path]:
+        """Istniejące pliki wariantu w kolejności katalogów (bez weryfikacji)"""
+        filename = model_filename(variant)
+        return [d / filename for d in self.search_dirs() if (d / filename).is_file()]
+
+    def _verified_map(self, path: Path) -> Optional[mmap.mmap]:
+        """Zmapowany plik, jeśli jego suma zgadza się z manifestem katalogu"""
+        expected = read_manifest(path.parent).get(path.name)
+        if expected is None:
+            print(f"Model {path} nie ma wpisu w {MANIFEST_NAME} - pomijam "
+                  f"(dodaj: python model_registry.py register {path})")
+            return None
+
+        try:
+            mapping = _map_file(path)
+        except (OSError, ValueError) as e:
+            # ValueError - pusty plik nie daje się zmapować
+            print(f"Nie można odczytać modelu {path}: {e}")
+            return None
+        if _sha256(mapping) != expected.lower():
+            mapping.close()
+            print(f"Model {path} ma niezgodną sumę SHA-256 - pomijam")
+            return None
+        return mapping
+
+    def find(self, variant: str) -> Optional[Path]:
+        """Pierwszy zweryfikowany plik wariantu albo None"""
+        for path in self.candidates(variant):
+            mapping = self._verified_map(path)
+            if mapping is not None:
+                mapping.close()
+                return path
+        return None
+
+    def load_buffer(self, variant: str) -> bytes:
+        """
+        Zawartość zweryfikowanego modelu dla BaseOptions(model_asset_buffer=...)
+
+        Plik jest mapowany do pamięci, suma liczona bezpośrednio z mapowania,
+        a MediaPipe dostaje jedną kopię bajtów (pole protobuf wymaga bytes).
+        """
+        for path in self.candidates(variant):
+            mapping = self._verified_map(path)
+            if mapping is None:
+                continue
+            try:
+                print(f"Model {variant}: {path}")
+                return mapping[:]
+            finally:
+                mapping.close()
+
+        raise ModelNotFoundError(
+            f"Brak zweryfikowanego modelu {model_filename(variant)} w: "
+            + ", ".join(str(d) for d in self.search_dirs())
+            + f" (pobierz: python model_registry.py prefetch --variant {variant})"
+        )
+
+    def register(self, path: str, target_dir: Optional[Path] = None) -> Path:
+        """
+        Skopiuj model (np. z nośnika) do katalogu rejestru i zapisz jego sumę
+
+        Returns:
+            Ścieżka modelu w rejestrze
+        """
+        source = Path(path)
+        target_dir = Path(target_dir or self.model_dir or USER_MODEL_DIR)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / source.name
+
+        if source.resolve() != target.resolve():
+            tmp_path = target.with_suffix(target.suffix + ".tmp")
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, target)
+
+        mapping = _map_file(target)
+        try:
+            write_manifest_entry(target_dir, target.name, _sha256(mapping))
+        finally:
+            mapping.close()
+        return target
+
+    def prefetch(self, variants: Iterable[str] = ('lite',), target_dir: Optional[Path] = None,
+                 force: bool = False, pinned: Optional[Dict[str, str]] = None) -> Dict[str, Path]:
+        """
+        Pobierz brakujące warianty z sieci (jedyne miejsce, które używa sieci)
+
+        Pobrany plik musi mieć sumę przypiętą w KNOWN_SHA256 (albo w pinned) -
+        inaczej jest usuwany przed przeniesieniem do rejestru i zgłaszany jest
+        ModelIntegrityError. Suma trafia do manifestu - kopiując katalog na
+        maszynę bez sieci, przenosimy ją razem z modelem.
+
+        Args:
+            pinned: Sumy wariantów (wariant -> suma) zastępujące KNOWN_SHA256
+        """
+        target_dir = Path(target_dir or self.model_dir or USER_MODEL_DIR)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        digests = {**KNOWN_SHA256, **(pinned or {})}
+
+        fetched = {}
+        for variant in variants:
+            if not force and self.find(variant) is not None:
+                continue
+            name = model_filename(variant)[:-len(".task")]
+            expected = digests.get(variant)
+            if not expected:
+                raise ModelIntegrityError(
+                    f"Brak przypiętej sumy SHA-256 modelu {name} - nie pobieram "
+                    f"(podaj: python model_registry.py prefetch --variant {variant} --sha256 {variant}=<suma>)")
+            target = target_dir / f"{name}.task"
+            tmp_path = target.with_suffix(".task.tmp")
+
+            print(f"Pobieram model {name}...")
+            try:
+                urllib.request.urlretrieve(MODEL_URL.format(name=name), tmp_path)
+                digest = _file_sha256(tmp_path)
+            except (OSError, ValueError):
+                tmp_path.unlink(missing_ok=True)
+                raise
+            if digest != expected.lower():
+                tmp_path.unlink(missing_ok=True)
+                raise ModelIntegrityError(
+                    f"Pobrany model {name} ma sumę {digest}, oczekiwano {expected.lower()} - odrzucony")
+            os.replace(tmp_path, target)
+            fetched[variant] = self.register(str(target), target_dir)
+            print(f"Model {name} zapisany: {target}")
+        return fetched
+
+    def prefetch_async(self, variants: Iterable[str] = ('lite',),
+                       done: Optional[Callable[[Dict[str, Path], Optional[Exception]], None]] = None) -> threading.Thread:
+        """Prefetch w wątku tła - wywołujący nie czeka; done(pobrane, błąd) po zakończeniu"""
+        variants = list(variants)
+
+        def run():
+            try:
+                fetched = self.prefetch(variants)
+            except Exception as e:
+                print(f"Nie można pobrać modeli: {e}")
+                if done is not None:
+                    done({}, e)
+                return
+            if done is not None:
+                done(fetched, None)
+
+        thread = threading.Thread(target=run, name="ModelPrefetch", daemon=True)
+        thread.start()
+        return thread
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Lokalny rejestr modeli pose landmarker")
+    parser.add_argument("--model-dir", help="Katalog rejestru (domyślnie POSTURE_MODEL_DIR albo ~/.posture_monitor/models)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="Pokaż znalezione modele i wynik weryfikacji")
+
+    prefetch = commands.add_parser("prefetch", help="Pobierz modele z sieci do rejestru")
+    prefetch.add_argument("--variant", action="append", choices=VARIANTS,
+                          help="Wariant do pobrania (można powtórzyć; domyślnie lite)")
+    prefetch.add_argument("--force", action="store_true", help="Pobierz ponownie mimo zweryfikowanej kopii")
+    prefetch.add_argument("--sha256", type=parse_pinned_digest, action="append", default=[],
+                          metavar="WARIANT=SUMA",
+                          help="Oczekiwana suma SHA-256 wariantu, zastępuje KNOWN_SHA256 (można powtórzyć)")
+
+    register = commands.add_parser("register", help="Dodaj skopiowany ręcznie model i zapisz jego sumę")
+    register.add_argument("paths", nargs="+", help="Pliki .task")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model_dir)
+
+    if args.command == "list":
+        for variant in VARIANTS:
+            verified = registry.find(variant)
+            others = [p for p in registry.candidates(variant) if p != verified]
+            print(f"{variant:<6} {verified or 'brak zweryfikowanego modelu'}")
+            for path in others:
+                print(f"       (pominięty) {path}")
+        return 0
+
+    if args.command == "prefetch":
+        try:
+            registry.prefetch(args.variant or ['lite'], force=args.force, pinned=dict(args.sha256))
+        except OSError as e:
+            print(f"Nie można pobrać modeli: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    for path in args.paths:
+        print(f"Zarejestrowano: {registry.register(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Moduł do wykrywania zmian w obrazie przed analizą postawy
+Jeśli scena się nie zmieniła, można ponownie użyć poprzedniego wyniku
+"""
+
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Tani detektor zmian: porównuje zmniejszoną klatkę w skali szarości
+    z ostatnio analizowaną klatką
+
+    Wynik poprzedniej analizy może być użyty ponownie, dopóki średnia
+    różnica jasności jest poniżej progu i wynik nie jest starszy niż max_reuse_age.
+    """
+
+    def __init__(self, threshold: float = 4.0, max_reuse_age: float = 30.0,
+                 size: Tuple[int, int] = (64, 48)):
+        """
+        Args:
+            threshold: Średnia bezwzględna różnica jasności (0-255), od której
+                       scena uznawana jest za zmienioną
+            max_reuse_age: Maksymalny wiek ponownie używanego wyniku w sekundach
+            size: Rozmiar (szer., wys.) miniatury do porównania
+        """
+        self.threshold = threshold
+        self.max_reuse_age = max_reuse_age
+        self.size = size
+
+        self._reference: Optional[np.ndarray] = None
+        self._result = None
+        self._result_time = 0.0
+        self.last_difference = 0.0
+
+        self.analyzed_count = 0
+        self.reused_count = 0
+
+    def signature(self, frame: np.ndarray) -> np.ndarray:
+        """Miniatura w skali szarości (najpierw zmniejszenie, potem konwersja)"""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def check(self, frame: np.ndarray, now: Optional[float] = None):
+        """
+        Sprawdź czy można pominąć analizę tej klatki
+
+        Returns:
+            (poprzedni_wynik albo None, miniatura_klatki)
+            Wynik jest zwracany tylko, gdy scena się nie zmieniła.
+            Miniaturę przekaż do store_result() po analizie klatki.
+        """
+        now = time.monotonic() if now is None else now
+        sig = self.signature(frame)
+
+        if self._reference is None or self._result is None:
+            return None, sig
+
+        if now - self._result_time > self.max_reuse_age:
+            return None, sig
+
+        self.last_difference = float(cv2.absdiff(sig, self._reference).mean())
+        if self.last_difference >= self.threshold:
+            return None, sig
+
+        self.reused_count += 1
+        return self._result, sig
+
+    def store_result(self, signature: np.ndarray, result, now: Optional[float] = None):
+        """Zapamiętaj wynik analizy klatki o podanej miniaturze"""
+        if signature is None:
+            return
+        self._reference = signature
+        self._result = result
+        self._result_time = time.monotonic() if now is None else now
+        self.analyzed_count += 1
+
+    def reset(self):
+        """Zapomnij klatkę odniesienia i wynik"""
+        self._reference = None
+        self._result = None
+        self._result_time = 0.0
@@ -0,0 +1,182 @@
+"""
+Moduł do jednoczesnego monitorowania postawy z kilku kamer
+Każda kamera ma własne przechwytywanie i własny detektor (stan śledzenia),
+a wspólny harmonogram dzieli między nie stały budżet CPU
+"""
+
+import math
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class CameraChannel:
+    """
+    Stan jednej kamery: źródło klatek, własny PostureDetector i ostatni wynik
+
+    Źródłem może być każdy obiekt z metodą latest() -> (seq, klatka, timestamp),
+    np. CaptureThread.
+    """
+
+    def __init__(self, camera_id: int, source):
+        self.camera_id = camera_id
+        self.source = source
+        self.detector = None
+
+        self.last_seq = 0
+        self.last_result = None  # (is_good, norm_dist, landmarks)
+        self.last_result_time = 0.0
+        self.inference_ms = 0.0
+        self.inference_count = 0
+
+    def visibility_score(self) -> float:
+        """
+        Długość tułowia z ostatniego wyniku jako ułamek przekątnej klatki -
+        miara widoczności geometrii ucho/ramię/biodro porównywalna między
+        kamerami o różnych rozdzielczościach
+        """
+        if self.last_result is None or self.last_result[2] is None:
+            return 0.0
+        landmarks = self.last_result[2]
+        w, h = landmarks.get('frame_size', (1, 1))
+        return float(landmarks.get('torso_len', 0.0)) / max(math.hypot(w, h), 1.0)
+
+
+class InferenceScheduler(threading.Thread):
+    """
+    Wspólny harmonogram analizy dla wielu kamer
+
+    Kamery obsługiwane są po kolei (round-robin), więc żadna nie jest
+    zagłodzona. Po każdej analizie wątek odczekuje tyle, by średnie
+    obciążenie nie przekroczyło cpu_budget (ułamek jednego rdzenia).
+    """
+
+    def __init__(self, channels: List[CameraChannel], detector_factory: Callable,
+                 cpu_budget: float = 0.5, result_max_age: float = 15.0):
+        """
+        Args:
+            channels: Kanały kamer
+            detector_factory: Funkcja tworząca nowy PostureDetector dla kanału
+                              (argument: camera_id - np. do wyboru linii bazowej kamery)
+            cpu_budget: Docelowy ułamek jednego rdzenia na analizę (0-1)
+            result_max_age: Wynik starszy niż tyle sekund nie bierze udziału w fuzji
+        """
+        super().__init__(name="MultiCameraScheduler", daemon=True)
+        self.channels = channels
+        self._detector_factory = detector_factory
+        self.cpu_budget = max(0.05, min(cpu_budget, 1.0))
+        self.result_max_age = result_max_age
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._paused = threading.Event()
+        self._next_index = 0
+
+    def run(self):
+        # Detektory tworzone w wątku harmonogramu - GUI nie czeka na MediaPipe
+        for channel in self.channels:
+            if channel.detector is None:
+                try:
+                    channel.detector = self._detector_factory(channel.camera_id)
+                except Exception as e:
+                    print(f"Nie można utworzyć detektora dla kamery {channel.camera_id}: {e}")
+        # Kamera bez detektora nie bierze udziału w analizie
+        self.channels = [c for c in self.channels if c.detector is not None]
+        if not self.channels:
+            return
+
+        while not self._stop_event.is_set():
+            if self._paused.is_set():
+                self._stop_event.wait(0.05)
+                continue
+            channel, frame = self._next_frame()
+            if channel is None:
+                self._stop_event.wait(0.01)
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = channel.detector.analyze_posture(frame)
+            except Exception as e:
+                print(f"Błąd analizy (kamera {channel.camera_id}): {e}")
+                result = (False, 0.0, None)
+            elapsed = time.perf_counter() - start
+
+            if result[2] is not None:
+                result[2]['camera_id'] = channel.camera_id
+
+            with self._lock:
+                channel.last_result = result
+                channel.last_result_time = time.monotonic()
+                channel.inference_count += 1
+                # Średnia krocząca czasu analizy
+                channel.inference_ms = 0.8 * channel.inference_ms + 0.2 * elapsed * 1000 \
+                    if channel.inference_count > 1 else elapsed * 1000
+
+            # Przerwa proporcjonalna do czasu analizy = obciążenie ~cpu_budget
+            self._stop_event.wait(elapsed * (1.0 / self.cpu_budget - 1.0))
+
+    def _next_frame(self):
+        """Następny kanał (round-robin), który ma nową klatkę"""
+        count = len(self.channels)
+        for offset in range(count):
+            index = (self._next_index + offset) % count
+            channel = self.channels[index]
+            seq, frame, _ = channel.source.latest()
+            if frame is not None and seq != channel.last_seq:
+                channel.last_seq = seq
+                self._next_index = (index + 1) % count
+                return channel, frame
+        return None, None
+
+    def fused_result(self) -> Tuple[bool, float, Optional[dict]]:
+        """
+        Wynik z kamery z najlepszą widocznością (największe torso_len względem klatki)
+        spośród świeżych wyników z wykrytą sylwetką
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                c for c in self.channels
+                if c.last_result is not None and c.last_result[2] is not None
+                and now - c.last_result_time <= self.result_max_age
+            ]
+            if not candidates:
+                return False, 0.0, None
+            best = max(candidates, key=lambda c: c.visibility_score())
+            return best.last_result
+
+    def total_inferences(self) -> int:
+        with self._lock:
+            return sum(c.inference_count for c in self.channels)
+
+    def stats(self) -> list:
+        with self._lock:
+            return [
+                {
+                    'camera_id': c.camera_id,
+                    'inferences': c.inference_count,
+                    'inference_ms': round(c.inference_ms, 1),
+                    'visibility': round(c.visibility_score(), 3)
+                }
+                for c in self.channels
+            ]
+
+    def pause(self):
+        """Wstrzymaj analizę (np. na czas pomiaru kalibracji) - trwająca analiza się dokończy"""
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        if self.is_alive():
+            # Analiza wciąż trwa - detektory zwolni garbage collector
+            return
+        for channel in self.channels:
+            if channel.detector is not None:
+                channel.detector.release()
+                channel.detector = None
@@ -0,0 +1,163 @@
+"""
+Moduł ze śledzeniem tożsamości kilku osób w kadrze
+Model wykrywa do num_poses sylwetek w jednej inferencji, ale ich kolejność
+zmienia się z klatki na klatkę. Tracker przypisuje każdej sylwetce stały
+numer: dopasowanie prostokątów otaczających (IoU), a gdy ruch był zbyt duży
+na wspólną część - najbliższy środek. Wszystko na tablicach, bez dodatkowego
+modelu (tylko kilka sylwetek na klatkę).
+
+Osoba główna to użytkownik stanowiska: największa sylwetka (najbliżej kamery)
+w chwili wyboru. Jest zablokowana, dopóki jej ślad istnieje - ktoś
+przechodzący za plecami nie przejmuje oceny, nawet gdy główna osoba na
+chwilę zniknie z kadru.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from landmark_array import VISIBILITY_THRESHOLD
+
+
+PERSON_MODES = ('primary', 'all')  # tylko osoba główna / statystyki każdej osoby
+
+
+def person_boxes(arrays: np.ndarray) -> np.ndarray:
+    """
+    Prostokąty otaczające widoczne punkty (x0, y0, x1, y1), współrzędne znormalizowane
+
+    Args:
+        arrays: (K, 33, 4) - sylwetki jednej klatki
+    Returns:
+        (K, 4); sylwetka z mniej niż 3 widocznymi punktami używa wszystkich punktów
+    """
+    arrays = np.asarray(arrays, dtype=np.float32)
+    if arrays.ndim == 2:
+        arrays = arrays[None]
+    xy = arrays[:, :, :2]
+    visible = np.nan_to_num(arrays[:, :, 3], nan=0.0) >= VISIBILITY_THRESHOLD
+    visible[visible.sum(axis=1) < 3] = True
+
+    mask = visible[:, :, None]
+    low = np.where(mask, xy, np.inf).min(axis=1)
+    high = np.where(mask, xy, -np.inf).max(axis=1)
+    return np.concatenate([low, high], axis=1)
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU każdej pary prostokątów: (T, 4) x (K, 4) -> (T, K)"""
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1.0), 0.0)
+
+
+def _centers(boxes: np.ndarray) -> np.ndarray:
+    return (boxes[:, :2] + boxes[:, 2:]) / 2
+
+
+class PersonTracker:
+    """
+    Stałe numery sylwetek między klatkami i zablokowana osoba główna
+
+    Ślad, który nie został dopasowany przez max_missed kolejnych analiz, jest
+    usuwany; jeśli to był ślad osoby głównej, przy następnej analizie wybierana
+    jest nowa (np. zmiana użytkownika stanowiska).
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_center_distance: float = 0.15,
+                 max_missed: int = 10):
+        """
+        Args:
+            iou_threshold: Minimalne IoU, by uznać sylwetkę za tę samą osobę
+            max_center_distance: Zapasowe dopasowanie po środku prostokąta (ułamek klatki)
+            max_missed: Po tylu analizach bez dopasowania ślad jest usuwany
+        """
+        self.iou_threshold = iou_threshold
+        self.max_center_distance = max_center_distance
+        self.max_missed = max_missed
+        self._tracks: Dict[int, Dict] = {}  # id -> {'box', 'missed', 'hits'}
+        self._next_id = 1
+        self.primary_id: Optional[int] = None
+
+    def reset(self):
+        self._tracks.clear()
+        self.primary_id = None
+
+    @property
+    def track_count(self) -> int:
+        return len(self._tracks)
+
+    def _match(self, boxes: np.ndarray) -> List[Optional[int]]:
+        """Zachłanne dopasowanie: najpierw pary o największym IoU, potem najbliższe środki"""
+        ids: List[Optional[int]] = [None] * len(boxes)
+        track_ids = list(self._tracks)
+        if not track_ids or not len(boxes):
+            return ids
+
+        previous = np.array([self._tracks[t]['box'] for t in track_ids])
+        iou = box_iou(previous, boxes)
+        distance = np.linalg.norm(_centers(previous)[:, None, :] - _centers(boxes)[None, :, :], axis=2)
+
+        used_tracks = set()
+        pairs = [(-iou[t, k], t, k) for t, k in zip(*np.nonzero(iou >= self.iou_threshold))]
+        pairs += [(1.0 + distance[t, k], t, k)
+                  for t, k in zip(*np.nonzero((iou < self.iou_threshold) & (distance <= self.max_center_distance)))]
+        for _, t, k in sorted(pairs):
+            if t in used_tracks or ids[k] is not None:
+                continue
+            used_tracks.add(t)
+            ids[k] = track_ids[t]
+        return ids
+
+    def update(self, arrays: Sequence[np.ndarray]) -> List[int]:
+        """
+        Przypisz numery sylwetkom jednej klatki
+
+        Args:
+            arrays: Sylwetki (33, 4) we współrzędnych pełnej klatki
+        Returns:
+            Numer osoby dla każdej sylwetki (w tej samej kolejności)
+        """
+        boxes = person_boxes(np.stack(arrays)) if len(arrays) else np.zeros((0, 4), dtype=np.float32)
+        ids = self._match(boxes)
+
+        for k, track_id in enumerate(ids):
+            if track_id is None:
+                track_id = self._next_id
+                self._next_id += 1
+                ids[k] = track_id
+                self._tracks[track_id] = {'hits': 0}
+            track = self._tracks[track_id]
+            track['box'] = boxes[k]
+            track['missed'] = 0
+            track['hits'] += 1
+
+        matched = set(ids)
+        for track_id in list(self._tracks):
+            if track_id in matched:
+                continue
+            self._tracks[track_id]['missed'] += 1
+            if self._tracks[track_id]['missed'] > self.max_missed:
+                del self._tracks[track_id]
+
+        if self.primary_id not in self._tracks:
+            self.primary_id = None
+        if self.primary_id is None and ids:
+            # Największa sylwetka - osoba siedząca przy kamerze
+            areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+            self.primary_id = ids[int(np.argmax(areas))]
+        return ids
+
+    def primary_index(self, ids: Sequence[int]) -> Optional[int]:
+        """Pozycja osoby głównej w wyniku update() albo None (chwilowo poza kadrem)"""
+        try:
+            return list(ids).index(self.primary_id)
+        except ValueError:
+            return None
@@ -0,0 +1,372 @@
+"""
+Moduł z wymiennymi backendami wykrywania sylwetki
+Każdy backend ma ten sam interfejs: load(), infer(rgb, timestamp_ms) -> tablica (33, 4)
+albo None, infer_all() -> lista sylwetek, close(). Backendy z supports_async (tasks
+w trybie LIVE_STREAM) mają też infer_async(), które nie czeka na wynik. PostureDetector nie zależy od konkretnej biblioteki,
+więc na danym procesorze można wybrać najszybszy backend bez zmian w kodzie wywołującym.
+
+Dostępne backendy:
+    mediapipe-solutions - mp.solutions.pose (starsze wersje MediaPipe)
+    mediapipe-tasks     - PoseLandmarker z mediapipe.tasks (tryb VIDEO albo LIVE_STREAM)
+    mediapipe-direct    - bezpośredni import modułów (problematyczne instalacje)
+    movenet-onnx        - MoveNet SinglePose przez onnxruntime
+    movenet-cv2         - MoveNet SinglePose przez cv2.dnn (bez dodatkowych zależności)
+    auto                - MediaPipe: solutions, potem tasks, potem direct
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import cv2
+import numpy as np
+
+from landmark_array import NUM_LANDMARKS, landmarks_to_array
+
+
+class PoseBackend:
+    """Interfejs backendu: obraz RGB -> 33 punkty BlazePose (x, y, z, visibility)"""
+
+    name = 'base'
+    supports_async = False
+    max_poses = 1  # ile sylwetek backend zwraca z jednej inferencji
+
+    def load(self):
+        """Załaduj model (może trwać - wywoływane raz, poza pętlą analizy)"""
+        raise NotImplementedError
+
+    def infer(self, rgb: np.ndarray, timestamp_ms: int) -> Optional[np.ndarray]:
+        """
+        Wykryj sylwetkę na obrazie RGB
+
+        Args:
+            rgb: Obraz RGB uint8 (H, W, 3)
+            timestamp_ms: Ściśle rosnący znacznik czasu (backendy ze śledzeniem)
+
+        Returns:
+            Tablica (33, 4) float32 ze współrzędnymi znormalizowanymi do obrazu albo None
+        """
+        raise NotImplementedError
+
+    def infer_all(self, rgb: np.ndarray, timestamp_ms: int) -> List[np.ndarray]:
+        """Wszystkie sylwetki z jednej inferencji (backend jednoosobowy: najwyżej jedna)"""
+        array = self.infer(rgb, timestamp_ms)
+        return [] if array is None else [array]
+
+    def infer_async(self, rgb: np.ndarray, timestamp_ms: int,
+                    callback: Callable[[List[np.ndarray], int], None]):
+        """
+        Rozpocznij analizę bez czekania na wynik (tylko gdy supports_async)
+
+        callback(lista sylwetek, timestamp_ms) jest wywoływany z wątku backendu.
+        Klatki, których backend nie nadąża analizować, są pomijane bez wywołania.
+        """
+        raise NotImplementedError(f"Backend {self.name} nie obsługuje analizy asynchronicznej")
+
+    def close(self):
+        """Zwolnij zasoby"""
+
+
+# ========== MEDIAPIPE ==========
+
+class MediaPipeSolutionsBackend(PoseBackend):
+    """mp.solutions.pose w trybie śledzenia (static_image_mode=False)"""
+
+    name = 'solutions'
+
+    def __init__(self, model_complexity: int = 1):
+        self.model_complexity = model_complexity
+        self.pose = None
+
+    def _pose_module(self):
+        import mediapipe as mp
+        if not (hasattr(mp, 'solutions') and hasattr(mp.solutions, 'pose')):
+            raise ImportError("MediaPipe nie ma solutions API")
+        return mp.solutions.pose
+
+    def load(self):
+        mp_pose = self._pose_module()
+        self.pose = mp_pose.Pose(
+            static_image_mode=False,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=0.6,
+            min_tracking_confidence=0.5,
+            smooth_landmarks=True
+        )
+
+    def infer(self, rgb: np.ndarray, timestamp_ms: int) -> Optional[np.ndarray]:
+        results = self.pose.process(rgb)
+        if not results.pose_landmarks:
+            return None
+        return landmarks_to_array(results.pose_landmarks.landmark)
+
+    def close(self):
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+
+
+class MediaPipeDirectBackend(MediaPipeSolutionsBackend):
+    """Jak solutions, ale z bezpośrednim importem modułów (dla problematycznych instalacji)"""
+
+    name = 'direct'
+
+    def _pose_module(self):
+        import mediapipe.python.solutions.pose as mp_pose
+        return mp_pose
+
+
+class MediaPipeTasksBackend(PoseBackend):
+    """
+    PoseLandmarker z mediapipe.tasks
+
+    W trybie VIDEO infer() czeka na wynik. W trybie LIVE_STREAM klatki idą przez
+    infer_async() (detect_async), a MediaPipe sam pomija te, których nie nadąża
+    przeanalizować - wątek wywołujący nigdy nie czeka na model. Przy num_poses > 1
+    jedna inferencja zwraca do num_poses sylwetek (infer_all).
+    """
+
+    name = 'tasks'
+    VARIANTS = ('lite', 'full', 'heavy')
+
+    def __init__(self, model_path: Optional[str] = None, variant: str = 'lite', live_stream: bool = False,
+                 num_poses: int = 1):
+        """
+        Args:
+            model_path: Plik .task (domyślnie model wariantu variant z model_registry)
+            variant: 'lite', 'full' albo 'heavy' - dokładniejszy znaczy wolniejszy
+            live_stream: Tryb LIVE_STREAM (infer_async) zamiast VIDEO (infer)
+            num_poses: Maksymalna liczba wykrywanych osób
+        """
+        if variant not in self.VARIANTS:
+            raise ValueError(f"Nieznany wariant modelu: {variant}")
+        self.model_path = model_path
+        self.variant = variant
+        self.live_stream = live_stream
+        self.supports_async = live_stream
+        self.max_poses = max(1, num_poses)
+        self.pose = None
+        self._mp = None
+        self._callback = None
+
+    def load(self):
+        import mediapipe as mp
+        if not hasattr(mp, 'tasks'):
+            raise ImportError("MediaPipe nie ma tasks API")
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
+
+        if self.model_path:
+            base_options = python.BaseOptions(model_asset_path=self.model_path)
+        else:
+            # Zweryfikowany model z lokalnego rejestru - bez pobierania przy starcie
+            from model_registry import ModelRegistry
+            base_options = python.BaseOptions(model_asset_buffer=ModelRegistry().load_buffer(self.variant))
+        mode_options = {'running_mode': vision.RunningMode.VIDEO}
+        if self.live_stream:
+            mode_options = {'running_mode': vision.RunningMode.LIVE_STREAM, 'result_callback': self._on_result}
+        options = vision.PoseLandmarkerOptions(
+            base_options=base_options,
+            min_pose_detection_confidence=0.6,
+            min_pose_presence_confidence=0.5,
+            min_tracking_confidence=0.5,
+            num_poses=self.max_poses,
+            **mode_options
+        )
+        self.pose = vision.PoseLandmarker.create_from_options(options)
+        self._mp = mp
+
+    @staticmethod
+    def _to_arrays(results) -> List[np.ndarray]:
+        arrays = [landmarks_to_array(landmarks) for landmarks in results.pose_landmarks or []]
+        return [a for a in arrays if a is not None]
+
+    def infer_all(self, rgb: np.ndarray, timestamp_ms: int) -> List[np.ndarray]:
+        if self.live_stream:
+            raise RuntimeError("Backend w trybie LIVE_STREAM - użyj infer_async()")
+        mp_image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=rgb)
+        return self._to_arrays(self.pose.detect_for_video(mp_image, timestamp_ms))
+
+    def infer(self, rgb: np.ndarray, timestamp_ms: int) -> Optional[np.ndarray]:
+        arrays = self.infer_all(rgb, timestamp_ms)
+        return arrays[0] if arrays else None
+
+    def infer_async(self, rgb: np.ndarray, timestamp_ms: int,
+                    callback: Callable[[List[np.ndarray], int], None]):
+        if not self.live_stream:
+            return super().infer_async(rgb, timestamp_ms, callback)
+        self._callback = callback
+        mp_image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=rgb)
+        self.pose.detect_async(mp_image, timestamp_ms)
+
+    def _on_result(self, results, output_image, timestamp_ms: int):
+        """Wywoływane przez MediaPipe z jego wątku"""
+        if self._callback is not None:
+            self._callback(self._to_arrays(results), timestamp_ms)
+
+    def close(self):
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+
+
+# ========== MOVENET ==========
+
+# Indeksy BlazePose dla 17 punktów COCO zwracanych przez MoveNet
+# (nos, oczy, uszy, ramiona, łokcie, nadgarstki, biodra, kolana, kostki)
+MOVENET_TO_BLAZEPOSE = np.array([0, 2, 5, 7, 8, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28])
+
+DEFAULT_MOVENET_MODEL = Path.home() / ".posture_monitor" / "models" / "movenet_singlepose_lightning.onnx"
+
+
+class MoveNetBackend(PoseBackend):
+    """
+    MoveNet SinglePose (Lightning 192 px / Thunder 256 px) z modelu ONNX
+
+    Model zwraca 17 punktów COCO (y, x, pewność); są one wpisywane w odpowiadające
+    im pozycje 33 punktów BlazePose, pozostałe dostają visibility 0. Ucho, ramię
+    i biodro - jedyne potrzebne do oceny postawy - są w obu zestawach.
+
+    MoveNet nie śledzi sylwetki między klatkami; timestamp_ms jest ignorowany.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, engine: str = 'onnxruntime',
+                 keypoint_threshold: float = 0.3, threads: int = 0):
+        """
+        Args:
+            model_path: Plik .onnx (domyślnie ~/.posture_monitor/models/movenet_singlepose_lightning.onnx)
+            engine: 'onnxruntime' albo 'cv2' (cv2.dnn)
+            keypoint_threshold: Pewność MoveNet odpowiadająca visibility 0.5 w MediaPipe
+            threads: Liczba wątków obliczeń (0 = domyślna biblioteki)
+        """
+        self.model_path = str(model_path or DEFAULT_MOVENET_MODEL)
+        self.engine = engine
+        self.keypoint_threshold = keypoint_threshold
+        self.threads = threads
+        self.name = f"movenet-{'onnx' if engine == 'onnxruntime' else 'cv2'}"
+
+        self._session = None
+        self._net = None
+        self._input_name = None
+        self._input_size = 192
+        self._input_dtype = np.int32
+
+    def load(self):
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(
+                f"Brak modelu MoveNet: {self.model_path} "
+                "(wyeksportuj movenet/singlepose/lightning do ONNX i zapisz pod tą ścieżką)"
+            )
+
+        if self.engine == 'onnxruntime':
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            if self.threads:
+                options.intra_op_num_threads = self.threads
+            self._session = ort.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+            model_input = self._session.get_inputs()[0]
+            self._input_name = model_input.name
+            if isinstance(model_input.shape[1], int):
+                self._input_size = model_input.shape[1]
+            self._input_dtype = np.float32 if 'float' in model_input.type else np.int32
+        elif self.engine == 'cv2':
+            self._net = cv2.dnn.readNetFromONNX(self.model_path)
+            self._net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self._net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            if self.threads:
+                cv2.setNumThreads(self.threads)
+            # Rozmiar wejścia z nazwy pliku (thunder = 256), cv2.dnn przyjmuje float32
+            self._input_size = 256 if 'thunder' in os.path.basename(self.model_path) else 192
+            self._input_dtype = np.float32
+        else:
+            raise ValueError(f"Nieznany silnik MoveNet: {self.engine}")
+
+    def _letterbox(self, rgb: np.ndarray):
+        """Kwadratowe wejście z zachowaniem proporcji (dopełnienie zerami z prawej i u dołu)"""
+        h, w = rgb.shape[:2]
+        size = self._input_size
+        scale = size / max(h, w)
+        nw, nh = max(1, round(w * scale)), max(1, round(h * scale))
+        canvas = np.zeros((size, size, 3), dtype=np.uint8)
+        canvas[:nh, :nw] = cv2.resize(rgb, (nw, nh), interpolation=cv2.INTER_AREA)
+        return canvas, nw / size, nh / size
+
+    def infer(self, rgb: np.ndarray, timestamp_ms: int) -> Optional[np.ndarray]:
+        canvas, fx, fy = self._letterbox(rgb)
+        blob = canvas[None].astype(self._input_dtype)
+
+        if self._session is not None:
+            output = self._session.run(None, {self._input_name: blob})[0]
+        else:
+            self._net.setInput(blob)
+            output = self._net.forward()
+
+        keypoints = np.asarray(output, dtype=np.float32).reshape(17, 3)
+        if keypoints[:, 2].max() < self.keypoint_threshold:
+            return None
+
+        array = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        # Współrzędne względem kwadratu -> względem obrazu (bez dopełnienia)
+        array[MOVENET_TO_BLAZEPOSE, 0] = keypoints[:, 1] / fx
+        array[MOVENET_TO_BLAZEPOSE, 1] = keypoints[:, 0] / fy
+        array[MOVENET_TO_BLAZEPOSE, 3] = np.clip(keypoints[:, 2] * (0.5 / self.keypoint_threshold), 0.0, 1.0)
+        return array
+
+    def close(self):
+        self._session = None
+        self._net = None
+
+
+# ========== WYBÓR BACKENDU ==========
+
+BACKENDS = ('auto', 'mediapipe-solutions', 'mediapipe-tasks', 'mediapipe-direct', 'movenet-onnx', 'movenet-cv2')
+
+
+def _build(name: str, model_path: Optional[str] = None, options: Optional[dict] = None) -> PoseBackend:
+    """options - dodatkowe argumenty konstruktora (model_complexity, variant, threads)"""
+    options = options or {}
+    if name == 'mediapipe-solutions':
+        return MediaPipeSolutionsBackend(**options)
+    if name == 'mediapipe-tasks':
+        return MediaPipeTasksBackend(model_path, **options)
+    if name == 'mediapipe-direct':
+        return MediaPipeDirectBackend(**options)
+    if name == 'movenet-onnx':
+        return MoveNetBackend(model_path, engine='onnxruntime', **options)
+    if name == 'movenet-cv2':
+        return MoveNetBackend(model_path, engine='cv2', **options)
+    raise ValueError(f"Nieznany backend: {name} (dostępne: {', '.join(BACKENDS)})")
+
+
+def create_backend(name: str = 'auto', model_path: Optional[str] = None,
+                   options: Optional[dict] = None) -> PoseBackend:
+    """
+    Utwórz i załaduj backend
+
+    'auto' próbuje kolejno MediaPipe solutions, tasks i direct - tak jak
+    wcześniejsza inicjalizacja PostureDetector. options (np. wynik
+    backend_calibration) dotyczą tylko jawnie wybranego backendu.
+    """
+    if name != 'auto':
+        backend = _build(name, model_path, options)
+        backend.load()
+        print(f"Backend sylwetki: {backend.name}")
+        return backend
+
+    errors = []
+    for candidate in ('mediapipe-solutions', 'mediapipe-tasks', 'mediapipe-direct'):
+        backend = _build(candidate, model_path)
+        try:
+            backend.load()
+            print(f"Backend sylwetki: {backend.name}")
+            return backend
+        except Exception as e:
+            errors.append(f"{candidate}: {e}")
+            print(f"Backend {candidate} niedostępny: {e}")
+
+    raise RuntimeError(
+        "Nie można zainicjalizować MediaPipe. "
+        "Spróbuj przeinstalować: pip uninstall mediapipe && pip install mediapipe==0.10.9\n"
+        + "\n".join(errors)
+    )
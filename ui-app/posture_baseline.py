@@ -0,0 +1,197 @@
+"""
+Moduł z osobistą linią bazową postawy (kalibracja użytkownika)
+Naturalna geometria ucho-ramię-biodro różni się między osobami, więc jeden
+globalny próg garbienia jednym osobom daje fałszywe alarmy, a innym żadnych.
+Podczas kalibracji użytkownik siedzi prosto przez kilkanaście sekund, a z
+norm_dist liczona jest odporna statystyka (mediana i MAD) osobno dla każdej
+strony ciała i dla każdej kamery.
+
+Linia bazowa zapisywana jest w baseline.json obok statistics.db. Detektor
+zamienia ją raz na przesunięcie progu dla strony - w analizie klatki to jedno
+odejmowanie: norm_dist - przesunięcie[strona] porównywane z tym samym progiem.
+Sam norm_dist (wynik, statystyki) zostaje surowy; przesunięcie trafia do
+landmarks['baseline_offset'], z którego korzysta histereza PostureFilter.
+
+Użycie:
+    python posture_baseline.py list
+    python posture_baseline.py clear --camera 0
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from landmark_array import SIDES
+from statistics_store import default_db_path
+
+
+BASELINE_FILENAME = "baseline.json"
+DEFAULT_DURATION = 20.0  # sekundy siedzenia prosto
+MIN_SAMPLES = 5  # mniej pomiarów strony = strona bez kalibracji
+
+MAD_SCALE = 1.4826  # MAD -> odchylenie standardowe dla rozkładu normalnego
+MAD_K = 3.0  # osobisty limit: mediana + MAD_K odchyleń
+MIN_MARGIN = 0.05  # ...ale nie mniej niż tyle ponad medianę (bardzo stabilny pomiar)
+
+
+def default_baseline_path(db_path: Optional[Path] = None) -> Path:
+    """baseline.json w katalogu bazy statystyk"""
+    return Path(db_path or default_db_path()).parent / BASELINE_FILENAME
+
+
+def camera_key(camera) -> str:
+    """Klucz kamery - indeks z GUI i --camera z trybu bez GUI dają ten sam klucz"""
+    return str(camera)
+
+
+def robust_stats(values: Iterable[float]) -> Dict[str, float]:
+    """Mediana i przeskalowane MAD (odporne na pojedyncze pochylenia w trakcie kalibracji)"""
+    values = np.asarray(list(values), dtype=np.float64)
+    median = float(np.median(values))
+    mad = float(np.median(np.abs(values - median))) * MAD_SCALE
+    return {'median': round(median, 4), 'mad': round(mad, 4), 'samples': int(values.size)}
+
+
+def personal_limit(stats: Dict[str, float]) -> float:
+    """norm_dist, powyżej którego postawa jest zła dla tej osoby i strony"""
+    return stats['median'] + max(MAD_K * stats['mad'], MIN_MARGIN)
+
+
+def side_offsets(entry: Optional[Dict], threshold: float) -> Optional[np.ndarray]:
+    """
+    Linia bazowa -> przesunięcia (2,) dla score_landmarks
+
+    norm_dist - przesunięcie <= threshold dokładnie wtedy, gdy norm_dist mieści
+    się w osobistym limicie. Strona bez kalibracji ma przesunięcie 0 (globalny próg).
+    """
+    if not entry:
+        return None
+    offsets = np.zeros(len(SIDES), dtype=np.float32)
+    for i, side in enumerate(SIDES):
+        stats = entry.get('sides', {}).get(side)
+        if stats:
+            offsets[i] = personal_limit(stats) - threshold
+    return offsets
+
+
+class BaselineCollector:
+    """Zbiera norm_dist z analiz podczas kalibracji (osobno dla stron)"""
+
+    def __init__(self, duration: float = DEFAULT_DURATION, min_samples: int = MIN_SAMPLES):
+        self.duration = duration
+        self.min_samples = min_samples
+        self._values = {side: [] for side in SIDES}
+        self._started = time.monotonic()
+        self.missed = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    @property
+    def progress(self) -> float:
+        return min(1.0, self.elapsed / self.duration) if self.duration > 0 else 1.0
+
+    @property
+    def done(self) -> bool:
+        return self.elapsed >= self.duration
+
+    @property
+    def samples(self) -> int:
+        return sum(len(v) for v in self._values.values())
+
+    def add(self, norm_dist: float, side: Optional[str]):
+        """Wynik analizy bez linii bazowej; side=None - nie wykryto sylwetki"""
+        if side not in self._values:
+            self.missed += 1
+            return
+        self._values[side].append(float(norm_dist))
+
+    def result(self) -> Optional[Dict]:
+        """Linia bazowa do zapisu albo None, gdy żadna strona nie ma dość pomiarów"""
+        sides = {side: robust_stats(values) for side, values in self._values.items()
+                 if len(values) >= self.min_samples}
+        if not sides:
+            return None
+        return {
+            'sides': sides,
+            'duration': round(self.elapsed, 1),
+            'timestamp': datetime.now().isoformat(timespec='seconds')
+        }
+
+
+class BaselineStore:
+    """Linie bazowe wszystkich kamer w jednym pliku JSON"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else default_baseline_path()
+
+    def load_all(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, camera) -> Optional[Dict]:
+        return self.load_all().get(camera_key(camera))
+
+    def _write(self, data: Dict[str, Dict]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def save(self, camera, entry: Dict):
+        data = self.load_all()
+        data[camera_key(camera)] = entry
+        self._write(data)
+
+    def remove(self, camera) -> bool:
+        data = self.load_all()
+        if data.pop(camera_key(camera), None) is None:
+            return False
+        self._write(data)
+        return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Osobiste linie bazowe postawy")
+    parser.add_argument("--path", help=f"Plik linii bazowych (domyślnie {default_baseline_path()})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Pokaż zapisane linie bazowe")
+    clear = commands.add_parser("clear", help="Usuń linię bazową kamery")
+    clear.add_argument("--camera", default="0", help="Kamera (indeks albo źródło jak w --camera)")
+    args = parser.parse_args()
+
+    store = BaselineStore(args.path)
+
+    if args.command == "list":
+        entries = store.load_all()
+        if not entries:
+            print("Brak zapisanych linii bazowych")
+        for camera, entry in sorted(entries.items()):
+            print(f"Kamera {camera} ({entry.get('timestamp', '?')}):")
+            for side, stats in sorted(entry.get('sides', {}).items()):
+                print(f"  {side:<5} mediana {stats['median']:.3f}, MAD {stats['mad']:.3f}, "
+                      f"limit {personal_limit(stats):.3f} ({stats['samples']} pomiarów)")
+        return 0
+
+    if not store.remove(args.camera):
+        print(f"Brak linii bazowej dla kamery {args.camera}", file=sys.stderr)
+        return 1
+    print(f"Usunięto linię bazową kamery {args.camera}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
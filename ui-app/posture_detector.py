@@ -1,221 +1,263 @@
 """
-Moduł do detekcji postawy ciała używając MediaPipe
-Wersja poprawiona - używa tasks API jeśli solutions nie działa
+Moduł do detekcji postawy ciała
+Wykrywanie sylwetki realizuje wymienny backend (pose_backends) - domyślnie MediaPipe
 """
 
 import cv2
 import numpy as np
-from typing import Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 import sys
+import threading
+import time
+
+from frame_pool import FramePool
+from landmark_array import SIDES, score_landmarks, side_confidence, to_frame_coords
+from person_tracker import PERSON_MODES, PersonTracker
+from pose_backends import create_backend
+from posture_baseline import side_offsets
+from posture_metrics import compute_metrics, failed_metrics, metrics_row
+
+
+# Połączenia 33 punktów BlazePose (to samo co mp.solutions.pose.POSE_CONNECTIONS)
+POSE_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32)
+)
+
+# Wycinek ROI wyrównany do siatki (piksele) - drobne ruchy nie zmieniają kadru modelu
+ROI_GRID = 32
+# Nowy, mniejszy wycinek dopiero gdy obecny jest ponad tyle razy większy od potrzebnego
+ROI_MAX_SLACK = 1.6
 
 
 class PostureDetector:
     """Klasa do detekcji i analizy postawy ciała"""
 
-    def __init__(self, posture_threshold: float = 0.20):
+    def __init__(self, posture_threshold: float = 0.20, inference_long_edge: Optional[int] = 480,
+                 roi_tracking: bool = False, roi_padding: float = 0.25, roi_min_confidence: float = 0.6,
+                 backend: str = 'auto', pose_model: Optional[str] = None,
+                 backend_options: Optional[dict] = None, buffer_pool: bool = False,
+                 metric_thresholds: Optional[dict] = None, baseline: Optional[dict] = None,
+                 num_poses: int = 1, person_mode: str = 'primary'):
         """
         Args:
             posture_threshold: Próg garbienia (0.20 = realistyczny próg dla normalnej postawy)
                               Poprzednia wartość 0.12 była zbyt restrykcyjna
+            inference_long_edge: Dłuższy bok klatki przekazywanej do MediaPipe.
+                              Większe klatki są zmniejszane przed konwersją do RGB.
+                              None = analiza w pełnej rozdzielczości
+            roi_tracking: Analizuj tylko wycinek wokół sylwetki z poprzedniej klatki
+            roi_padding: Margines wycinka jako ułamek dłuższego boku sylwetki
+            roi_min_confidence: Minimalna średnia widoczność punktów kluczowych
+                              w wycinku - poniżej analiza wraca do pełnej klatki
+            backend: Backend wykrywania sylwetki (pose_backends.BACKENDS), 'auto' = MediaPipe
+            pose_model: Plik modelu dla backendu (tasks .task, MoveNet .onnx)
+            backend_options: Ustawienia backendu (model_complexity, variant, threads),
+                              np. wybrane przez backend_calibration
+            buffer_pool: Zmniejszona i RGB klatka w buforach wielokrotnego użytku
+                              zamiast nowych tablic przy każdej analizie
+            metric_thresholds: Progi dodatkowych metryk (posture_metrics.DEFAULT_THRESHOLDS)
+            baseline: Osobista linia bazowa kamery (posture_baseline) - próg
+                      względem naturalnej postawy użytkownika zamiast globalnego
+            num_poses: Ile osób wykrywać w jednej inferencji (> 1 wymaga mediapipe-tasks);
+                      oceniana jest osoba główna śledzona przez PersonTracker
+            person_mode: 'primary' - tylko osoba główna, 'all' - także wyniki
+                      pozostałych osób (landmarks['people'])
         """
         self.POSTURE_THRESHOLD = posture_threshold
+        self.metric_thresholds = metric_thresholds
+        self.set_baseline(baseline)
+        self.inference_long_edge = inference_long_edge
+
+        # Śledzenie obszaru zainteresowania (ROI)
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi_min_confidence = roi_min_confidence
+        self._roi = None  # (x0, y0, x1, y1) w pikselach pełnej klatki
+        self._last_region = None
+        self._last_timestamp_ms = -1
         
-        # Spróbuj zaimportować MediaPipe z obsługą różnych wersji
-        self._init_mediapipe()
-        
-    def _init_mediapipe(self):
-        """Inicjalizacja MediaPipe z obsługą różnych API"""
-        try:
-            import mediapipe as mp
-            
-            # Sprawdź jakie API jest dostępne
-            print("MediaPipe version:", mp.__version__)
-            print("Dostępne atrybuty:", [attr for attr in dir(mp) if not attr.startswith('_')])
-            
-            # Próba 1: Użyj solutions API (starsze wersje lub Linux)
-            if hasattr(mp, 'solutions') and hasattr(mp.solutions, 'pose'):
-                print("Używam MediaPipe solutions API")
-                self.mp_pose = mp.solutions.pose
-                self.pose = self.mp_pose.Pose(
-                    static_image_mode=False,
-                    model_complexity=1,
-                    min_detection_confidence=0.6,
-                    min_tracking_confidence=0.5,
-                    smooth_landmarks=True
-                )
-                self.mp_drawing = mp.solutions.drawing_utils
-                self.mp_drawing_styles = mp.solutions.drawing_styles
-                self.api_type = 'solutions'
-                return
-            
-            # Próba 2: Użyj tasks API (nowsze wersje)
-            elif hasattr(mp, 'tasks'):
-                print("Używam MediaPipe tasks API")
-                from mediapipe.tasks import python
-                from mediapipe.tasks.python import vision
-                
-                # Pobierz model pose landmarker
-                model_path = self._download_pose_model()
-                
-                base_options = python.BaseOptions(model_asset_path=model_path)
-                options = vision.PoseLandmarkerOptions(
-                    base_options=base_options,
-                    running_mode=vision.RunningMode.VIDEO,
-                    min_pose_detection_confidence=0.6,
-                    min_pose_presence_confidence=0.5,
-                    min_tracking_confidence=0.5
-                )
-                self.pose = vision.PoseLandmarker.create_from_options(options)
-                self.api_type = 'tasks'
-                
-                # Mapowanie landmark indices (kompatybilność z solutions API)
-                self.POSE_LANDMARKS = {
-                    'LEFT_SHOULDER': 11,
-                    'LEFT_HIP': 23,
-                    'LEFT_EAR': 7,
-                    'RIGHT_SHOULDER': 12,
-                    'RIGHT_HIP': 24,
-                    'RIGHT_EAR': 8
-                }
-                return
-            
-            else:
-                raise ImportError("MediaPipe nie ma ani 'solutions' ani 'tasks' API")
-                
-        except Exception as e:
-            print(f"BŁĄD inicjalizacji MediaPipe: {e}")
-            print(f"Typ błędu: {type(e).__name__}")
-            import traceback
-            traceback.print_exc()
-            
-            # Fallback - spróbuj prostszej metody
-            print("\nPróbuję alternatywną metodę inicjalizacji...")
-            self._init_mediapipe_fallback()
-    
-    def _init_mediapipe_fallback(self):
-        """Alternatywna metoda inicjalizacji dla problematycznych instalacji"""
-        try:
-            # Bezpośredni import modułów
-            import mediapipe.python.solutions.pose as mp_pose
-            import mediapipe.python.solutions.drawing_utils as mp_drawing
-            
-            print("Użyto bezpośredniego importu modułów MediaPipe")
-            
-            self.mp_pose = mp_pose
-            self.pose = mp_pose.Pose(
-                static_image_mode=False,
-                model_complexity=1,
-                min_detection_confidence=0.6,
-                min_tracking_confidence=0.5,
-                smooth_landmarks=True
-            )
-            self.mp_drawing = mp_drawing
-            self.api_type = 'direct'
-            
-        except Exception as e:
-            print(f"Fallback również nie zadziałał: {e}")
-            raise RuntimeError(
-                "Nie można zainicjalizować MediaPipe. "
-                "Spróbuj przeinstalować: pip uninstall mediapipe && pip install mediapipe==0.10.9"
-            )
-    
-    def _download_pose_model(self) -> str:
-        """Pobierz model pose landmarker dla tasks API"""
-        import os
-        import urllib.request
-        
-        model_dir = os.path.expanduser("~/.mediapipe/models")
-        os.makedirs(model_dir, exist_ok=True)
-        
-        model_path = os.path.join(model_dir, "pose_landmarker_lite.task")
-        
-        if not os.path.exists(model_path):
-            print("Pobieram model pose landmarker...")
-            url = "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/pose_landmarker_lite.task"
-            
-            try:
-                urllib.request.urlretrieve(url, model_path)
-                print("Model pobrany")
-            except Exception as e:
-                print(f"Nie można pobrać modelu: {e}")
-                raise
-        
-        return model_path
-    
-    def get_point(self, results, landmark_name: str, w: int, h: int) -> Optional[np.ndarray]:
+        self._last_array = None
+        self._pool = FramePool() if buffer_pool else None
+
+        # Analiza asynchroniczna (LIVE_STREAM): kontekst klatek czekających na wynik
+        self._async_lock = threading.Lock()
+        self._pending = {}  # timestamp_ms -> (region, (w, h), callback)
+        self.async_submitted = 0
+        self.async_completed = 0
+        self.async_dropped = 0
+
+        # Kilka osób w kadrze: jedna inferencja, stałe numery osób z trackera
+        if person_mode not in PERSON_MODES:
+            raise ValueError(f"Nieznany tryb osób: {person_mode} (dostępne: {', '.join(PERSON_MODES)})")
+        self.person_mode = person_mode
+        self.tracker = None
+        if num_poses > 1:
+            if backend not in ('auto', 'mediapipe-tasks'):
+                print(f"Wykrywanie kilku osób wymaga backendu mediapipe-tasks (zamiast {backend})")
+            backend_options = dict(backend_options or {}) if backend == 'mediapipe-tasks' else {}
+            backend_options['num_poses'] = num_poses
+            backend = 'mediapipe-tasks'
+            # Wycinek wokół jednej osoby ukryłby pozostałe
+            self.roi_tracking = False
+            self.tracker = PersonTracker()
+
+        # Backend ładuje model; api_type to nazwa użytego backendu
+        self.backend = create_backend(backend, pose_model, backend_options)
+        self.api_type = self.backend.name
+
+    def set_baseline(self, baseline: Optional[dict]):
         """
-        Zwraca współrzędne punktu sylwetki w pikselach
-        Sprawdza visibility i zwraca None jeśli punkt jest słabo widoczny
+        Ustaw osobistą linię bazową (None = globalny próg, np. na czas kalibracji)
+        Przesunięcia liczone są tutaj raz - analiza klatki dodaje tylko odejmowanie
         """
-        try:
-            if self.api_type == 'solutions' or self.api_type == 'direct':
-                # Solutions API
-                landmark_idx = getattr(self.mp_pose.PoseLandmark, landmark_name)
-                lm = results.pose_landmarks.landmark[landmark_idx]
-
-                # Sprawdź visibility - jeśli za niska, punkt jest niepewny
-                if lm.visibility < 0.5:
-                    return None
+        self.baseline = baseline
+        self._baseline_offsets = side_offsets(baseline, self.POSTURE_THRESHOLD)
 
-                return np.array([lm.x * w, lm.y * h])
+    def _resize_for_inference(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Zmniejsza klatkę do rozmiaru inferencji z zachowaniem proporcji
+        Landmarki MediaPipe są znormalizowane (0-1), więc przy zachowanych
+        proporcjach mnoży się je wprost przez wymiary pełnej klatki
+        """
+        if not self.inference_long_edge:
+            return frame
 
-            elif self.api_type == 'tasks':
-                # Tasks API
-                if not results.pose_landmarks or len(results.pose_landmarks) == 0:
-                    return None
+        h, w = frame.shape[:2]
+        long_edge = max(h, w)
+        if long_edge <= self.inference_long_edge:
+            return frame
 
-                landmark_idx = self.POSE_LANDMARKS[landmark_name]
-                lm = results.pose_landmarks[0][landmark_idx]
+        scale = self.inference_long_edge / long_edge
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        if self._pool is not None:
+            dst = self._pool.acquire((size[1], size[0]) + frame.shape[2:], frame.dtype)
+            return cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
 
-                # Sprawdź visibility
-                if hasattr(lm, 'visibility') and lm.visibility < 0.5:
-                    return None
+    def _next_timestamp_ms(self, timestamp_ms: Optional[int] = None) -> int:
+        """
+        Rosnący znacznik czasu dla tasks API (VIDEO i LIVE_STREAM wymagają ściśle rosnących wartości)
+        Bez podanej wartości używany jest zegar monotoniczny - ten sam co w CaptureThread
+        """
+        if timestamp_ms is None:
+            timestamp_ms = int(time.monotonic() * 1000)
+        if timestamp_ms <= self._last_timestamp_ms:
+            timestamp_ms = self._last_timestamp_ms + 1
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def _prepare_rgb(self, frame: np.ndarray, region: Tuple[int, int, int, int]) -> np.ndarray:
+        """Wycinek klatki w rozmiarze inferencji, w RGB"""
+        x0, y0, x1, y1 = region
+        # Wycinek to widok na klatkę - bez kopiowania
+        crop = frame[y0:y1, x0:x1]
+
+        # Zmniejsz raz, zanim powstanie kopia RGB
+        small = self._resize_for_inference(crop)
+
+        # Konwersja BGR -> RGB dla modelu
+        if self._pool is not None:
+            return cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._pool.acquire(small.shape, small.dtype))
+        return cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+
+    def _detect(self, frame: np.ndarray, region: Tuple[int, int, int, int],
+                timestamp_ms: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        Uruchamia backend na podanym obszarze klatki
 
-                return np.array([lm.x * w, lm.y * h])
-        except Exception as e:
+        Returns:
+            Tablica (33, 4) ze współrzędnymi znormalizowanymi do pełnej klatki
+            albo None, jeśli nie wykryto sylwetki
+        """
+        rgb = self._prepare_rgb(frame, region)
+        array = self.backend.infer(rgb, self._next_timestamp_ms(timestamp_ms))
+        if array is None:
             return None
 
-        return None
-    
-    def point_line_distance(self, point: np.ndarray, 
-                           line_p1: np.ndarray, 
-                           line_p2: np.ndarray) -> float:
-        """
-        Oblicza odległość punktu od linii
-        Mierzy jak bardzo głowa odstaje od linii tułowia
+        h, w = frame.shape[:2]
+        return to_frame_coords(array, region, w, h)
+
+    def _key_confidence(self, array: np.ndarray) -> float:
+        """Średnia widoczność punktów używanych do oceny postawy (najlepsza strona)"""
+        return side_confidence(array)
+
+    def _compute_roi(self, array: np.ndarray, w: int, h: int) -> Optional[Tuple[int, int, int, int]]:
         """
-        return np.cross(line_p2 - line_p1, point - line_p1) / np.linalg.norm(line_p2 - line_p1)
-    
-    def _get_side_landmarks(self, results, side: str, w: int, h: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[np.ndarray], float]:
+        Prostokąt wokół widocznych punktów sylwetki z marginesem (w pikselach pełnej klatki)
+        Zwraca None, gdy wycinek nie dałby zauważalnego zysku
         """
-        Pobiera punkty dla jednej strony ciała i oblicza ich widoczność
+        visible = array[array[:, 3] >= 0.5]
+        if len(visible) < 3:
+            return None
 
-        Returns:
-            (shoulder, hip, ear, visibility_score)
+        xs = visible[:, 0] * w
+        ys = visible[:, 1] * h
+        bx0, bx1, by0, by1 = xs.min(), xs.max(), ys.min(), ys.max()
+        pad = self.roi_padding * max(bx1 - bx0, by1 - by0)
+
+        roi = (
+            max(0, int(bx0 - pad)),
+            max(0, int(by0 - pad)),
+            min(w, int(bx1 + pad)),
+            min(h, int(by1 + pad))
+        )
+
+        roi_area = (roi[2] - roi[0]) * (roi[3] - roi[1])
+        if roi[2] - roi[0] < 32 or roi[3] - roi[1] < 32 or roi_area > 0.8 * w * h:
+            return None
+        return roi
+
+    def _stable_roi(self, roi: Optional[Tuple[int, int, int, int]],
+                    w: int, h: int) -> Optional[Tuple[int, int, int, int]]:
         """
-        try:
-            shoulder = self.get_point(results, f'{side}_SHOULDER', w, h)
-            hip = self.get_point(results, f'{side}_HIP', w, h)
-            ear = self.get_point(results, f'{side}_EAR', w, h)
+        Wycinek na następną klatkę: obecny, dopóki mieści sylwetkę i nie jest za duży
 
-            if shoulder is None or hip is None or ear is None:
-                return None, None, None, 0.0
+        Tryb śledzenia MediaPipe (i znaczniki czasu grafu) zakłada ciągły kadr -
+        każda zmiana wycinka to skok współrzędnych w układzie modelu. Nowy wycinek
+        jest wyrównywany na zewnątrz do siatki ROI_GRID, więc zmienia się skokowo
+        i rzadko, a nie przy każdym drgnięciu sylwetki.
+        """
+        if roi is None:
+            return None
 
-            # Oblicz "widoczność" na podstawie odległości między punktami
-            # Większa odległość ramię-biodro oznacza lepszą widoczność tej strony
-            torso_len = np.linalg.norm(shoulder - hip)
+        current = self._roi
+        if current is not None:
+            inside = roi[0] >= current[0] and roi[1] >= current[1] \
+                and roi[2] <= current[2] and roi[3] <= current[3]
+            needed = (roi[2] - roi[0]) * (roi[3] - roi[1])
+            area = (current[2] - current[0]) * (current[3] - current[1])
+            if inside and area <= ROI_MAX_SLACK * needed:
+                return current
+
+        grid = ROI_GRID
+        return (
+            roi[0] // grid * grid,
+            roi[1] // grid * grid,
+            min(w, -(-roi[2] // grid) * grid),
+            min(h, -(-roi[3] // grid) * grid)
+        )
 
-            return shoulder, hip, ear, torso_len
-        except:
-            return None, None, None, 0.0
+    def _all_points(self, array: np.ndarray) -> list:
+        """
+        Wszystkie 33 punkty jako [x, y, visibility], x i y znormalizowane
+        względem pełnej klatki (do rysowania nakładki w QML)
+        """
+        return array[:, [0, 1, 3]].tolist()
 
-    def analyze_posture(self, frame: np.ndarray) -> Tuple[bool, float, Optional[dict]]:
+    def analyze_posture(self, frame: np.ndarray,
+                        timestamp_ms: Optional[int] = None) -> Tuple[bool, float, Optional[dict]]:
         """
         Analizuje postawę na podstawie klatki wideo
         Używa obu stron ciała i wybiera lepiej widoczną stronę
 
         Args:
             frame: Klatka wideo (BGR format z OpenCV)
+            timestamp_ms: Czas klatki w nagraniu (analiza plików wideo);
+                          None = bieżący czas (kamera na żywo)
 
         Returns:
             Tuple[is_good_posture, norm_dist, landmarks_dict]
@@ -223,114 +265,227 @@ class PostureDetector:
         if frame is None:
             return False, 0.0, None
 
+        # Wymiary pełnej klatki - do nich przeliczane są landmarki
         h, w, _ = frame.shape
 
         try:
-            # Konwersja BGR -> RGB dla MediaPipe
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Detekcja sylwetki - różne dla różnych API
-            if self.api_type == 'solutions' or self.api_type == 'direct':
-                results = self.pose.process(rgb)
-
-                if not results.pose_landmarks:
-                    return False, 0.0, None
-
-            elif self.api_type == 'tasks':
-                # Tasks API wymaga timestamp
-                import mediapipe as mp
-                timestamp_ms = int(cv2.getTickCount() / cv2.getTickFrequency() * 1000)
-
-                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
-                results = self.pose.detect_for_video(mp_image, timestamp_ms)
-
-                if not results.pose_landmarks:
-                    return False, 0.0, None
-
-            # Zapisz wyniki do rysowania pełnej sylwetki
-            self._last_results = results
-
-            # Pobierz punkty z obu stron ciała
-            left_shoulder, left_hip, left_ear, left_visibility = self._get_side_landmarks(results, 'LEFT', w, h)
-            right_shoulder, right_hip, right_ear, right_visibility = self._get_side_landmarks(results, 'RIGHT', w, h)
-
-            # Wybierz stronę z lepszą widocznością (większa długość tułowia = lepsza widoczność)
-            if left_visibility >= right_visibility and left_visibility > 0:
-                shoulder, hip, ear = left_shoulder, left_hip, left_ear
-                torso_len = left_visibility
-                used_side = 'LEFT'
-            elif right_visibility > 0:
-                shoulder, hip, ear = right_shoulder, right_hip, right_ear
-                torso_len = right_visibility
-                used_side = 'RIGHT'
-            else:
+            region = (0, 0, w, h)
+            array = None
+
+            if self.tracker is not None:
+                # Wszystkie osoby z jednej inferencji na pełnej klatce
+                rgb = self._prepare_rgb(frame, region)
+                arrays = self.backend.infer_all(rgb, self._next_timestamp_ms(timestamp_ms))
+                return self._score_people(arrays, w, h)
+
+            # Najpierw wycinek wokół sylwetki z poprzedniej klatki
+            if self.roi_tracking and self._roi is not None:
+                region = self._roi
+                array = self._detect(frame, region, timestamp_ms)
+                if array is None or self._key_confidence(array) < self.roi_min_confidence:
+                    # Sylwetka wyszła z wycinka albo pewność spadła - pełna klatka
+                    self._roi = None
+                    region = (0, 0, w, h)
+                    array = None
+
+            if array is None:
+                array = self._detect(frame, region, timestamp_ms)
+
+            if array is None:
+                self._roi = None
                 return False, 0.0, None
 
-            if shoulder is None or hip is None or ear is None:
-                return False, 0.0, None
+            return self._score(array, region, w, h)
 
-            # Minimalny próg długości tułowia (żeby uniknąć dzielenia przez małe wartości)
-            if torso_len < 20:
-                return False, 0.0, None
+        except Exception as e:
+            print(f"Błąd podczas analizy postawy: {e}")
+            import traceback
+            traceback.print_exc()
+            return False, 0.0, None
+
+    def _score(self, array: np.ndarray, region: Tuple[int, int, int, int],
+               w: int, h: int) -> Tuple[bool, float, Optional[dict]]:
+        """Ocena wykrytej sylwetki (tablica we współrzędnych pełnej klatki) i stan ROI"""
+        # Zapisz wyniki do rysowania pełnej sylwetki
+        self._last_array = array
+        self._last_region = region
+
+        if self.roi_tracking:
+            self._roi = self._stable_roi(self._compute_roi(array, w, h), w, h)
+
+        # Obie strony ciała naraz - wybierana strona z dłuższym tułowiem (lepiej widoczna),
+        # za krótki tułów lub niewidoczne punkty = brak wyniku
+        score = score_landmarks(array, (w, h), self.POSTURE_THRESHOLD, offsets=self._baseline_offsets)
+        if not score['valid'][0]:
+            return False, 0.0, None
 
-            # Oblicz odległość głowy od linii tułowia
-            raw_dist = self.point_line_distance(ear, hip, shoulder)
-            norm_dist = abs(raw_dist) / torso_len
-
-            # Oceń postawę
-            is_good_posture = norm_dist <= self.POSTURE_THRESHOLD
-
-            # Przygotuj dane punktów
-            landmarks_dict = {
-                'shoulder': shoulder,
-                'hip': hip,
-                'ear': ear,
-                'torso_len': torso_len,
-                'raw_dist': raw_dist,
-                'used_side': used_side
+        ear, shoulder, hip = score['points'][0].astype(np.float64)
+        norm_dist = float(score['norm_dist'][0])
+        is_good_posture = bool(score['is_good'][0])
+
+        # Kąt szyi, barki, pochylenie, odległość od ekranu - z tych samych punktów
+        metrics = compute_metrics(array, (w, h), score, self.metric_thresholds)
+
+        # Przygotuj dane punktów
+        landmarks_dict = {
+            'shoulder': shoulder,
+            'hip': hip,
+            'ear': ear,
+            'torso_len': float(score['torso_len'][0]),
+            'raw_dist': float(score['raw_dist'][0]),
+            'used_side': SIDES[score['side'][0]],
+            # Osobista linia bazowa: ocena porównuje norm_dist - baseline_offset z progiem
+            'baseline_offset': float(score['offset'][0]),
+            'region': region,
+            'points': self._all_points(array),
+            'frame_size': (w, h),
+            'array': array,
+            'metrics': metrics_row(metrics),
+            'failed_metrics': failed_metrics(metrics)
+        }
+
+        return is_good_posture, norm_dist, landmarks_dict
+
+    def _score_people(self, arrays: List[np.ndarray], w: int, h: int) -> Tuple[bool, float, Optional[dict]]:
+        """
+        Ocena osoby głównej spośród kilku sylwetek (współrzędne pełnej klatki)
+        Gdy osoby głównej chwilowo nie ma w kadrze, wynik to brak wykrycia - inna
+        osoba nie przejmuje oceny.
+        """
+        ids = self.tracker.update(arrays)
+        primary = self.tracker.primary_index(ids)
+        if primary is None:
+            return False, 0.0, None
+
+        is_good_posture, norm_dist, landmarks_dict = self._score(arrays[primary], (0, 0, w, h), w, h)
+        if landmarks_dict is None:
+            return is_good_posture, norm_dist, None
+
+        landmarks_dict['person_id'] = ids[primary]
+        landmarks_dict['people_count'] = len(arrays)
+        others = [i for i in range(len(arrays)) if i != primary]
+        landmarks_dict['people'] = self._score_others([arrays[i] for i in others], [ids[i] for i in others], w, h) \
+            if self.person_mode == 'all' and others else []
+        return is_good_posture, norm_dist, landmarks_dict
+
+    def _score_others(self, arrays: List[np.ndarray], ids: List[int], w: int, h: int) -> List[dict]:
+        """Pozostałe osoby jedną wektorową oceną (globalny próg - linia bazowa dotyczy użytkownika)"""
+        stacked = np.stack(arrays)
+        score = score_landmarks(stacked, (w, h), self.POSTURE_THRESHOLD)
+        metrics = compute_metrics(stacked, (w, h), score, self.metric_thresholds)
+        return [
+            {
+                'person_id': person_id,
+                'is_good': bool(score['is_good'][i]),
+                'norm_dist': float(score['norm_dist'][i]),
+                'used_side': SIDES[score['side'][i]],
+                'metrics': metrics_row(metrics, i),
+                'failed_metrics': failed_metrics(metrics, i)
             }
+            for i, person_id in enumerate(ids) if score['valid'][i]
+        ]
+
+    def analyze_posture_async(self, frame: np.ndarray, timestamp_ms: Optional[int] = None,
+                              callback: Optional[Callable] = None) -> Optional[int]:
+        """
+        Rozpocznij analizę bez czekania na wynik (backend z supports_async, np. LIVE_STREAM)
+
+        callback(is_good, norm_dist, landmarks, timestamp_ms) jest wywoływany z wątku
+        backendu. Klatki, których model nie nadąża analizować, backend pomija -
+        wtedy callback nie jest wywoływany. Backend bez trybu asynchronicznego
+        analizuje klatkę od razu i wywołuje callback przed powrotem.
 
-            return is_good_posture, norm_dist, landmarks_dict
+        Args:
+            timestamp_ms: Czas przechwycenia klatki (CaptureThread, zegar monotoniczny)
 
+        Returns:
+            Znacznik czasu, z którym klatka trafiła do analizy (ten sam dostanie
+            callback; może być większy od podanego, gdy ten nie był rosnący),
+            albo None, jeśli klatki nie przekazano
+        """
+        if frame is None:
+            return None
+
+        if not self.backend.supports_async:
+            if timestamp_ms is None:
+                timestamp_ms = int(time.monotonic() * 1000)
+            result = self.analyze_posture(frame, timestamp_ms)
+            if callback is not None:
+                callback(*result, timestamp_ms)
+            return timestamp_ms
+
+        h, w = frame.shape[:2]
+        # Bez czekania na wynik nie da się ponowić analizy na pełnej klatce -
+        # słaby wynik z wycinka tylko kasuje ROI dla następnej klatki
+        region = self._roi if self.roi_tracking and self._roi is not None else (0, 0, w, h)
+        try:
+            rgb = self._prepare_rgb(frame, region)
+            with self._async_lock:
+                timestamp_ms = self._next_timestamp_ms(timestamp_ms)
+                self._pending[timestamp_ms] = (region, (w, h), callback)
+                self.async_submitted += 1
+            self.backend.infer_async(rgb, timestamp_ms, self._on_async_result)
+            return timestamp_ms
         except Exception as e:
             print(f"Błąd podczas analizy postawy: {e}")
-            import traceback
-            traceback.print_exc()
-            return False, 0.0, None
-    
+            with self._async_lock:
+                self._pending.pop(timestamp_ms, None)
+            return None
+
+    def _on_async_result(self, arrays: List[np.ndarray], timestamp_ms: int):
+        """Wynik z wątku backendu - przeliczenie na pełną klatkę i ocena jak w analyze_posture"""
+        with self._async_lock:
+            context = self._pending.pop(timestamp_ms, None)
+            # Wyniki przychodzą w kolejności znaczników - starsze oczekujące zostały pominięte
+            stale = [ts for ts in self._pending if ts < timestamp_ms]
+            for ts in stale:
+                del self._pending[ts]
+            self.async_dropped += len(stale)
+            if context is None:
+                return
+            self.async_completed += 1
+
+            region, (w, h), callback = context
+            result = (False, 0.0, None)
+            try:
+                if self.tracker is not None:
+                    # Bez ROI przy kilku osobach - region to pełna klatka
+                    result = self._score_people(arrays, w, h)
+                else:
+                    array = to_frame_coords(arrays[0], region, w, h) if arrays else None
+                    if array is None or (region != (0, 0, w, h) and self._key_confidence(array) < self.roi_min_confidence):
+                        self._roi = None
+                    else:
+                        result = self._score(array, region, w, h)
+            except Exception as e:
+                print(f"Błąd podczas analizy postawy: {e}")
+
+        if callback is not None:
+            callback(*result, timestamp_ms)
+
     def draw_landmarks(self, frame: np.ndarray,
                        is_good_posture: bool,
                        norm_dist: float,
                        landmarks_dict: Optional[dict]) -> np.ndarray:
         """
         Rysuje punkty kluczowe i informacje na obrazie
-        Używa wbudowanej funkcji MediaPipe dla pełnej sylwetki
+        Pełna sylwetka rysowana z tablicy punktów - niezależnie od backendu
         """
         if landmarks_dict is None:
             return frame
 
-        # Rysuj pełną sylwetkę MediaPipe (jeśli dostępne)
-        if hasattr(self, '_last_results') and self._last_results is not None:
-            try:
-                if self.api_type in ['solutions', 'direct'] and hasattr(self, 'mp_drawing'):
-                    # Użyj wbudowanej funkcji MediaPipe do rysowania
-                    self.mp_drawing.draw_landmarks(
-                        frame,
-                        self._last_results.pose_landmarks,
-                        self.mp_pose.POSE_CONNECTIONS,
-                        landmark_drawing_spec=self.mp_drawing.DrawingSpec(
-                            color=(0, 255, 0) if is_good_posture else (0, 0, 255),
-                            thickness=2,
-                            circle_radius=3
-                        ),
-                        connection_drawing_spec=self.mp_drawing.DrawingSpec(
-                            color=(200, 200, 200),
-                            thickness=2
-                        )
-                    )
-            except Exception as e:
-                # Fallback do ręcznego rysowania
-                pass
+        # Rysuj pełną sylwetkę (punkty są w układzie pełnej klatki)
+        array = landmarks_dict.get('array')
+        if array is not None:
+            h, w = frame.shape[:2]
+            visible = array[:, 3] >= 0.5
+            pts = (array[:, :2] * (w, h)).astype(int)
+            for a, b in POSE_CONNECTIONS:
+                if visible[a] and visible[b]:
+                    cv2.line(frame, tuple(pts[a]), tuple(pts[b]), (200, 200, 200), 2)
+            point_color = (0, 255, 0) if is_good_posture else (0, 0, 255)
+            for i in np.flatnonzero(visible):
+                cv2.circle(frame, tuple(pts[i]), 3, point_color, -1)
 
         shoulder = landmarks_dict['shoulder']
         hip = landmarks_dict['hip']
@@ -407,13 +562,15 @@ class PostureDetector:
 
         return frame
     
+    def buffer_stats(self) -> dict:
+        """Liczniki puli buforów (pusty słownik bez buffer_pool)"""
+        return self._pool.stats() if self._pool is not None else {}
+
     def release(self):
         """Zwolnij zasoby"""
         try:
-            if self.api_type in ['solutions', 'direct']:
-                self.pose.close()
-            # Tasks API automatycznie zwalnia zasoby
-        except:
+            self.backend.close()
+        except Exception:
             pass
 
 
@@ -0,0 +1,183 @@
+"""
+Moduł z filtrowaniem sygnału postawy w czasie
+Pojedyncza zaszumiona klatka w pobliżu progu nie zmienia już oceny:
+norm_dist i punkty sylwetki są wygładzane filtrem One-Euro, a klasyfikacja
+ma osobne progi wejścia w złą postawę i wyjścia z niej (histereza).
+Każda próbka to stała liczba operacji - bez historii i okien.
+"""
+
+import math
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from landmark_array import SIDE_INDICES, SIDES
+
+
+class OneEuroFilter:
+    """
+    Filtr One-Euro (Casiez i in., 2012) dla liczby albo tablicy numpy
+
+    Przy wolnych zmianach mocno wygładza (odcięcie min_cutoff), przy szybkich
+    podnosi częstotliwość odcięcia proporcjonalnie do prędkości (beta),
+    więc prawdziwa zmiana postawy nie jest opóźniana.
+    """
+
+    def __init__(self, min_cutoff: float = 1.0, beta: float = 0.0, d_cutoff: float = 1.0):
+        """
+        Args:
+            min_cutoff: Częstotliwość odcięcia w Hz przy braku ruchu
+            beta: Wzrost odcięcia na jednostkę prędkości sygnału
+            d_cutoff: Odcięcie dla estymaty prędkości
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = None
+        self._dx = 0.0
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt: float):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, value, timestamp: float):
+        if self._x is None:
+            self._x = value
+            self._t = timestamp
+            return value
+
+        dt = max(timestamp - self._t, 1e-6)
+        self._t = timestamp
+
+        dx = (value - self._x) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self._dx = a_d * dx + (1 - a_d) * self._dx
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        a = self._alpha(cutoff, dt)
+        self._x = a * value + (1 - a) * self._x
+        return self._x
+
+
+class HysteresisClassifier:
+    """
+    Ocena postawy z dwoma progami
+
+    Dobra postawa przechodzi w złą dopiero powyżej threshold + margin,
+    a zła w dobrą dopiero poniżej threshold - margin.
+    """
+
+    def __init__(self, threshold: float = 0.20, margin: float = 0.02):
+        self.enter_bad = threshold + margin
+        self.exit_bad = threshold - margin
+        self.threshold = threshold
+        self._is_good = None
+
+    def reset(self):
+        self._is_good = None
+
+    def update(self, value: float) -> bool:
+        if self._is_good is None:
+            # Pierwsza próbka - zwykły próg
+            self._is_good = value <= self.threshold
+        elif self._is_good and value > self.enter_bad:
+            self._is_good = False
+        elif not self._is_good and value < self.exit_bad:
+            self._is_good = True
+        return self._is_good
+
+
+class PostureFilter:
+    """
+    Wygładzanie wyniku analizy: norm_dist, punkty sylwetki i ocena z histerezą
+
+    Wejście i wyjście w formacie analyze_posture: (is_good, norm_dist, landmarks).
+    Przerwa dłuższa niż max_gap sekund (brak osoby, zatrzymany monitoring)
+    zaczyna filtrowanie od nowa.
+    """
+
+    def __init__(self, threshold: float = 0.20, margin: float = 0.02,
+                 min_cutoff: float = 0.05, beta: float = 5.0,
+                 landmark_min_cutoff: float = 0.5, landmark_beta: float = 1.0,
+                 max_gap: float = 30.0):
+        """
+        Args:
+            threshold: Próg garbienia (jak w PostureDetector)
+            margin: Połowa szerokości pasa histerezy wokół progu
+            min_cutoff, beta: Parametry One-Euro dla norm_dist (Hz; domyślne
+                              dopasowane do analizy co kilka sekund)
+            landmark_min_cutoff, landmark_beta: Parametry One-Euro dla punktów sylwetki
+            max_gap: Po takiej przerwie w sekundach filtr startuje od nowa
+        """
+        self.classifier = HysteresisClassifier(threshold, margin)
+        self._norm_filter = OneEuroFilter(min_cutoff, beta)
+        self._point_filter = OneEuroFilter(landmark_min_cutoff, landmark_beta)
+        self.max_gap = max_gap
+
+        self._last_time = None
+        self._point_key = None
+
+    def reset(self):
+        self.classifier.reset()
+        self._norm_filter.reset()
+        self._point_filter.reset()
+        self._last_time = None
+        self._point_key = None
+
+    def update(self, norm_dist: float, landmarks: Optional[dict],
+               timestamp: Optional[float] = None) -> Tuple[bool, float, Optional[dict]]:
+        """
+        Dodaj surowy wynik analizy
+
+        Returns:
+            (wygładzona ocena, wygładzony norm_dist, landmarks z wygładzonymi punktami)
+            Bez wykrytej osoby zwraca (False, 0.0, None) i nie zmienia stanu filtra
+
+        Ocena uwzględnia przesunięcie progu z osobistej linii bazowej
+        (landmarks['baseline_offset']); wygładzany jest surowy norm_dist.
+        """
+        if landmarks is None:
+            return False, 0.0, None
+
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        if self._last_time is not None and timestamp - self._last_time > self.max_gap:
+            self.reset()
+        self._last_time = timestamp
+
+        smoothed = float(self._norm_filter(float(norm_dist), timestamp))
+        is_good = self.classifier.update(smoothed - float(landmarks.get('baseline_offset', 0.0)))
+        return is_good, smoothed, self._smooth_landmarks(landmarks, timestamp)
+
+    def _smooth_landmarks(self, landmarks: dict, timestamp: float) -> dict:
+        """Kopia landmarks z wygładzonymi x, y (tablica, punkty nakładki, ucho/ramię/biodro)"""
+        array = landmarks.get('array')
+        if array is None:
+            return landmarks
+
+        # Inna kamera, osoba albo rozdzielczość - punkty nie są ciągłe
+        key = (landmarks.get('camera_id'), landmarks.get('person_id'), landmarks.get('frame_size'))
+        if key != self._point_key:
+            self._point_filter.reset()
+            self._point_key = key
+
+        smoothed = array.copy()
+        smoothed[:, :2] = self._point_filter(array[:, :2].astype(np.float64), timestamp)
+
+        w, h = landmarks.get('frame_size', (1, 1))
+        ear, shoulder, hip = smoothed[SIDE_INDICES[SIDES.index(landmarks['used_side'])], :2] * (w, h)
+
+        result = dict(landmarks)
+        result.update({
+            'array': smoothed,
+            'points': smoothed[:, [0, 1, 3]].tolist(),
+            'ear': ear.astype(np.float64),
+            'shoulder': shoulder.astype(np.float64),
+            'hip': hip.astype(np.float64)
+        })
+        return result
@@ -0,0 +1,176 @@
+"""
+Moduł z dodatkowymi metrykami postawy liczonymi obok norm_dist
+Wszystkie metryki korzystają z jednego pobrania potrzebnych punktów z tablicy
+(N, 33, 4) i z wyniku score_landmarks (wybrana strona, punkty w pikselach) -
+nowa metryka to nowa funkcja w METRICS, bez kolejnego przejścia po punktach
+i bez kolejnej inferencji.
+
+Metryki (kąty w stopniach):
+    neck_angle     - kąt kraniowertebralny: linia ramię-ucho względem poziomu
+                     (mniejszy = głowa wysunięta do przodu)
+    shoulder_tilt  - nachylenie linii barków względem poziomu (asymetria barków)
+    forward_lean   - odchylenie tułowia (biodro-ramię) od pionu
+    head_size      - pozorna wielkość głowy jako ułamek szerokości klatki
+                     (większa = twarz bliżej ekranu)
+
+Progi można zmienić z linii poleceń: --metric-threshold neck_angle=45
+(parse_metric_threshold), kierunek porównania zostaje jak w DEFAULT_THRESHOLDS.
+"""
+
+import argparse
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from landmark_array import (LEFT_EAR, LEFT_SHOULDER, RIGHT_EAR, RIGHT_SHOULDER,
+                            VISIBILITY_THRESHOLD, score_landmarks)
+
+
+NOSE = 0
+
+# Punkty pobierane raz dla wszystkich metryk (poza tymi z score_landmarks)
+GATHER_INDICES = np.array([NOSE, LEFT_EAR, RIGHT_EAR, LEFT_SHOULDER, RIGHT_SHOULDER])
+_NOSE, _L_EAR, _R_EAR, _L_SHOULDER, _R_SHOULDER = range(5)
+
+MIN_SHOULDER_WIDTH = 20.0  # piksele - z boku barki się pokrywają i nachylenie jest szumem
+
+# Progi: ('min', x) = wartość poniżej x to zła postawa, ('max', x) = powyżej x
+DEFAULT_THRESHOLDS = {
+    'neck_angle': ('min', 50.0),
+    'shoulder_tilt': ('max', 5.0),
+    'forward_lean': ('max', 20.0),
+    'head_size': ('max', 0.25)
+}
+
+# Opisy przekroczonych progów dla powiadomień
+METRIC_LABELS = {
+    'neck_angle': 'głowa wysunięta do przodu',
+    'shoulder_tilt': 'nierówne barki',
+    'forward_lean': 'pochylony tułów',
+    'head_size': 'za blisko ekranu'
+}
+
+
+def _angle_from_horizontal(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """Kąt odcinka względem poziomu w stopniach (0-90), niezależnie od kierunku"""
+    return np.degrees(np.arctan2(np.abs(dy), np.abs(dx)))
+
+
+def _neck_angle(ctx: Dict) -> np.ndarray:
+    ear, shoulder = ctx['points'][:, 0], ctx['points'][:, 1]
+    # Oś y obrazu rośnie w dół - ucho nad ramieniem ma mniejsze y
+    angle = _angle_from_horizontal(ear[:, 0] - shoulder[:, 0], shoulder[:, 1] - ear[:, 1])
+    return np.where(ctx['valid'] & (ear[:, 1] < shoulder[:, 1]), angle, np.nan)
+
+
+def _shoulder_tilt(ctx: Dict) -> np.ndarray:
+    left, right = ctx['xy'][:, _L_SHOULDER], ctx['xy'][:, _R_SHOULDER]
+    dx, dy = right[:, 0] - left[:, 0], right[:, 1] - left[:, 1]
+    usable = ctx['visible'][:, _L_SHOULDER] & ctx['visible'][:, _R_SHOULDER] \
+        & (np.hypot(dx, dy) >= MIN_SHOULDER_WIDTH)
+    return np.where(usable, _angle_from_horizontal(dx, dy), np.nan)
+
+
+def _forward_lean(ctx: Dict) -> np.ndarray:
+    shoulder, hip = ctx['points'][:, 1], ctx['points'][:, 2]
+    from_horizontal = _angle_from_horizontal(shoulder[:, 0] - hip[:, 0], shoulder[:, 1] - hip[:, 1])
+    return np.where(ctx['valid'], 90.0 - from_horizontal, np.nan)
+
+
+def _head_size(ctx: Dict) -> np.ndarray:
+    xy, visible = ctx['xy'], ctx['visible']
+    # Przodem do kamery - rozstaw uszu; bokiem - odległość ucha od nosa
+    spans = np.stack([
+        np.where(visible[:, _L_EAR] & visible[:, _R_EAR],
+                 np.linalg.norm(xy[:, _L_EAR] - xy[:, _R_EAR], axis=1), np.nan),
+        np.where(visible[:, _L_EAR] & visible[:, _NOSE],
+                 np.linalg.norm(xy[:, _L_EAR] - xy[:, _NOSE], axis=1), np.nan),
+        np.where(visible[:, _R_EAR] & visible[:, _NOSE],
+                 np.linalg.norm(xy[:, _R_EAR] - xy[:, _NOSE], axis=1), np.nan)
+    ], axis=1)
+    span = np.where(np.all(np.isnan(spans), axis=1), np.nan, np.nan_to_num(spans, nan=-1.0).max(axis=1))
+    return span / ctx['frame_width']
+
+
+# Nazwa -> funkcja wspólnego kontekstu, zwraca (N,) z NaN tam, gdzie metryki nie da się policzyć
+METRICS: Dict[str, Callable[[Dict], np.ndarray]] = {
+    'neck_angle': _neck_angle,
+    'shoulder_tilt': _shoulder_tilt,
+    'forward_lean': _forward_lean,
+    'head_size': _head_size
+}
+
+
+def compute_metrics(arrays: np.ndarray, frame_size: Union[Tuple[int, int], np.ndarray],
+                    score: Optional[Dict[str, np.ndarray]] = None,
+                    thresholds: Optional[Dict[str, Tuple[str, float]]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Wszystkie metryki dla wielu klatek naraz
+
+    Args:
+        arrays: (N, 33, 4) albo (33, 4) - współrzędne znormalizowane do pełnej klatki
+        frame_size: (w, h) albo tablica (N, 2)
+        score: Wynik score_landmarks dla tych samych tablic (bez niego liczony tutaj)
+        thresholds: Progi metryk, uzupełniają DEFAULT_THRESHOLDS
+
+    Returns:
+        {nazwa: {'value': (N,), 'ok': (N,) bool}} - brak wartości to NaN i ok=True
+    """
+    arrays = np.asarray(arrays, dtype=np.float32)
+    if arrays.ndim == 2:
+        arrays = arrays[None]
+    n = arrays.shape[0]
+    if score is None:
+        score = score_landmarks(arrays, frame_size)
+
+    scale = np.broadcast_to(np.asarray(frame_size, dtype=np.float32).reshape(-1, 2), (n, 2))
+    gathered = arrays[:, GATHER_INDICES]
+    ctx = {
+        'xy': gathered[:, :, :2] * scale[:, None, :],
+        'visible': np.nan_to_num(gathered[:, :, 3], nan=0.0) >= VISIBILITY_THRESHOLD,
+        'points': score['points'],
+        'valid': score['valid'],
+        'frame_width': scale[:, 0]
+    }
+
+    limits = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    result = {}
+    with np.errstate(invalid='ignore'):
+        for name, metric in METRICS.items():
+            value = metric(ctx)
+            kind, limit = limits[name]
+            bad = value < limit if kind == 'min' else value > limit
+            result[name] = {'value': value, 'ok': ~bad}
+    return result
+
+
+def parse_metric_threshold(value: str) -> Tuple[str, Tuple[str, float]]:
+    """
+    Argument 'nazwa=wartość' (type= dla argparse) -> (nazwa, (kierunek, próg))
+
+    Użycie: action="append", a potem dict(args.metric_threshold) jako thresholds
+    """
+    name, sep, number = value.partition('=')
+    name = name.strip()
+    if not sep or name not in DEFAULT_THRESHOLDS:
+        raise argparse.ArgumentTypeError(
+            f"oczekiwano nazwa=wartość, nazwa jedna z: {', '.join(DEFAULT_THRESHOLDS)}")
+    try:
+        limit = float(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"niepoprawna wartość progu: {number}")
+    return name, (DEFAULT_THRESHOLDS[name][0], limit)
+
+
+def metrics_row(metrics: Dict[str, Dict[str, np.ndarray]], index: int = 0) -> Dict[str, Optional[float]]:
+    """Wartości jednej klatki jako słownik do zapisu (NaN -> None)"""
+    row = {}
+    for name, data in metrics.items():
+        value = float(data['value'][index])
+        row[name] = None if np.isnan(value) else round(value, 4)
+    return row
+
+
+def failed_metrics(metrics: Dict[str, Dict[str, np.ndarray]], index: int = 0) -> list:
+    """Nazwy metryk przekraczających próg w danej klatce"""
+    return [name for name, data in metrics.items() if not data['ok'][index]]
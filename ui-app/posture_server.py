@@ -0,0 +1,457 @@
+"""
+Serwer analizy postawy dla wielu strumieni (np. kilka stanowisk w laboratorium)
+Źródła: indeksy kamer V4L2, pliki wideo albo URL strumieni.
+Analiza odbywa się w puli procesów - każdy strumień jest przypisany do jednego procesu
+i ma w nim własny PostureDetector (śledzenie sylwetki nie miesza się między stanowiskami),
+a harmonogram (round-robin albo najbliższy termin) pilnuje, by żaden strumień nie był zagłodzony.
+
+Użycie:
+    python posture_server.py --source 0 --source 2 --source biurko3=rtsp://127.0.0.1:8554/cam
+    python posture_server.py --source a.mp4 --source b.mp4 --workers 2 --policy round-robin
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from capture_thread import CaptureThread, open_capture, playback_fps
+from headless_monitor import StdoutSink, UnixSocketSink
+from posture_filter import PostureFilter
+from posture_metrics import parse_metric_threshold
+from pose_backends import BACKENDS
+from process_inference import InferenceProcess
+from statistics_store import StatisticsStore
+
+
+POLICIES = ('deadline', 'round-robin')
+
+
+class StreamState:
+    """Strumień wideo: wątek przechwytywania, termin następnej analizy i liczniki"""
+
+    def __init__(self, stream_id: str, source: str, capture_thread: CaptureThread, period: float,
+                 posture_filter: Optional[PostureFilter] = None):
+        self.stream_id = stream_id
+        self.source = source
+        self.capture_thread = capture_thread
+        self.period = period
+        # Każdy strumień ma własny stan wygładzania
+        self.posture_filter = posture_filter
+        # Proces analizy przypisany na stałe (WorkerPool.assign)
+        self.worker: Optional[InferenceProcess] = None
+
+        self.last_seq = 0
+        self.next_deadline = time.monotonic()
+
+        self.submitted = 0
+        self.completed = 0
+        self.detected = 0
+        self.good = 0
+        self.missed_deadlines = 0
+        self.rejected = 0
+        self._latencies_ms = deque(maxlen=200)
+        self._inference_ms = deque(maxlen=200)
+
+    def record_result(self, latency_ms: float, inference_ms: float, detected: bool, is_good: bool):
+        self.completed += 1
+        self._latencies_ms.append(latency_ms)
+        self._inference_ms.append(inference_ms)
+        if detected:
+            self.detected += 1
+            if is_good:
+                self.good += 1
+
+    def stats(self, elapsed: float) -> dict:
+        latencies = np.array(self._latencies_ms) if self._latencies_ms else np.zeros(1)
+        inference = np.array(self._inference_ms) if self._inference_ms else np.zeros(1)
+        capture = self.capture_thread.stats()
+        return {
+            'stream_id': self.stream_id,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'throughput': round(self.completed / elapsed, 2) if elapsed > 0 else 0.0,
+            'latency_ms': round(float(latencies.mean()), 1),
+            'latency_p95_ms': round(float(np.percentile(latencies, 95)), 1),
+            'inference_ms': round(float(inference.mean()), 1),
+            'missed_deadlines': self.missed_deadlines,
+            'rejected': self.rejected,
+            'capture_dropped': capture['dropped'],
+            'read_failures': capture['read_failures'],
+            'good_percentage': round(self.good / self.detected * 100, 1) if self.detected else 0.0
+        }
+
+
+class WorkerPool:
+    """Pula procesów InferenceProcess, każdy z własnym grafem MediaPipe"""
+
+    def __init__(self, workers: int, detector_kwargs: dict):
+        self.workers = [
+            InferenceProcess(detector_kwargs, max_in_flight=1, name=f"PostureInference-{i}")
+            for i in range(max(1, workers))
+        ]
+
+    def assign(self, streams: List[StreamState]):
+        """
+        Przypisz strumienie do gotowych procesów po kolei
+
+        Strumień zostaje w jednym procesie: tryb śledzenia MediaPipe, ROI
+        i znaczniki czasu grafu wymagają kolejnych klatek tego samego źródła.
+        """
+        ready = [w for w in self.workers if w.ready_event.is_set()]
+        for index, stream in enumerate(streams):
+            stream.worker = ready[index % len(ready)] if ready else None
+
+    def has_free_worker(self) -> bool:
+        """Czy jakiś gotowy proces nie ma trwającej analizy"""
+        return any(w.ready_event.is_set() and not w.is_busy for w in self.workers)
+
+    def wait_ready(self, timeout: float = 60.0) -> int:
+        """Czekaj na start procesów; zwraca liczbę gotowych"""
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            while not worker.ready_event.is_set() and worker.error is None:
+                if time.monotonic() > deadline or not worker.is_alive():
+                    break
+                time.sleep(0.05)
+        return sum(1 for w in self.workers if w.ready_event.is_set())
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
+
+
+class PostureServer:
+    """
+    Rozdziela klatki z wielu strumieni na pulę procesów analizy
+
+    Polityki:
+        deadline    - każdy strumień ma termin następnej analizy (co 1/rate s);
+                                    wolny proces dostaje swój strumień z najwcześniejszym terminem
+        round-robin - strumienie po kolei, tak szybko jak pozwala pula
+
+    Każdy strumień analizuje zawsze ten sam proces (WorkerPool.assign).
+    """
+
+    def __init__(self, streams: List[StreamState], pool: WorkerPool, policy: str = 'deadline',
+                 store: Optional[StatisticsStore] = None, sink=None,
+                 inference_long_edge: Optional[int] = 480):
+        if policy not in POLICIES:
+            raise ValueError(f"Nieznana polityka: {policy}")
+        self.streams = streams
+        self.pool = pool
+        self.policy = policy
+        self.store = store
+        self.sink = sink
+        self.inference_long_edge = inference_long_edge
+
+        self._streams_by_id = {s.stream_id: s for s in streams}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._next_index = 0
+        self._started = time.monotonic()
+        self._session_id = None
+        self._session_start = None
+        self._collectors = []
+
+    def stop(self):
+        self._stop_event.set()
+
+    # ========== HARMONOGRAM ==========
+
+    @staticmethod
+    def _worker_free(stream: StreamState) -> bool:
+        return stream.worker is not None and not stream.worker.is_busy
+
+    def _pick_stream(self, now: float) -> Tuple[Optional[StreamState], Optional[np.ndarray], float]:
+        """Wybierz strumień z nową klatką i wolnym procesem zgodnie z polityką"""
+        if self.policy == 'round-robin':
+            count = len(self.streams)
+            for offset in range(count):
+                index = (self._next_index + offset) % count
+                stream = self.streams[index]
+                if not self._worker_free(stream):
+                    continue
+                seq, frame, timestamp = stream.capture_thread.latest()
+                if frame is not None and seq != stream.last_seq:
+                    stream.last_seq = seq
+                    self._next_index = (index + 1) % count
+                    return stream, frame, timestamp
+            return None, None, 0.0
+
+        # Najwcześniejszy termin spośród strumieni, których termin już minął
+        due = [s for s in self.streams if s.next_deadline <= now and self._worker_free(s)]
+        for stream in sorted(due, key=lambda s: s.next_deadline):
+            seq, frame, timestamp = stream.capture_thread.latest()
+            if frame is None or seq == stream.last_seq:
+                continue
+            stream.last_seq = seq
+            if now - stream.next_deadline > stream.period:
+                stream.missed_deadlines += 1
+            # Po dużym opóźnieniu nie nadrabiamy seriami - liczymy od teraz
+            stream.next_deadline = max(stream.next_deadline + stream.period, now)
+            return stream, frame, timestamp
+        return None, None, 0.0
+
+    def _next_wakeup(self, now: float) -> float:
+        """Ile czekać, gdy żaden strumień nie jest gotowy"""
+        if self.policy == 'deadline':
+            earliest = min(s.next_deadline for s in self.streams)
+            return min(max(earliest - now, 0.002), 0.05)
+        return 0.005
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Zmniejsz klatkę przed kopiowaniem do pamięci współdzielonej
+        Wynik analizy jest znormalizowany, więc skala nie zmienia oceny
+        """
+        if not self.inference_long_edge:
+            return frame
+        h, w = frame.shape[:2]
+        long_edge = max(h, w)
+        if long_edge <= self.inference_long_edge:
+            return frame
+        scale = self.inference_long_edge / long_edge
+        return cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+
+    # ========== WYNIKI ==========
+
+    def _collect(self, worker: InferenceProcess):
+        """Wątek odbierający wyniki z jednego procesu"""
+        while not self._stop_event.is_set():
+            result = worker.get_result(timeout=0.2)
+            if result is None:
+                if worker.error is not None or not worker.is_alive():
+                    break
+                continue
+            _, tag, is_good, norm_dist, landmarks, inference_ms = result
+            self._on_result(tag, is_good, norm_dist, landmarks, inference_ms)
+
+    def _on_result(self, tag, is_good: bool, norm_dist: float, landmarks: Optional[dict],
+                   inference_ms: float):
+        stream_id, capture_ts = tag
+        latency_ms = (time.monotonic() - capture_ts) * 1000
+        detected = landmarks is not None
+
+        with self._lock:
+            stream = self._streams_by_id[stream_id]
+            raw_norm_dist = norm_dist
+            if stream.posture_filter is not None and detected:
+                is_good, norm_dist, landmarks = stream.posture_filter.update(norm_dist, landmarks, capture_ts)
+            stream.record_result(latency_ms, inference_ms, detected, is_good)
+
+            if self.store is not None:
+                self.store.add_check(self._session_id, is_good, norm_dist, detected,
+                                     stream_id=stream_id, raw_coefficient=raw_norm_dist,
+                                     metrics=landmarks.get('metrics') if detected else None,
+                                     failed_metrics=landmarks.get('failed_metrics') if detected else None)
+
+            if self.sink is not None:
+                self.sink.write({
+                    'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+                    'stream_id': stream_id,
+                    'detected': detected,
+                    'is_good': bool(is_good),
+                    'norm_dist': round(float(norm_dist), 4),
+                    'raw_norm_dist': round(float(raw_norm_dist), 4),
+                    'side': landmarks.get('used_side') if detected else None,
+                    'metrics': landmarks.get('metrics') if detected else None,
+                    'failed_metrics': landmarks.get('failed_metrics', []) if detected else [],
+                    'latency_ms': round(latency_ms, 1),
+                    'inference_ms': round(inference_ms, 1)
+                })
+
+    def stats(self) -> List[dict]:
+        elapsed = time.monotonic() - self._started
+        with self._lock:
+            return [s.stats(elapsed) for s in self.streams]
+
+    # ========== PĘTLA ==========
+
+    def run(self, duration: float = 0.0, report_interval: float = 10.0):
+        for index, worker in enumerate(self.pool.workers):
+            collector = threading.Thread(target=self._collect, args=(worker,),
+                                         name=f"ResultCollector-{index}", daemon=True)
+            collector.start()
+            self._collectors.append(collector)
+
+        ready = self.pool.wait_ready()
+        if ready == 0:
+            print("Żaden proces analizy nie wystartował", file=sys.stderr)
+            self._stop_event.set()
+            return
+        print(f"Gotowe procesy analizy: {ready}/{len(self.pool.workers)}, "
+              f"strumienie: {len(self.streams)}, polityka: {self.policy}", file=sys.stderr)
+        self.pool.assign(self.streams)
+
+        if self.store is not None:
+            self._session_start = datetime.now()
+            self._session_id = self.store.start_session(self._session_start, notes="server")
+
+        self._started = time.monotonic()
+        for stream in self.streams:
+            stream.next_deadline = self._started
+        next_report = self._started + report_interval
+
+        try:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                if duration and now - self._started >= duration:
+                    break
+                if report_interval and now >= next_report:
+                    self.print_report()
+                    next_report = now + report_interval
+
+                if not self.pool.has_free_worker():
+                    self._stop_event.wait(0.002)
+                    continue
+
+                stream, frame, capture_ts = self._pick_stream(now)
+                if stream is None:
+                    self._stop_event.wait(self._next_wakeup(now))
+                    continue
+
+                if stream.worker.submit(self._prepare(frame), tag=(stream.stream_id, capture_ts),
+                                        key=stream.stream_id) is None:
+                    stream.rejected += 1
+                else:
+                    stream.submitted += 1
+        finally:
+            self._stop_event.set()
+            for collector in self._collectors:
+                collector.join(1.0)
+            self.print_report()
+
+            if self.store is not None and self._session_id is not None:
+                self.store.end_session(self._session_id, self._session_start)
+                for row in self.store.get_stream_summary(self._session_id):
+                    print(f"  {row['stream_id']}: {row['total_checks']} sprawdzeń, "
+                          f"dobra postawa {row['percentage']}%", file=sys.stderr)
+
+    def print_report(self):
+        print(f"{'strumień':<12}{'analiz/s':>9}{'opóźn. ms':>11}{'p95 ms':>9}{'MP ms':>8}"
+              f"{'spóźn.':>8}{'odrzuc.':>9}{'porzuc.':>9}", file=sys.stderr)
+        for row in self.stats():
+            print(f"{row['stream_id']:<12}{row['throughput']:>9}{row['latency_ms']:>11}"
+                  f"{row['latency_p95_ms']:>9}{row['inference_ms']:>8}{row['missed_deadlines']:>8}"
+                  f"{row['rejected']:>9}{row['capture_dropped']:>9}", file=sys.stderr)
+
+
+def parse_stream_arg(value: str, index: int) -> Tuple[str, str]:
+    """'nazwa=źródło' albo samo źródło (nazwa domyślna: s<indeks>)"""
+    name, sep, source = value.partition('=')
+    if sep and name and not any(c in name for c in '/:\\'):
+        return name, source
+    return f"s{index}", value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Analiza postawy dla wielu strumieni w puli procesów")
+    parser.add_argument("--source", action="append", required=True,
+                        help="Źródło: indeks kamery, plik lub URL; opcjonalnie nazwa=źródło (można powtarzać)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Liczba procesów analizy (0 = min(strumienie, rdzenie/2))")
+    parser.add_argument("--policy", choices=POLICIES, default='deadline', help="Harmonogram analizy")
+    parser.add_argument("--rate", type=float, default=1.0,
+                        help="Docelowa liczba analiz na sekundę dla każdego strumienia (polityka deadline)")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Próg garbienia")
+    parser.add_argument("--metric-threshold", type=parse_metric_threshold, action="append", default=[],
+                        help="Próg metryki nazwa=wartość, np. neck_angle=45 (można powtarzać)")
+    parser.add_argument("--hysteresis", type=float, default=0.02,
+                        help="Pas wokół progu garbienia, w którym ocena się nie zmienia")
+    parser.add_argument("--no-smoothing", action="store_true", help="Bez wygładzania i histerezy")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto",
+                        help="Backend wykrywania sylwetki (domyślnie MediaPipe)")
+    parser.add_argument("--pose-model", help="Plik modelu dla backendu (.task, .onnx)")
+    parser.add_argument("--inference-size", type=int, default=480,
+                        help="Dłuższy bok klatki dla MediaPipe (0 = pełna rozdzielczość)")
+    parser.add_argument("--resolution", default="640x480", help="Rozdzielczość kamer")
+    parser.add_argument("--fps", type=float, default=15, help="FPS kamer")
+    parser.add_argument("--ndjson", action="store_true", help="Wypisuj każdy wynik jako linię JSON na stdout")
+    parser.add_argument("--socket", help="Rozsyłaj wyniki przez gniazdo Unix")
+    parser.add_argument("--no-db", action="store_true", help="Nie zapisuj wyników do statistics.db")
+    parser.add_argument("--duration", type=float, default=0, help="Zakończ po tylu sekundach (0 = bez limitu)")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Co ile sekund raport liczników")
+    args = parser.parse_args()
+
+    # Przy --ndjson stdout należy do wyników - komunikaty modułów (proces analizy,
+    # backend, migracja bazy) idą na stderr
+    result_stream = sys.stdout
+    if args.ndjson and not args.socket:
+        sys.stdout = sys.stderr
+
+    try:
+        width, height = (int(v) for v in args.resolution.lower().split("x"))
+    except ValueError:
+        print(f"Niepoprawna rozdzielczość: {args.resolution}", file=sys.stderr)
+        return 2
+
+    streams = []
+    for index, value in enumerate(args.source):
+        stream_id, source = parse_stream_arg(value, index)
+        capture = open_capture(source, width, height, args.fps)
+        if capture is None:
+            print(f"Nie można otworzyć źródła {stream_id}: {source}", file=sys.stderr)
+            continue
+        # Pliki odtwarzane w tempie nagrania, nie tak szybko jak dekoduje procesor
+        capture_thread = CaptureThread(capture, name=f"Capture-{stream_id}",
+                                       pace_fps=playback_fps(capture, source))
+        capture_thread.start()
+        posture_filter = None if args.no_smoothing else PostureFilter(args.threshold, margin=args.hysteresis)
+        streams.append(StreamState(stream_id, source, capture_thread, period=1.0 / max(args.rate, 0.01),
+                                   posture_filter=posture_filter))
+
+    if not streams:
+        return 1
+
+    workers = args.workers or max(1, min(len(streams), (os.cpu_count() or 2) // 2))
+    inference_long_edge = args.inference_size or None
+    pool = WorkerPool(workers, {
+        'posture_threshold': args.threshold,
+        'metric_thresholds': dict(args.metric_threshold),
+        'inference_long_edge': inference_long_edge,
+        'backend': args.backend,
+        'pose_model': args.pose_model
+    })
+
+    if args.socket:
+        sink = UnixSocketSink(args.socket)
+    elif args.ndjson:
+        sink = StdoutSink(result_stream)
+    else:
+        sink = None
+    store = None if args.no_db else StatisticsStore()
+
+    server = PostureServer(streams, pool, policy=args.policy, store=store, sink=sink,
+                           inference_long_edge=inference_long_edge)
+
+    def handle_signal(signum, frame):
+        server.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    try:
+        server.run(duration=args.duration, report_interval=args.report_interval)
+    finally:
+        pool.stop()
+        for stream in streams:
+            stream.capture_thread.stop()
+        if sink is not None:
+            sink.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
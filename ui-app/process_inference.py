@@ -0,0 +1,346 @@
+"""
+Moduł do uruchamiania PostureDetector w osobnym procesie
+Klatki przekazywane są przez podwójny bufor w pamięci współdzielonej
+(multiprocessing.shared_memory), z powrotem wraca tylko mały wynik analizy
+"""
+
+import multiprocessing as mp
+import queue
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Ile różnych rozdzielczości klatek może mieć jednocześnie własny bufor
+# (proces obsługujący kilka strumieni dostaje klatki różnych rozmiarów)
+MAX_FRAME_SHAPES = 4
+
+
+class SharedFrameBuffer:
+    """
+    Bufor klatek w pamięci współdzielonej z kilkoma slotami (domyślnie 2)
+
+    Proces główny zapisuje klatkę do wolnego slotu, proces analizy czyta
+    ją bezpośrednio z tej samej pamięci - klatka nie jest serializowana.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.uint8, slots: int = 2,
+                 name: Optional[str] = None, create: bool = True):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        self._owner = create
+
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        if create:
+            self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * slots)
+        else:
+            self._shm = _attach_shared_memory(name)
+
+        self._views = [
+            np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf, offset=i * frame_bytes)
+            for i in range(slots)
+        ]
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def matches(self, frame: np.ndarray) -> bool:
+        return frame.shape == self.shape and frame.dtype == self.dtype
+
+    def write(self, slot: int, frame: np.ndarray):
+        np.copyto(self._views[slot], frame)
+
+    def view(self, slot: int) -> np.ndarray:
+        return self._views[slot]
+
+    def close(self):
+        # Widoki muszą zniknąć przed zamknięciem mapowania
+        self._views = []
+        try:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        except Exception:
+            pass
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Podłącz istniejący segment bez przejmowania go przez resource_tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 nie ma parametru track
+        return shared_memory.SharedMemory(name=name)
+
+
+def _inference_process_main(requests, results, detector_kwargs: dict):
+    """
+    Pętla procesu analizy - własny PostureDetector i własny graf MediaPipe
+
+    Zlecenia z kluczem (np. id strumienia) trafiają do osobnego detektora
+    dla każdego klucza: śledzenie sylwetki, ROI i znaczniki czasu grafu
+    dotyczą jednego źródła i nie mieszają się między strumieniami.
+    """
+    # Proces 'spawn' nie dziedziczy przekierowania z rodzica - stdout może
+    # należeć do wyników NDJSON, więc komunikaty procesu idą na stderr
+    sys.stdout = sys.stderr
+    from posture_detector import PostureDetector
+
+    try:
+        spare = PostureDetector(**detector_kwargs)
+    except Exception as e:
+        results.put(('error', str(e)))
+        return
+
+    results.put(('ready', spare.api_type))
+
+    detectors = {}  # klucz -> PostureDetector
+    baseline = detector_kwargs.get('baseline')
+    buffers = {}
+    while True:
+        msg = requests.get()
+        if msg is None:
+            break
+        if msg[0] == 'baseline':
+            # Komunikat sterujący - nowa linia bazowa (zmiana kamery, kalibracja)
+            baseline = msg[1]
+            for detector in [spare, *detectors.values()]:
+                if detector is not None:
+                    detector.set_baseline(baseline)
+            continue
+
+        shm_name, shape, slot, seq, tag, key = msg
+
+        detector = detectors.get(key)
+        if detector is None:
+            if spare is not None:
+                # Detektor sprawdzony przy starcie obsługuje pierwszy klucz
+                detector, spare = spare, None
+            else:
+                try:
+                    detector = PostureDetector(**detector_kwargs)
+                    detector.set_baseline(baseline)
+                except Exception as e:
+                    print(f"Błąd w procesie analizy: {e}")
+                    results.put(('result', seq, tag, False, 0.0, None, 0.0))
+                    continue
+            detectors[key] = detector
+
+        buffer = buffers.get(shm_name)
+        if buffer is None:
+            # Nowy bufor (inna rozdzielczość) - najstarsze segmenty odłączamy,
+            # w razie potrzeby zostaną podłączone ponownie
+            while len(buffers) >= MAX_FRAME_SHAPES:
+                buffers.pop(next(iter(buffers))).close()
+            buffer = SharedFrameBuffer(shape, name=shm_name, create=False)
+            buffers[shm_name] = buffer
+
+        start = time.perf_counter()
+        try:
+            is_good, norm_dist, landmarks = detector.analyze_posture(buffer.view(slot))
+        except Exception as e:
+            print(f"Błąd w procesie analizy: {e}")
+            is_good, norm_dist, landmarks = False, 0.0, None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        results.put(('result', seq, tag, bool(is_good), float(norm_dist), landmarks, elapsed_ms))
+
+    for buffer in buffers.values():
+        buffer.close()
+    for detector in [spare, *detectors.values()]:
+        if detector is not None:
+            detector.release()
+
+
+class InferenceProcess:
+    """
+    Proces z własnym PostureDetector, zasilany przez SharedFrameBuffer
+
+    submit() nie blokuje: gdy wszystkie sloty są zajęte przez trwające
+    analizy, klatka jest pomijana. Każda rozdzielczość klatek ma własny
+    bufor, więc kilka strumieni może dzielić jeden proces.
+    """
+
+    def __init__(self, detector_kwargs: Optional[dict] = None, max_in_flight: int = 1,
+                 name: str = "PostureInference"):
+        self._detector_kwargs = detector_kwargs or {}
+        self._max_in_flight = max(1, min(max_in_flight, 2))
+        self._ctx = mp.get_context('spawn')  # fork + wątki Qt/MediaPipe = zakleszczenia
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+
+        self._lock = threading.Lock()
+        self._buffers: Dict[tuple, SharedFrameBuffer] = {}  # (shape, dtype) -> bufor
+        self._free_slots: Dict[tuple, List[int]] = {}
+        self._slot_by_seq = {}  # seq -> (klucz bufora, slot)
+        self._seq = 0
+        self._skipped = 0
+        self._completed = 0
+
+        self.api_type = None
+        self.error = None  # Proces nie wystartował albo zakończył się w trakcie pracy
+        self._stopping = False
+        self.ready_event = threading.Event()
+        self._process = self._ctx.Process(
+            target=_inference_process_main,
+            args=(self._requests, self._results, self._detector_kwargs),
+            name=name,
+            daemon=True
+        )
+        self._process.start()
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._slot_by_seq)
+
+    @property
+    def is_busy(self) -> bool:
+        # Martwy proces nie przyjmie już klatek
+        return self._check_process() or self.in_flight >= self._max_in_flight
+
+    def _check_process(self) -> bool:
+        """
+        Wykryj nieoczekiwane zakończenie procesu (np. awaria MediaPipe)
+
+        Zlecenia w toku nigdy nie wrócą - ich sloty są zwalniane, a przyczyna
+        trafia do self.error. Zwraca True, gdy proces nie może przyjmować klatek.
+        """
+        if self.error is not None:
+            return True
+        if self._stopping or self._process.is_alive():
+            return False
+        with self._lock:
+            lost = len(self._slot_by_seq)
+            for key, slot in self._slot_by_seq.values():
+                if key in self._free_slots:
+                    self._free_slots[key].append(slot)
+            self._slot_by_seq.clear()
+        self.error = f"Proces analizy zakończył się nieoczekiwanie (kod {self._process.exitcode})"
+        print(f"{self.error}, utracone analizy: {lost}")
+        return True
+
+    def submit(self, frame: np.ndarray, tag=None, key=None) -> Optional[int]:
+        """
+        Skopiuj klatkę do wolnego slotu i zleć analizę
+
+        Args:
+            tag: Wartość zwracana razem z wynikiem
+            key: Źródło klatki - każdy klucz ma w procesie własny detektor
+
+        Returns:
+            numer sekwencyjny zlecenia albo None, jeśli klatkę pominięto
+        """
+        if frame is None or self._check_process():
+            return None
+
+        with self._lock:
+            if len(self._slot_by_seq) >= self._max_in_flight:
+                self._skipped += 1
+                return None
+
+            # Bufor zależy od rozdzielczości, detektor w procesie - od klucza źródła
+            buf_key = (frame.shape, frame.dtype.str)
+            buffer = self._buffers.get(buf_key)
+            if buffer is None:
+                if not self._evict_buffer():
+                    # Wszystkie bufory są w użyciu przez proces
+                    self._skipped += 1
+                    return None
+                buffer = SharedFrameBuffer(frame.shape, dtype=frame.dtype)
+                self._buffers[buf_key] = buffer
+                self._free_slots[buf_key] = [0, 1]
+
+            slot = self._free_slots[buf_key].pop(0)
+            buffer.write(slot, frame)
+            self._seq += 1
+            seq = self._seq
+            self._slot_by_seq[seq] = (buf_key, slot)
+            shm_name = buffer.name
+            shape = buffer.shape
+
+        self._requests.put((shm_name, shape, slot, seq, tag, key))
+        return seq
+
+    def set_baseline(self, baseline: Optional[dict]):
+        """Linia bazowa dla detektora w procesie - obowiązuje od następnej klatki w kolejce"""
+        self._requests.put(('baseline', baseline))
+
+    def _evict_buffer(self) -> bool:
+        """Zrób miejsce na nowy bufor; nie zwalnia bufora, z którego proces jeszcze czyta"""
+        if len(self._buffers) < MAX_FRAME_SHAPES:
+            return True
+        busy = {key for key, _ in self._slot_by_seq.values()}
+        for key in list(self._buffers):
+            if key not in busy:
+                self._buffers.pop(key).close()
+                self._free_slots.pop(key, None)
+                return True
+        return False
+
+    def get_result(self, timeout: Optional[float] = None) -> Optional[tuple]:
+        """
+        Pobierz następny wynik
+
+        Returns:
+            (seq, tag, is_good, norm_dist, landmarks, elapsed_ms) albo None
+        """
+        while True:
+            try:
+                msg = self._results.get(timeout=timeout) if timeout != 0 else self._results.get_nowait()
+            except queue.Empty:
+                self._check_process()
+                return None
+
+            kind = msg[0]
+            if kind == 'ready':
+                self.api_type = msg[1]
+                self.ready_event.set()
+                print(f"Proces analizy gotowy (API: {self.api_type})")
+                continue
+            if kind == 'error':
+                self.error = msg[1]
+                print(f"Proces analizy nie wystartował: {msg[1]}")
+                return None
+
+            _, seq, tag, is_good, norm_dist, landmarks, elapsed_ms = msg
+            with self._lock:
+                entry = self._slot_by_seq.pop(seq, None)
+                if entry is not None and entry[0] in self._free_slots:
+                    self._free_slots[entry[0]].append(entry[1])
+                self._completed += 1
+            return seq, tag, is_good, norm_dist, landmarks, elapsed_ms
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'submitted': self._seq,
+                'completed': self._completed,
+                'skipped': self._skipped,
+                'in_flight': len(self._slot_by_seq)
+            }
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def stop(self, timeout: float = 3.0):
+        """Zatrzymaj proces i zwolnij pamięć współdzieloną"""
+        self._stopping = True
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(1.0)
+
+        with self._lock:
+            for buffer in self._buffers.values():
+                buffer.close()
+            self._buffers.clear()
+            self._free_slots.clear()
+            self._slot_by_seq.clear()
@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from PySide6.QtCore import QObject, Signal, Slot, Property
 
+from statistics_store import StatisticsStore, decode_failed_metrics, decode_metrics, default_db_path
+
 
 class StatisticsManager(QObject):
     """Zarządza statystykami i historią sesji"""
@@ -23,13 +25,13 @@ class StatisticsManager(QObject):
         super().__init__()
 
         # Ścieżka do bazy danych
-        self.db_path = Path.home() / ".posture_monitor" / "statistics.db"
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = default_db_path()
 
         print(f"Baza danych: {self.db_path}")
 
-        # Inicjalizuj bazę
-        self._init_database()
+        # Inicjalizuj bazę (zapis sesji i sprawdzeń realizuje StatisticsStore)
+        self.store = StatisticsStore(self.db_path)
+        print("Baza danych zainicjalizowana")
 
         # Aktualna sesja
         self.current_session_id = None
@@ -38,55 +40,6 @@ class StatisticsManager(QObject):
         # ID ostatniej zakończonej sesji (do eksportu po zakończeniu)
         self._last_completed_session_id = None
         
-    def _init_database(self):
-        """Stwórz tabele w bazie danych"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Tabela sesji
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP,
-                total_checks INTEGER DEFAULT 0,
-                good_posture_count INTEGER DEFAULT 0,
-                bad_posture_count INTEGER DEFAULT 0,
-                average_coefficient REAL,
-                duration_minutes INTEGER,
-                notes TEXT
-            )
-        ''')
-        
-        # Tabela pojedynczych sprawdzeń
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS checks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id INTEGER NOT NULL,
-                timestamp TIMESTAMP NOT NULL,
-                is_good_posture BOOLEAN NOT NULL,
-                coefficient REAL NOT NULL,
-                detection_successful BOOLEAN NOT NULL,
-                FOREIGN KEY (session_id) REFERENCES sessions (id)
-            )
-        ''')
-        
-        # Indeksy dla szybszych zapytań
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_session_id 
-            ON checks (session_id)
-        ''')
-        
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_timestamp 
-            ON checks (timestamp)
-        ''')
-        
-        conn.commit()
-        conn.close()
-        
-        print("Baza danych zainicjalizowana")
-
     @Slot(result=bool)
     def can_export(self) -> bool:
         """Sprawdź czy można eksportować (jest aktywna sesja lub ostatnia zakończona)"""
@@ -108,19 +61,8 @@ class StatisticsManager(QObject):
             print("Sesja już trwa, zamykam poprzednią...")
             self.end_session()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         self.session_start_time = datetime.now()
-        
-        cursor.execute('''
-            INSERT INTO sessions (start_time, total_checks, good_posture_count, bad_posture_count)
-            VALUES (?, 0, 0, 0)
-        ''', (self.session_start_time,))
-        
-        self.current_session_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        self.current_session_id = self.store.start_session(self.session_start_time)
         
         print(f"Sesja rozpoczęta: ID={self.current_session_id}")
         self.sessionDataChanged.emit()
@@ -135,31 +77,7 @@ class StatisticsManager(QObject):
             print("Brak aktywnej sesji do zakończenia")
             return
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        end_time = datetime.now()
-        duration = (end_time - self.session_start_time).total_seconds() / 60  # minuty
-        
-        # Oblicz średni współczynnik
-        cursor.execute('''
-            SELECT AVG(coefficient) FROM checks 
-            WHERE session_id = ? AND detection_successful = 1
-        ''', (self.current_session_id,))
-        
-        avg_coeff = cursor.fetchone()[0] or 0.0
-        
-        # Zaktualizuj sesję
-        cursor.execute('''
-            UPDATE sessions 
-            SET end_time = ?, 
-                duration_minutes = ?,
-                average_coefficient = ?
-            WHERE id = ?
-        ''', (end_time, int(duration), avg_coeff, self.current_session_id))
-        
-        conn.commit()
-        conn.close()
+        duration = self.store.end_session(self.current_session_id, self.session_start_time)
         
         print(f"Sesja zakończona: ID={self.current_session_id}, czas={int(duration)}min")
 
@@ -171,43 +89,36 @@ class StatisticsManager(QObject):
         
         self.historicalDataChanged.emit()
     
-    @Slot(bool, float, bool)
-    def add_check(self, is_good_posture: bool, coefficient: float, detection_successful: bool):
-        """Dodaj sprawdzenie do bazy"""
+    @Slot(bool, float, bool, bool)
+    def add_check(self, is_good_posture: bool, coefficient: float, detection_successful: bool,
+                  reused: bool = False, stream_id: Optional[str] = None,
+                  raw_coefficient: Optional[float] = None, metrics: Optional[Dict] = None,
+                  person_id: Optional[int] = None, people: Optional[List[Dict]] = None,
+                  failed_metrics: Optional[List[str]] = None):
+        """
+        Dodaj sprawdzenie do bazy
+
+        Args:
+            reused: True jeśli wynik pochodzi z poprzedniej analizy
+                    (scena się nie zmieniła i MediaPipe został pominięty)
+            stream_id: Źródło obrazu przy monitorowaniu kilku strumieni
+            raw_coefficient: Współczynnik przed wygładzeniem (coefficient jest wygładzony)
+            metrics: Kąt szyi, nachylenie barków itd. (posture_metrics)
+            failed_metrics: Nazwy metryk przekraczających próg
+            person_id: Numer osoby głównej (tryb kilku osób)
+            people: Wyniki pozostałych osób w kadrze - zapisywane osobno,
+                    nie zmieniają statystyk sesji
+        """
         if self.current_session_id is None:
             print("Brak aktywnej sesji, tworzę nową...")
             self.start_session()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        timestamp = datetime.now()
-        
-        # Dodaj sprawdzenie
-        cursor.execute('''
-            INSERT INTO checks (session_id, timestamp, is_good_posture, coefficient, detection_successful)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (self.current_session_id, timestamp, is_good_posture, coefficient, detection_successful))
-        
-        # Zaktualizuj liczniki sesji
-        if detection_successful:
-            if is_good_posture:
-                cursor.execute('''
-                    UPDATE sessions 
-                    SET total_checks = total_checks + 1,
-                        good_posture_count = good_posture_count + 1
-                    WHERE id = ?
-                ''', (self.current_session_id,))
-            else:
-                cursor.execute('''
-                    UPDATE sessions 
-                    SET total_checks = total_checks + 1,
-                        bad_posture_count = bad_posture_count + 1
-                    WHERE id = ?
-                ''', (self.current_session_id,))
-        
-        conn.commit()
-        conn.close()
+        self.store.add_check(self.current_session_id, is_good_posture, coefficient,
+                             detection_successful, reused, stream_id=stream_id,
+                             raw_coefficient=raw_coefficient, metrics=metrics, person_id=person_id,
+                             failed_metrics=failed_metrics)
+        if people:
+            self.store.add_person_checks(self.current_session_id, people, stream_id=stream_id)
         
         self.sessionDataChanged.emit()
     
@@ -221,7 +132,8 @@ class StatisticsManager(QObject):
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT timestamp, is_good_posture, coefficient, detection_successful
+            SELECT timestamp, is_good_posture, coefficient, detection_successful, reused, stream_id,
+                   raw_coefficient, metrics, failed_metrics
             FROM checks
             WHERE session_id = ?
             ORDER BY timestamp ASC
@@ -234,7 +146,12 @@ class StatisticsManager(QObject):
                 'time': timestamp_str,
                 'is_good': bool(row[1]),
                 'coefficient': float(row[2]),
-                'detected': bool(row[3])
+                'detected': bool(row[3]),
+                'reused': bool(row[4]),
+                'stream_id': row[5],
+                'raw_coefficient': float(row[6]) if row[6] is not None else float(row[2]),
+                'metrics': decode_metrics(row[7]),
+                'failed_metrics': decode_failed_metrics(row[8])
             })
         
         conn.close()
@@ -287,7 +204,8 @@ class StatisticsManager(QObject):
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT timestamp, is_good_posture, coefficient, detection_successful
+            SELECT timestamp, is_good_posture, coefficient, detection_successful, reused, stream_id,
+                   raw_coefficient, metrics, failed_metrics
             FROM checks
             WHERE session_id = ?
             ORDER BY timestamp ASC
@@ -300,7 +218,12 @@ class StatisticsManager(QObject):
                 'time': timestamp_str,
                 'is_good': bool(row[1]),
                 'coefficient': float(row[2]),
-                'detected': bool(row[3])
+                'detected': bool(row[3]),
+                'reused': bool(row[4]),
+                'stream_id': row[5],
+                'raw_coefficient': float(row[6]) if row[6] is not None else float(row[2]),
+                'metrics': decode_metrics(row[7]),
+                'failed_metrics': decode_failed_metrics(row[8])
             })
         
         conn.close()
@@ -316,7 +239,8 @@ class StatisticsManager(QObject):
                 'bad': 0,
                 'percentage': 0,
                 'avg_coefficient': 0,
-                'duration': 0
+                'duration': 0,
+                'reused': 0
             }
         
         conn = sqlite3.connect(self.db_path)
@@ -344,6 +268,14 @@ class StatisticsManager(QObject):
             ''', (self.current_session_id,))
             
             avg_coeff = cursor.fetchone()[0] or 0.0
+
+            # Sprawdzenia z ponownie użytym wynikiem (bez inferencji)
+            cursor.execute('''
+                SELECT COUNT(*) FROM checks
+                WHERE session_id = ? AND reused = 1
+            ''', (self.current_session_id,))
+
+            reused = cursor.fetchone()[0] or 0
             
             percentage = (good / total * 100) if total > 0 else 0
             
@@ -353,7 +285,8 @@ class StatisticsManager(QObject):
                 'bad': bad,
                 'percentage': round(percentage, 1),
                 'avg_coefficient': round(avg_coeff, 3),
-                'duration': int(duration)
+                'duration': int(duration),
+                'reused': reused
             }
         else:
             stats = {
@@ -362,7 +295,8 @@ class StatisticsManager(QObject):
                 'bad': 0,
                 'percentage': 0,
                 'avg_coefficient': 0,
-                'duration': 0
+                'duration': 0,
+                'reused': 0
             }
         
         conn.close()
@@ -0,0 +1,383 @@
+"""
+Moduł z zapisem sesji i sprawdzeń do bazy SQLite
+Bez zależności od Qt - używany przez StatisticsManager oraz tryby bez GUI
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def default_db_path() -> Path:
+    """Domyślna ścieżka bazy: ~/.posture_monitor/statistics.db"""
+    return Path.home() / ".posture_monitor" / "statistics.db"
+
+
+def encode_metrics(metrics: Optional[Dict]) -> Optional[str]:
+    """Metryki sprawdzenia -> JSON dla kolumny checks.metrics"""
+    return json.dumps(metrics, separators=(',', ':')) if metrics else None
+
+
+def decode_metrics(value: Optional[str]) -> Dict:
+    """Kolumna checks.metrics -> słownik (pusty dla starszych wierszy)"""
+    if not value:
+        return {}
+    try:
+        return json.loads(value)
+    except ValueError:
+        return {}
+
+
+def decode_failed_metrics(value: Optional[str]) -> List[str]:
+    """Kolumna checks.failed_metrics (JSON z listą nazw, jak encode_metrics) -> lista"""
+    if not value:
+        return []
+    try:
+        names = json.loads(value)
+    except ValueError:
+        return []
+    return names if isinstance(names, list) else []
+
+
+class StatisticsStore:
+    """Zapis sesji i pojedynczych sprawdzeń do bazy SQLite"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path is not None else default_db_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    def init_database(self):
+        """Stwórz tabele w bazie danych"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # Tabela sesji
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                start_time TIMESTAMP NOT NULL,
+                end_time TIMESTAMP,
+                total_checks INTEGER DEFAULT 0,
+                good_posture_count INTEGER DEFAULT 0,
+                bad_posture_count INTEGER DEFAULT 0,
+                average_coefficient REAL,
+                duration_minutes INTEGER,
+                notes TEXT
+            )
+        ''')
+
+        # Tabela pojedynczych sprawdzeń
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS checks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id INTEGER NOT NULL,
+                timestamp TIMESTAMP NOT NULL,
+                is_good_posture BOOLEAN NOT NULL,
+                coefficient REAL NOT NULL,
+                detection_successful BOOLEAN NOT NULL,
+                reused BOOLEAN NOT NULL DEFAULT 0,
+                stream_id TEXT,
+                raw_coefficient REAL,
+                metrics TEXT,
+                failed_metrics TEXT,
+                person_id INTEGER,
+                FOREIGN KEY (session_id) REFERENCES sessions (id)
+            )
+        ''')
+
+        # Pozostałe osoby w kadrze (tryb kilku osób) - osobno, żeby nie zmieniały
+        # liczników sesji ani statystyk użytkownika stanowiska
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS person_checks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id INTEGER NOT NULL,
+                timestamp TIMESTAMP NOT NULL,
+                person_id INTEGER NOT NULL,
+                is_good_posture BOOLEAN NOT NULL,
+                coefficient REAL NOT NULL,
+                stream_id TEXT,
+                metrics TEXT,
+                failed_metrics TEXT,
+                FOREIGN KEY (session_id) REFERENCES sessions (id)
+            )
+        ''')
+
+        # Migracja starszych baz - kolumny dodane w nowszych wersjach
+        self._add_missing_columns(cursor, 'checks', {
+            'reused': 'BOOLEAN NOT NULL DEFAULT 0',
+            'stream_id': 'TEXT',
+            'raw_coefficient': 'REAL',
+            'metrics': 'TEXT',
+            'failed_metrics': 'TEXT',
+            'person_id': 'INTEGER'
+        })
+        self._add_missing_columns(cursor, 'person_checks', {
+            'failed_metrics': 'TEXT'
+        })
+
+        # Indeksy dla szybszych zapytań
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_session_id
+            ON checks (session_id)
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_timestamp
+            ON checks (timestamp)
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_person_checks_session
+            ON person_checks (session_id)
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _add_missing_columns(self, cursor, table: str, columns: Dict[str, str]):
+        """Dodaj brakujące kolumny do istniejącej tabeli"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+                print(f"Dodano kolumnę {table}.{name}")
+
+    def start_session(self, start_time: Optional[datetime] = None, notes: Optional[str] = None) -> int:
+        """Utwórz nową sesję i zwróć jej ID"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT INTO sessions (start_time, total_checks, good_posture_count, bad_posture_count, notes)
+            VALUES (?, 0, 0, 0, ?)
+        ''', (start_time or datetime.now(), notes))
+
+        session_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        return session_id
+
+    def end_session(self, session_id: int, start_time: datetime,
+                    end_time: Optional[datetime] = None) -> int:
+        """
+        Zamknij sesję: zapisz czas końca, czas trwania i średni współczynnik
+
+        Returns:
+            Czas trwania w minutach
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        end_time = end_time or datetime.now()
+        duration = (end_time - start_time).total_seconds() / 60  # minuty
+
+        # Oblicz średni współczynnik
+        cursor.execute('''
+            SELECT AVG(coefficient) FROM checks
+            WHERE session_id = ? AND detection_successful = 1
+        ''', (session_id,))
+
+        avg_coeff = cursor.fetchone()[0] or 0.0
+
+        # Zaktualizuj sesję
+        cursor.execute('''
+            UPDATE sessions
+            SET end_time = ?,
+                duration_minutes = ?,
+                average_coefficient = ?
+            WHERE id = ?
+        ''', (end_time, int(duration), avg_coeff, session_id))
+
+        conn.commit()
+        conn.close()
+        return int(duration)
+
+    def add_check(self, session_id: int, is_good_posture: bool, coefficient: float,
+                  detection_successful: bool, reused: bool = False,
+                  timestamp: Optional[datetime] = None, stream_id: Optional[str] = None,
+                  raw_coefficient: Optional[float] = None, metrics: Optional[Dict] = None,
+                  person_id: Optional[int] = None, failed_metrics: Optional[List[str]] = None):
+        """
+        Dodaj sprawdzenie i zaktualizuj liczniki sesji
+
+        Args:
+            stream_id: Źródło obrazu (np. kamera w trybie serwera); None dla jednej kamery
+            raw_coefficient: Współczynnik przed wygładzeniem; None = coefficient jest surowy
+            metrics: Dodatkowe metryki (posture_metrics) zapisywane jako JSON
+            failed_metrics: Nazwy metryk przekraczających próg (JSON)
+            person_id: Numer osoby głównej z PersonTracker (tryb kilku osób)
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # Dodaj sprawdzenie
+        cursor.execute('''
+            INSERT INTO checks (session_id, timestamp, is_good_posture, coefficient,
+                                detection_successful, reused, stream_id, raw_coefficient, metrics,
+                                failed_metrics, person_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (session_id, timestamp or datetime.now(), is_good_posture, coefficient,
+              detection_successful, reused, stream_id, raw_coefficient, encode_metrics(metrics),
+              encode_metrics(failed_metrics), person_id))
+
+        # Zaktualizuj liczniki sesji
+        if detection_successful:
+            if is_good_posture:
+                cursor.execute('''
+                    UPDATE sessions
+                    SET total_checks = total_checks + 1,
+                        good_posture_count = good_posture_count + 1
+                    WHERE id = ?
+                ''', (session_id,))
+            else:
+                cursor.execute('''
+                    UPDATE sessions
+                    SET total_checks = total_checks + 1,
+                        bad_posture_count = bad_posture_count + 1
+                    WHERE id = ?
+                ''', (session_id,))
+
+        conn.commit()
+        conn.close()
+
+    def add_person_checks(self, session_id: int, people: List[Dict],
+                          timestamp: Optional[datetime] = None, stream_id: Optional[str] = None):
+        """
+        Zapisz wyniki pozostałych osób z jednej analizy (landmarks['people'])
+        Liczniki sesji dotyczą tylko osoby głównej i się nie zmieniają
+        """
+        if not people:
+            return
+        timestamp = timestamp or datetime.now()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO person_checks (session_id, timestamp, person_id, is_good_posture,
+                                               coefficient, stream_id, metrics, failed_metrics)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (session_id, timestamp, p['person_id'], p['is_good'], p['norm_dist'],
+                     stream_id, encode_metrics(p.get('metrics')), encode_metrics(p.get('failed_metrics')))
+                    for p in people
+                ])
+        finally:
+            conn.close()
+
+    def import_session(self, checks: List[Dict], start_time: datetime, end_time: datetime,
+                       notes: Optional[str] = None) -> int:
+        """
+        Zapisz gotową listę sprawdzeń jako zakończoną sesję (np. z analizy nagrania)
+        Wszystko w jednej transakcji - szybciej niż add_check dla każdego wiersza
+
+        Args:
+            checks: Słowniki z kluczami timestamp, is_good, coefficient, detected
+                    (opcjonalnie reused, stream_id, raw_coefficient, metrics, failed_metrics)
+
+        Returns:
+            ID utworzonej sesji
+        """
+        detected = [c for c in checks if c['detected']]
+        good = sum(1 for c in detected if c['is_good'])
+        avg_coeff = sum(c['coefficient'] for c in detected) / len(detected) if detected else 0.0
+        duration = (end_time - start_time).total_seconds() / 60  # minuty
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO sessions (start_time, end_time, total_checks, good_posture_count,
+                                          bad_posture_count, average_coefficient, duration_minutes, notes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (start_time, end_time, len(detected), good, len(detected) - good,
+                      avg_coeff, int(duration), notes))
+                session_id = cursor.lastrowid
+
+                cursor.executemany('''
+                    INSERT INTO checks (session_id, timestamp, is_good_posture, coefficient,
+                                        detection_successful, reused, stream_id, raw_coefficient, metrics,
+                                        failed_metrics)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (session_id, c['timestamp'], c['is_good'], c['coefficient'], c['detected'],
+                     c.get('reused', False), c.get('stream_id'), c.get('raw_coefficient'),
+                     encode_metrics(c.get('metrics')), encode_metrics(c.get('failed_metrics')))
+                    for c in checks
+                ])
+        finally:
+            conn.close()
+
+        return session_id
+
+    def get_stream_summary(self, session_id: int) -> List[Dict]:
+        """Liczba sprawdzeń i odsetek dobrej postawy osobno dla każdego strumienia sesji"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT stream_id,
+                   COUNT(*),
+                   SUM(CASE WHEN is_good_posture = 1 THEN 1 ELSE 0 END),
+                   AVG(coefficient)
+            FROM checks
+            WHERE session_id = ? AND detection_successful = 1
+            GROUP BY stream_id
+            ORDER BY stream_id
+        ''', (session_id,))
+
+        summary = []
+        for stream_id, total, good, avg_coeff in cursor.fetchall():
+            summary.append({
+                'stream_id': stream_id,
+                'total_checks': total,
+                'good_count': good,
+                'percentage': round(good / total * 100, 1) if total else 0.0,
+                'avg_coefficient': round(avg_coeff or 0, 3)
+            })
+
+        conn.close()
+        return summary
+
+    def get_person_summary(self, session_id: int) -> List[Dict]:
+        """
+        Sprawdzenia i odsetek dobrej postawy dla każdej śledzonej osoby sesji
+        (osoba główna z checks, pozostałe z person_checks)
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT person_id, 1, COUNT(*),
+                   SUM(CASE WHEN is_good_posture = 1 THEN 1 ELSE 0 END),
+                   AVG(coefficient)
+            FROM checks
+            WHERE session_id = ? AND detection_successful = 1 AND person_id IS NOT NULL
+            GROUP BY person_id
+            UNION ALL
+            SELECT person_id, 0, COUNT(*),
+                   SUM(CASE WHEN is_good_posture = 1 THEN 1 ELSE 0 END),
+                   AVG(coefficient)
+            FROM person_checks
+            WHERE session_id = ?
+            GROUP BY person_id
+            ORDER BY 1, 2 DESC
+        ''', (session_id, session_id))
+
+        summary = []
+        for person_id, primary, total, good, avg_coeff in cursor.fetchall():
+            summary.append({
+                'person_id': person_id,
+                'primary': bool(primary),
+                'total_checks': total,
+                'good_count': good,
+                'percentage': round(good / total * 100, 1) if total else 0.0,
+                'avg_coefficient': round(avg_coeff or 0, 3)
+            })
+
+        conn.close()
+        return summary
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from landmark_array import (LEFT_EAR, LEFT_HIP, LEFT_SHOULDER, NUM_LANDMARKS, RIGHT_EAR, RIGHT_HIP,
+                            RIGHT_SHOULDER, score_landmarks)
+
+
+FRAME_SIZE = (1000, 1000)
+
+
+def pose(ear_dx: float = 0.0, torso: float = 0.4, visibility: float = 1.0,
+         right_torso: float = None, right_visibility: float = None) -> np.ndarray:
+    """
+    Sylwetka w pionie: biodro (0.5, 0.8), ramię torso wyżej, ucho 0.2 nad ramieniem
+    przesunięte o ear_dx; prawa strona domyślnie taka sama jak lewa
+    """
+    array = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    for (ear, shoulder, hip), length, vis in (
+            ((LEFT_EAR, LEFT_SHOULDER, LEFT_HIP), torso, visibility),
+            ((RIGHT_EAR, RIGHT_SHOULDER, RIGHT_HIP),
+             torso if right_torso is None else right_torso,
+             visibility if right_visibility is None else right_visibility)):
+        array[hip] = (0.5, 0.8, 0.0, vis)
+        array[shoulder] = (0.5, 0.8 - length, 0.0, vis)
+        array[ear] = (0.5 + ear_dx, 0.6 - length, 0.0, vis)
+    return array
+
+
+def test_upright_pose_is_good():
+    score = score_landmarks(pose(), FRAME_SIZE, threshold=0.20)
+
+    assert score['valid'][0]
+    assert score['is_good'][0]
+    assert score['norm_dist'][0] == pytest.approx(0.0)
+
+
+def test_norm_dist_scales_with_ear_offset():
+    # Ucho 40 px od osi przy tułowiu 400 px -> 0.1
+    score = score_landmarks(np.stack([pose(ear_dx=0.04), pose(ear_dx=0.12)]), FRAME_SIZE, threshold=0.20)
+
+    assert score['norm_dist'] == pytest.approx([0.1, 0.3])
+    assert list(score['is_good']) == [True, False]
+
+
+def test_visibility_threshold_is_inclusive():
+    at_threshold = score_landmarks(pose(visibility=0.5), FRAME_SIZE)
+    below = score_landmarks(pose(visibility=0.49), FRAME_SIZE)
+
+    assert at_threshold['valid'][0]
+    assert not below['valid'][0]
+    assert not below['is_good'][0]
+
+
+def test_left_side_wins_ties():
+    score = score_landmarks(pose(), FRAME_SIZE)
+
+    assert score['side'][0] == 0
+
+
+def test_longer_torso_side_is_chosen():
+    assert score_landmarks(pose(right_torso=0.5), FRAME_SIZE)['side'][0] == 1
+    # Niewidoczna strona nie wygrywa mimo dłuższego tułowia
+    assert score_landmarks(pose(right_torso=0.5, right_visibility=0.1), FRAME_SIZE)['side'][0] == 0
+
+
+def test_short_torso_is_rejected():
+    # 0.019 i 0.02 klatki 1000 px = 19 i 20 px tułowia
+    score = score_landmarks(np.stack([pose(torso=0.019), pose(torso=0.02)]), FRAME_SIZE)
+
+    assert list(score['valid']) == [False, True]
+    assert score['norm_dist'][0] == 0.0
+
+
+def test_missing_person_rows_are_invalid():
+    score = score_landmarks(np.full((1, NUM_LANDMARKS, 4), np.nan, dtype=np.float32), FRAME_SIZE)
+
+    assert not score['valid'][0]
+    assert not score['is_good'][0]
+
+
+def test_offsets_shift_decision_but_not_norm_dist():
+    array = pose(ear_dx=0.1)  # norm_dist 0.25
+    plain = score_landmarks(array, FRAME_SIZE, threshold=0.20)
+    shifted = score_landmarks(array, FRAME_SIZE, threshold=0.20, offsets=np.array([0.1, 0.0]))
+
+    assert not plain['is_good'][0]
+    assert shifted['is_good'][0]
+    assert shifted['norm_dist'][0] == pytest.approx(plain['norm_dist'][0])
+    assert shifted['offset'][0] == pytest.approx(0.1)
@@ -0,0 +1,48 @@
+import hashlib
+
+import pytest
+
+import model_registry
+from model_registry import ModelIntegrityError, ModelRegistry, read_manifest
+
+
+MODEL_BYTES = b"pose landmarker"
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """urlretrieve bez sieci - zapisuje MODEL_BYTES i zapamiętuje adresy"""
+    urls = []
+
+    def urlretrieve(url, path):
+        urls.append(url)
+        with open(path, 'wb') as f:
+            f.write(MODEL_BYTES)
+
+    monkeypatch.setattr(model_registry.urllib.request, 'urlretrieve', urlretrieve)
+    return urls
+
+
+def test_prefetch_registers_file_matching_pinned_digest(tmp_path, downloads):
+    digest = hashlib.sha256(MODEL_BYTES).hexdigest()
+
+    fetched = ModelRegistry(str(tmp_path)).prefetch(['lite'], force=True, pinned={'lite': digest.upper()})
+
+    assert fetched['lite'] == tmp_path / "pose_landmarker_lite.task"
+    assert read_manifest(tmp_path) == {"pose_landmarker_lite.task": digest}
+
+
+def test_prefetch_rejects_file_with_other_digest(tmp_path, downloads):
+    with pytest.raises(ModelIntegrityError):
+        ModelRegistry(str(tmp_path)).prefetch(['lite'], force=True, pinned={'lite': "0" * 64})
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prefetch_without_pinned_digest_does_not_download(tmp_path, downloads, monkeypatch):
+    monkeypatch.setattr(model_registry, 'KNOWN_SHA256', {})
+
+    with pytest.raises(ModelIntegrityError):
+        ModelRegistry(str(tmp_path)).prefetch(['full'], force=True)
+
+    assert downloads == []
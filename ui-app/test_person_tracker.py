@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from landmark_array import NUM_LANDMARKS
+from person_tracker import PersonTracker, box_iou, person_boxes
+
+
+def person(x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+    """Sylwetka, której widoczne punkty wypełniają prostokąt (x0, y0, x1, y1)"""
+    array = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    array[:, 0] = np.linspace(x0, x1, NUM_LANDMARKS)
+    array[:, 1] = np.linspace(y0, y1, NUM_LANDMARKS)
+    array[:, 3] = 1.0
+    return array
+
+
+def test_person_boxes_ignore_invisible_points():
+    array = person(0.2, 0.2, 0.4, 0.6)
+    array[10, :2] = (0.9, 0.9)
+    array[10, 3] = 0.1
+
+    assert person_boxes(array)[0] == pytest.approx([0.2, 0.2, 0.4, 0.6], abs=1e-3)
+
+
+def test_box_iou():
+    a = np.array([[0.0, 0.0, 0.2, 0.2]])
+    b = np.array([[0.0, 0.0, 0.2, 0.2], [0.1, 0.0, 0.3, 0.2], [0.5, 0.5, 0.6, 0.6]])
+
+    assert box_iou(a, b)[0] == pytest.approx([1.0, 1 / 3, 0.0])
+
+
+def test_ids_follow_people_when_order_changes():
+    tracker = PersonTracker()
+    left, right = person(0.1, 0.2, 0.3, 0.9), person(0.6, 0.3, 0.75, 0.8)
+    first = tracker.update([left, right])
+
+    # Ta sama scena, kolejność z modelu odwrócona i lekki ruch
+    second = tracker.update([person(0.61, 0.3, 0.76, 0.8), person(0.11, 0.2, 0.31, 0.9)])
+
+    assert second == first[::-1]
+    assert tracker.track_count == 2
+
+
+def test_overlap_below_threshold_falls_back_to_center_distance():
+    tracker = PersonTracker(iou_threshold=0.5, max_center_distance=0.15)
+    (track_id,) = tracker.update([person(0.1, 0.1, 0.2, 0.2)])
+
+    # Przesunięcie o pół szerokości: IoU 1/3 jest poniżej progu, ale środek przesunął się o 0.05
+    assert tracker.update([person(0.15, 0.1, 0.25, 0.2)]) == [track_id]
+
+    # Daleki skok - nowa osoba
+    assert tracker.update([person(0.7, 0.7, 0.8, 0.8)]) != [track_id]
+
+
+def test_primary_is_largest_and_stays_locked():
+    tracker = PersonTracker()
+    small, large = person(0.7, 0.4, 0.8, 0.6), person(0.1, 0.1, 0.5, 0.9)
+    ids = tracker.update([small, large])
+    assert tracker.primary_index(ids) == 1
+
+    # Większa sylwetka pojawia się później - osoba główna się nie zmienia
+    ids = tracker.update([small, large, person(0.5, 0.0, 1.0, 1.0)])
+    assert tracker.primary_id == ids[1]
+
+
+def test_primary_survives_short_absence_and_is_replaced_after_max_missed():
+    tracker = PersonTracker(max_missed=2)
+    primary = tracker.update([person(0.1, 0.1, 0.5, 0.9)])[0]
+    other = person(0.7, 0.4, 0.8, 0.6)
+
+    for _ in range(2):
+        ids = tracker.update([other])
+        assert tracker.primary_id == primary
+        assert tracker.primary_index(ids) is None
+
+    ids = tracker.update([other])
+    assert tracker.primary_id == ids[0]
+    assert tracker.primary_index(ids) == 0
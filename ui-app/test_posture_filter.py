@@ -0,0 +1,74 @@
+import pytest
+
+from posture_filter import HysteresisClassifier, OneEuroFilter, PostureFilter
+
+
+def unsmoothed_filter(**kwargs) -> PostureFilter:
+    """Bardzo wysokie odcięcie One-Euro - wartości przechodzą bez wygładzania, zostaje histereza"""
+    return PostureFilter(threshold=0.20, margin=0.02, min_cutoff=1e6, **kwargs)
+
+
+def feed(posture_filter: PostureFilter, values, landmarks=None, start: float = 0.0):
+    landmarks = {} if landmarks is None else landmarks
+    return [posture_filter.update(value, landmarks, timestamp=start + i)[0] for i, value in enumerate(values)]
+
+
+def test_first_sample_uses_plain_threshold():
+    assert HysteresisClassifier(0.20, 0.02).update(0.20)
+    assert not HysteresisClassifier(0.20, 0.02).update(0.21)
+
+
+def test_values_inside_band_do_not_flip_decision():
+    classifier = HysteresisClassifier(0.20, 0.02)
+
+    assert [classifier.update(v) for v in (0.10, 0.215, 0.22, 0.23, 0.19, 0.185, 0.17)] == \
+        [True, True, True, False, False, False, True]
+
+
+def test_filter_applies_hysteresis_to_norm_dist():
+    posture_filter = unsmoothed_filter()
+
+    assert feed(posture_filter, [0.15, 0.21, 0.19, 0.21, 0.25, 0.21, 0.19, 0.17]) == \
+        [True, True, True, True, False, False, False, True]
+
+
+def test_baseline_offset_shifts_decision():
+    posture_filter = unsmoothed_filter()
+
+    decisions = feed(posture_filter, [0.25, 0.25], landmarks={'baseline_offset': 0.1})
+
+    assert decisions == [True, True]
+
+
+def test_smoothed_norm_dist_stays_raw_with_offset():
+    posture_filter = unsmoothed_filter()
+
+    _, norm_dist, _ = posture_filter.update(0.25, {'baseline_offset': 0.1}, timestamp=0.0)
+
+    assert norm_dist == pytest.approx(0.25)
+
+
+def test_missing_person_keeps_state():
+    posture_filter = unsmoothed_filter()
+    feed(posture_filter, [0.25])
+
+    assert posture_filter.update(0.0, None, timestamp=1.0) == (False, 0.0, None)
+    # Stan histerezy bez zmian: 0.21 mieści się w pasie, ocena dalej zła
+    assert not posture_filter.update(0.21, {}, timestamp=2.0)[0]
+
+
+def test_long_gap_restarts_filter():
+    posture_filter = unsmoothed_filter(max_gap=30.0)
+    feed(posture_filter, [0.25])
+
+    # Po przerwie pierwsza próbka znów używa zwykłego progu
+    assert posture_filter.update(0.19, {}, timestamp=100.0)[0]
+
+
+def test_one_euro_smooths_slow_noise():
+    one_euro = OneEuroFilter(min_cutoff=0.05, beta=0.0)
+    one_euro(0.20, 0.0)
+
+    smoothed = one_euro(0.30, 1.0)
+
+    assert 0.20 < smoothed < 0.25
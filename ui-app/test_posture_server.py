@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from posture_server import PostureServer, StreamState, WorkerPool
+
+
+class FakeCapture:
+    """Zamiast CaptureThread - każde latest() to nowa klatka, chyba że paused"""
+
+    def __init__(self):
+        self.seq = 0
+        self.paused = False
+
+    def latest(self):
+        if not self.paused:
+            self.seq += 1
+        return self.seq, np.zeros((4, 4, 3), dtype=np.uint8), 0.0
+
+
+class FakeWorker:
+    def __init__(self, busy: bool = False):
+        self.is_busy = busy
+
+
+def make_streams(count: int, period: float = 1.0, worker=None):
+    streams = []
+    for i in range(count):
+        stream = StreamState(f"s{i}", str(i), FakeCapture(), period=period)
+        stream.next_deadline = 0.0
+        stream.worker = worker or FakeWorker()
+        streams.append(stream)
+    return streams
+
+
+def picked(server: PostureServer, now: float):
+    stream, _, _ = server._pick_stream(now)
+    return stream.stream_id if stream is not None else None
+
+
+def test_round_robin_visits_streams_in_turn():
+    server = PostureServer(make_streams(3), pool=None, policy='round-robin')
+
+    assert [picked(server, 0.0) for _ in range(6)] == ['s0', 's1', 's2', 's0', 's1', 's2']
+
+
+def test_round_robin_skips_busy_worker_and_stale_frame():
+    streams = make_streams(3)
+    streams[1].worker = FakeWorker(busy=True)
+    server = PostureServer(streams, pool=None, policy='round-robin')
+
+    assert picked(server, 0.0) == 's0'
+    streams[2].capture_thread.paused = True
+    streams[2].last_seq = streams[2].capture_thread.seq
+    # s1 zajęty, s2 bez nowej klatki - kolejka wraca do s0
+    assert picked(server, 0.0) == 's0'
+
+
+def test_deadline_picks_earliest_due_stream():
+    streams = make_streams(3)
+    streams[0].next_deadline = 0.5
+    streams[1].next_deadline = 0.2
+    streams[2].next_deadline = 5.0  # jeszcze nie teraz
+    server = PostureServer(streams, pool=None, policy='deadline')
+
+    assert picked(server, 1.0) == 's1'
+    assert picked(server, 1.0) == 's0'
+    assert picked(server, 1.0) is None
+
+
+def test_deadline_advances_by_period_without_bursts():
+    (stream,) = make_streams(1, period=1.0)
+    server = PostureServer([stream], pool=None, policy='deadline')
+
+    assert picked(server, 0.0) == 's0'
+    assert stream.next_deadline == pytest.approx(1.0)
+    assert picked(server, 0.5) is None
+
+    # Duże opóźnienie: termin liczony od teraz, pominięty termin zliczony
+    assert picked(server, 10.0) == 's0'
+    assert stream.next_deadline == pytest.approx(10.0)
+    assert stream.missed_deadlines == 1
+
+
+def test_deadline_does_not_starve_streams():
+    streams = make_streams(3, period=0.1)
+    server = PostureServer(streams, pool=None, policy='deadline')
+
+    counts = {s.stream_id: 0 for s in streams}
+    for step in range(300):
+        stream_id = picked(server, step * 0.01)
+        if stream_id is not None:
+            counts[stream_id] += 1
+
+    assert min(counts.values()) >= 25
+
+
+def test_assign_pins_streams_to_ready_workers():
+    class ReadyEvent:
+        def __init__(self, ready):
+            self._ready = ready
+
+        def is_set(self):
+            return self._ready
+
+    pool = WorkerPool.__new__(WorkerPool)
+    ready_a, ready_b, starting = (FakeWorker() for _ in range(3))
+    ready_a.ready_event, ready_b.ready_event = ReadyEvent(True), ReadyEvent(True)
+    starting.ready_event = ReadyEvent(False)
+    pool.workers = [ready_a, starting, ready_b]
+    streams = make_streams(3)
+
+    pool.assign(streams)
+
+    assert [s.worker for s in streams] == [ready_a, ready_b, ready_a]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        PostureServer(make_streams(1), pool=None, policy='fifo')
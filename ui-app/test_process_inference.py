@@ -0,0 +1,87 @@
+import queue
+import sys
+import threading
+import types
+
+import numpy as np
+import pytest
+
+import process_inference
+from process_inference import InferenceProcess
+
+
+class StubDetector:
+    """PostureDetector bez MediaPipe - wynik zdradza, który detektor analizował klatkę"""
+
+    created = []
+
+    def __init__(self, **kwargs):
+        self.index = len(StubDetector.created)
+        self.api_type = 'stub'
+        StubDetector.created.append(self)
+
+    def set_baseline(self, baseline):
+        pass
+
+    def analyze_posture(self, frame):
+        return True, float(frame[0, 0, 0]), {'detector': self.index}
+
+    def release(self):
+        pass
+
+
+class ThreadProcess:
+    """Zamiast procesu 'spawn' - ta sama pętla w wątku, żeby działał stub detektora"""
+
+    def __init__(self, target, args, name, daemon):
+        self._thread = threading.Thread(target=target, args=args, name=name, daemon=daemon)
+        self.exitcode = None
+
+    def start(self):
+        self._thread.start()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def terminate(self):
+        pass
+
+
+@pytest.fixture
+def inference(monkeypatch):
+    StubDetector.created = []
+    monkeypatch.setitem(sys.modules, 'posture_detector', types.SimpleNamespace(PostureDetector=StubDetector))
+    # Pętla procesu przekierowuje stdout - przywróć go po teście
+    monkeypatch.setattr(sys, 'stdout', sys.stdout)
+    context = types.SimpleNamespace(Queue=queue.Queue, Process=ThreadProcess)
+    monkeypatch.setattr(process_inference.mp, 'get_context', lambda method: context)
+
+    process = InferenceProcess(max_in_flight=1)
+    yield process
+    process.stop()
+
+
+def _analyze(process, value, key):
+    frame = np.full((48, 64, 3), value, dtype=np.uint8)
+    assert process.submit(frame, key=key) is not None
+    result = process.get_result(timeout=5.0)
+    assert result is not None
+    return result[4]['detector']
+
+
+def test_streams_with_same_resolution_get_separate_detectors(inference):
+    desk_a = _analyze(inference, 1, key='deskA')
+    desk_b = _analyze(inference, 2, key='deskB')
+
+    assert desk_a != desk_b
+    assert len(StubDetector.created) == 2
+
+
+def test_same_stream_keeps_its_detector(inference):
+    first = _analyze(inference, 1, key='deskA')
+    _analyze(inference, 2, key='deskB')
+
+    assert _analyze(inference, 3, key='deskA') == first
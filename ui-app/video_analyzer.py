@@ -0,0 +1,300 @@
+"""
+Analiza postawy na nagraniach wideo (np. z badań ergonomicznych)
+Ocena jak w aplikacji na żywo: PostureDetector w trybie VIDEO ze śledzeniem,
+znaczniki czasu z nagrania, a wynik to oś czasu postawy, którą można
+zaimportować jako sesję do bazy statystyk.
+
+Użycie:
+    python video_analyzer.py nagranie.mp4 --sample-rate 2 -o os_czasu.csv
+    python video_analyzer.py nagranie.mp4 --stride 15 --import-session
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import cv2
+
+from landmark_array import SIDES, score_landmarks, stack_landmarks
+from pose_backends import BACKENDS
+from posture_detector import PostureDetector
+from posture_metrics import METRICS, parse_metric_threshold
+from statistics_store import StatisticsStore
+
+
+TIMELINE_FIELDS = ['time', 'frame', 'detected', 'is_good', 'norm_dist', 'side']
+# Metryki dodatkowe w CSV jako osobne kolumny, przekroczone progi rozdzielone ';'
+METRIC_FIELDS = list(METRICS) + ['failed_metrics']
+
+
+class VideoAnalyzer:
+    """
+    Analiza nagrania co stride klatek
+
+    Pominięte klatki nie są w pełni dekodowane: przy małym kroku używamy
+    grab() (bez konwersji do BGR i kopiowania), przy dużym - przeskoku
+    przez CAP_PROP_POS_FRAMES, który dekoduje tylko od najbliższej klatki kluczowej.
+    """
+
+    def __init__(self, detector: PostureDetector, stride: int = 1, sample_rate: float = 0.0,
+                 seek_threshold: int = 30):
+        """
+        Args:
+            detector: Detektor (jeden na nagranie - przechowuje stan śledzenia)
+            stride: Analizuj co n-tą klatkę
+            sample_rate: Docelowa liczba analiz na sekundę nagrania (ma pierwszeństwo przed stride)
+            seek_threshold: Powyżej tylu pomijanych klatek przeskok zamiast grab()
+        """
+        self.detector = detector
+        self.stride = max(1, stride)
+        self.sample_rate = sample_rate
+        self.seek_threshold = seek_threshold
+
+    def _stride_for(self, fps: float) -> int:
+        if self.sample_rate > 0:
+            return max(1, round(fps / self.sample_rate))
+        return self.stride
+
+    def analyze(self, path: str, progress: Optional[Callable[[float], None]] = None) -> Dict:
+        """
+        Przeanalizuj nagranie
+
+        Returns:
+            Słownik z metadanymi nagrania i listą 'timeline' (po jednym wpisie na analizowaną klatkę)
+        """
+        capture = cv2.VideoCapture(path)
+        if not capture.isOpened():
+            raise IOError(f"Nie można otworzyć nagrania: {path}")
+
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        stride = self._stride_for(fps)
+        # Przeskok wymaga znanej długości nagrania (strumienie i część kontenerów jej nie podają)
+        use_seek = stride - 1 > self.seek_threshold and frame_count > 0
+
+        timeline = []
+        arrays = []
+        frame_size = (0, 0)
+        index = 0
+        start = time.perf_counter()
+
+        try:
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+
+                # Czas z numeru klatki - stały krok także po przeskoku
+                time_ms = index * 1000.0 / fps
+                is_good, norm_dist, landmarks = self.detector.analyze_posture(frame, timestamp_ms=int(time_ms))
+                detected = landmarks is not None
+                frame_size = (frame.shape[1], frame.shape[0])
+                arrays.append(landmarks['array'] if detected else None)
+                timeline.append({
+                    'time': round(time_ms / 1000.0, 3),
+                    'frame': index,
+                    'detected': detected,
+                    'is_good': bool(is_good),
+                    'norm_dist': round(float(norm_dist), 4),
+                    'side': landmarks['used_side'] if detected else None,
+                    'metrics': landmarks.get('metrics') if detected else None,
+                    'failed_metrics': landmarks.get('failed_metrics') if detected else None
+                })
+
+                if progress is not None and frame_count > 0:
+                    progress(min(1.0, index / frame_count))
+
+                index += stride
+                if frame_count > 0 and index >= frame_count:
+                    break
+                if use_seek:
+                    capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+                else:
+                    skipped = 0
+                    while skipped < stride - 1 and capture.grab():
+                        skipped += 1
+                    if skipped < stride - 1:
+                        break
+        finally:
+            capture.release()
+
+        elapsed = time.perf_counter() - start
+        duration = frame_count / fps if frame_count > 0 else index / fps
+        return {
+            'path': path,
+            'fps': fps,
+            'frame_count': frame_count,
+            'duration': duration,
+            'stride': stride,
+            'elapsed': elapsed,
+            'realtime_factor': duration / elapsed if elapsed > 0 else 0.0,
+            'timeline': timeline,
+            # (N, 33, 4) - do ponownej oceny bez uruchamiania MediaPipe
+            'landmarks': stack_landmarks(arrays),
+            'frame_size': frame_size
+        }
+
+
+def rescore_timeline(analysis: Dict, threshold: float) -> List[Dict]:
+    """Oś czasu dla innego progu - jedna wektorowa ocena zapisanych punktów"""
+    score = score_landmarks(analysis['landmarks'], analysis['frame_size'], threshold)
+    timeline = []
+    for i, sample in enumerate(analysis['timeline']):
+        valid = bool(score['valid'][i])
+        timeline.append(dict(
+            sample,
+            detected=valid,
+            is_good=bool(score['is_good'][i]),
+            norm_dist=round(float(score['norm_dist'][i]), 4),
+            side=SIDES[score['side'][i]] if valid else None
+        ))
+    return timeline
+
+
+def timeline_to_checks(timeline: List[Dict], start_time: datetime) -> List[Dict]:
+    """Oś czasu -> sprawdzenia dla StatisticsStore.import_session"""
+    return [
+        {
+            'timestamp': start_time + timedelta(seconds=sample['time']),
+            'is_good': sample['is_good'],
+            'coefficient': sample['norm_dist'],
+            'detected': sample['detected'],
+            'metrics': sample.get('metrics'),
+            'failed_metrics': sample.get('failed_metrics')
+        }
+        for sample in timeline
+    ]
+
+
+def import_session(store: StatisticsStore, analysis: Dict, start_time: Optional[datetime] = None) -> int:
+    """
+    Zaimportuj wynik analizy jako zakończoną sesję
+
+    Args:
+        start_time: Początek nagrania; domyślnie czas modyfikacji pliku minus długość nagrania
+    """
+    if start_time is None:
+        end = datetime.fromtimestamp(os.path.getmtime(analysis['path']))
+        start_time = end - timedelta(seconds=analysis['duration'])
+    end_time = start_time + timedelta(seconds=analysis['duration'])
+
+    return store.import_session(
+        timeline_to_checks(analysis['timeline'], start_time),
+        start_time,
+        end_time,
+        notes=f"wideo: {os.path.basename(analysis['path'])}"
+    )
+
+
+def write_timeline(timeline: List[Dict], output: str):
+    """Zapis osi czasu do CSV albo JSON (według rozszerzenia)"""
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        if output.lower().endswith('.json'):
+            json.dump(timeline, f, ensure_ascii=False, indent=2)
+        else:
+            writer = csv.DictWriter(f, fieldnames=TIMELINE_FIELDS + METRIC_FIELDS)
+            writer.writeheader()
+            for sample in timeline:
+                row = {k: sample.get(k) for k in TIMELINE_FIELDS}
+                row.update(sample.get('metrics') or {})
+                row['failed_metrics'] = ";".join(sample.get('failed_metrics') or [])
+                writer.writerow(row)
+
+
+def parse_start_time(value: str) -> datetime:
+    """Typ argparse dla --start: czas ISO, błąd jako komunikat parsera"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"niepoprawny czas ISO: {value} (np. 2026-10-01T09:00)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Analiza postawy na nagraniach wideo")
+    parser.add_argument("videos", nargs="+", help="Pliki wideo")
+    parser.add_argument("--stride", type=int, default=1, help="Analizuj co n-tą klatkę")
+    parser.add_argument("--sample-rate", type=float, default=0.0,
+                        help="Analiz na sekundę nagrania (zastępuje --stride)")
+    parser.add_argument("--seek-threshold", type=int, default=30,
+                        help="Powyżej tylu pomijanych klatek przeskok zamiast dekodowania")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Próg garbienia")
+    parser.add_argument("--metric-threshold", type=parse_metric_threshold, action="append", default=[],
+                        help="Próg metryki nazwa=wartość, np. neck_angle=45 (można powtarzać)")
+    parser.add_argument("--compare-thresholds", metavar="PROGI",
+                        help="Pokaż odsetek dobrej postawy dla innych progów, np. 0.15,0.25")
+    parser.add_argument("--inference-size", type=int, default=480,
+                        help="Dłuższy bok klatki dla MediaPipe (0 = pełna rozdzielczość)")
+    parser.add_argument("--roi", action="store_true", help="Analizuj tylko obszar wokół sylwetki")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto",
+                        help="Backend wykrywania sylwetki (domyślnie MediaPipe)")
+    parser.add_argument("--pose-model", help="Plik modelu dla backendu (.task, .onnx)")
+    parser.add_argument("-o", "--output", help="Plik osi czasu .csv lub .json (przy kilku nagraniach: katalog)")
+    parser.add_argument("--import-session", action="store_true", help="Zapisz każde nagranie jako sesję w statistics.db")
+    parser.add_argument("--start", type=parse_start_time,
+                        help="Czas początku nagrania (ISO, np. 2026-10-01T09:00; tylko dla jednego nagrania); "
+                             "domyślnie z daty pliku")
+    args = parser.parse_args()
+
+    if args.start and len(args.videos) > 1:
+        # Wspólny początek nałożyłby na siebie sesje kilku nagrań
+        parser.error("--start wymaga jednego nagrania (kilka nagrań: czas z daty pliku)")
+    start_time = args.start
+    store = StatisticsStore() if args.import_session else None
+
+    for path in args.videos:
+        # Nowy detektor dla każdego nagrania - śledzenie i znaczniki czasu od zera
+        detector = PostureDetector(
+            posture_threshold=args.threshold,
+            metric_thresholds=dict(args.metric_threshold),
+            inference_long_edge=args.inference_size or None,
+            roi_tracking=args.roi,
+            backend=args.backend,
+            pose_model=args.pose_model
+        )
+        analyzer = VideoAnalyzer(detector, stride=args.stride, sample_rate=args.sample_rate,
+                                 seek_threshold=args.seek_threshold)
+        try:
+            analysis = analyzer.analyze(path)
+        except IOError as e:
+            print(e, file=sys.stderr)
+            continue
+        finally:
+            detector.release()
+
+        timeline = analysis['timeline']
+        detected = [s for s in timeline if s['detected']]
+        good = sum(1 for s in detected if s['is_good'])
+        print(f"{path}: {len(timeline)} analiz (co {analysis['stride']} klatek), "
+              f"wykryto {len(detected)}, dobra postawa "
+              f"{(good / len(detected) * 100) if detected else 0:.1f}%", file=sys.stderr)
+        print(f"  {analysis['duration']:.1f}s nagrania w {analysis['elapsed']:.1f}s "
+              f"({analysis['realtime_factor']:.1f}x czasu rzeczywistego)", file=sys.stderr)
+
+        if args.compare_thresholds and detected:
+            for threshold in (float(v) for v in args.compare_thresholds.split(",")):
+                score = score_landmarks(analysis['landmarks'], analysis['frame_size'], threshold)
+                valid = score['valid'].sum()
+                percentage = score['is_good'].sum() / valid * 100 if valid else 0.0
+                print(f"  próg {threshold:.2f}: dobra postawa {percentage:.1f}%", file=sys.stderr)
+
+        if args.output:
+            output = args.output
+            if len(args.videos) > 1:
+                os.makedirs(args.output, exist_ok=True)
+                output = os.path.join(args.output, os.path.splitext(os.path.basename(path))[0] + ".csv")
+            write_timeline(timeline, output)
+
+        if store is not None:
+            session_id = import_session(store, analysis, start_time)
+            print(f"  Zaimportowano jako sesję ID={session_id}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())